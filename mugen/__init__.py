@@ -7,6 +7,7 @@ from mugen.video.filters import VideoFilter
 from mugen.video.MusicVideo import MusicVideo
 from mugen.video.MusicVideoGenerator import MusicVideoGenerator
 from mugen.video.segments.ColorSegment import ColorSegment
+from mugen.video.segments.FootageLedger import FootageLedger
 from mugen.video.segments.ImageSegment import ImageSegment
 from mugen.video.segments.VideoSegment import VideoSegment
 from mugen.video.sources.ColorSource import ColorSource
@@ -23,6 +24,7 @@ __all__ = [
     MusicVideo,
     MusicVideoGenerator,
     ColorSegment,
+    FootageLedger,
     ImageSegment,
     VideoSegment,
     ColorSource,
@@ -1,3 +1,6 @@
+from typing import Dict
+
+
 class MugenError(Exception):
     """
     The root mugen exception class
@@ -12,3 +15,28 @@ class ParameterError(MugenError):
     """
 
     pass
+
+
+class SamplingError(MugenError):
+    """
+    Exception class for failing to sample content which satisfies the given constraints
+    """
+
+    pass
+
+
+class WritingError(MugenError):
+    """
+    Exception class for failing to write one or more video clips to file
+
+    Attributes
+    ----------
+    errors
+        The error for each video clip which failed to write, by output path
+    """
+
+    errors: Dict[str, Exception]
+
+    def __init__(self, message: str, errors: Dict[str, Exception]):
+        super().__init__(message)
+        self.errors = errors
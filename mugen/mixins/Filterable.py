@@ -1,4 +1,7 @@
-from typing import Any, Callable, List, Optional, Tuple
+import copy
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mugen.utilities.cache import Cache, use_cache
 
 
 class Filter:
@@ -12,20 +15,61 @@ class Filter:
 
     function
         The function to filter with
+
+    version
+        Version of the filter function, which should change whenever its results would change.
+        Results of versioned filters may be cached.
+
+    options
+        Keyword arguments to pass to the filter function
     """
 
     name: str
     function: Callable[..., bool]
-
-    def __init__(self, function: Callable[..., bool]):
+    version: Optional[str]
+    options: Dict[str, Any]
+
+    def __init__(
+        self,
+        function: Callable[..., bool],
+        *,
+        version: Optional[str] = None,
+        **options,
+    ):
         self.name = function.__name__
         self.function = function
+        self.version = version
+        self.options = options
 
     def __repr__(self):
         return f"<{self.__class__.__name__}: {self.name}>"
 
     def __call__(self, *args, **kwargs) -> bool:
-        return self.function(*args, **kwargs)
+        return self.function(*args, **self.options, **kwargs)
+
+    @property
+    def cache_version(self) -> Optional[str]:
+        """
+        Version identifying the filter's results for caching, or None if results cannot be cached
+        """
+        if self.version is None:
+            return None
+
+        options = ",".join(
+            f"{key}={value!r}" for key, value in sorted(self.options.items())
+        )
+        return f"{self.version}:{options}" if options else self.version
+
+    def with_options(self, **options) -> "Filter":
+        """
+        Returns
+        -------
+        A copy of the filter, with the given options added to its options
+        """
+        filter = copy.copy(self)
+        filter.options = {**self.options, **options}
+
+        return filter
 
 
 class ContextFilter(Filter):
@@ -49,7 +93,7 @@ class ContextFilter(Filter):
             self.memory = memory
 
     def __call__(self, *args, **kwargs) -> bool:
-        return self.function(*args, memory=self.memory, **kwargs)
+        return self.function(*args, memory=self.memory, **self.options, **kwargs)
 
 
 class Filterable:
@@ -65,7 +109,16 @@ class Filterable:
         self.passed_filters = []
         self.failed_filters = []
 
-    def apply_filters(self, filters: List[Filter]) -> Tuple[List[Filter], List[Filter]]:
+    @property
+    def cache_key(self) -> Optional[str]:
+        """
+        Key identifying this object's content for caching filter results, or None if results cannot be cached
+        """
+        return None
+
+    def apply_filters(
+        self, filters: List[Filter], *, cache: Optional[Cache] = None
+    ) -> Tuple[List[Filter], List[Filter]]:
         """
         Tests this object against a set of filters, short circuiting if any of the filters fail
 
@@ -74,13 +127,27 @@ class Filterable:
         filters
             Filters to test
 
+        cache
+            Cache to look up and store results of versioned filters in
+
         Returns
         -------
         True if all filters passed, false otherwise
         """
-        for filter in filters:
-            if filter(self):
-                self.passed_filters.append(filter)
-            else:
-                self.failed_filters.append(filter)
-                break
+        cache_key = self.cache_key if cache else None
+
+        with use_cache(cache):
+            for filter in filters:
+                if cache_key and filter.cache_version:
+                    passed = cache.get(cache_key, filter.name, filter.cache_version)
+                    if passed is None:
+                        passed = bool(filter(self))
+                        cache.set(cache_key, filter.name, filter.cache_version, passed)
+                else:
+                    passed = filter(self)
+
+                if passed:
+                    self.passed_filters.append(filter)
+                else:
+                    self.failed_filters.append(filter)
+                    break
@@ -1,8 +1,7 @@
-from copy import deepcopy
+from copy import copy
 from fractions import Fraction
-from typing import Any, List, Optional, Union
+from typing import Any, List, Optional, Tuple, Union
 
-from mugen import lists
 from mugen.lists import MugenList
 from mugen.utilities import conversion
 
@@ -80,15 +79,35 @@ class WeightableList(Weightable, MugenList):
         """
         Returns
         -------
-        A flattened, deep copy of this weightable list, with weights distributed and normalized
+        A flattened copy of this weightable list, with weights distributed and normalized.
+        Only the weightables themselves are copied, so their attributes are shared with the originals.
         """
-        weightables_copy = deepcopy(self)
-        self._distribute_weight(weightables_copy, 1)
+        flattened_weightables = []
+        for weightable, weight in self.flatten_weights():
+            weightable_copy = copy(weightable)
+            weightable_copy.weight = weight
+            flattened_weightables.append(weightable_copy)
 
-        return type(self)(lists.flatten(weightables_copy))
+        return type(self)(flattened_weightables)
+
+    def flatten_weights(self) -> List[Tuple[Weightable, float]]:
+        """
+        Returns
+        -------
+        Each weightable in this arbitrarily nested list, paired with its weight once weights are distributed
+        and normalized. Weightables are not copied or modified.
+        """
+        flattened_weights = []
+        self._distribute_weight(self, 1, flattened_weights)
+
+        return flattened_weights
 
     @staticmethod
-    def _distribute_weight(weightables: "WeightableList", weight: float):
+    def _distribute_weight(
+        weightables: "WeightableList",
+        weight: float,
+        flattened_weights: List[Tuple[Weightable, float]],
+    ):
         """
         Distributes weight across an arbitrarily nested list of weightables
         """
@@ -98,6 +117,8 @@ class WeightableList(Weightable, MugenList):
             new_weight = normalized_weight * weight
 
             if isinstance(weightable, WeightableList):
-                WeightableList._distribute_weight(weightable, new_weight)
+                WeightableList._distribute_weight(
+                    weightable, new_weight, flattened_weights
+                )
             else:
-                weightable.weight = new_weight
+                flattened_weights.append((weightable, new_weight))
@@ -0,0 +1,171 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from mugen.utilities import system
+
+"""
+Module for persistently caching the results of expensive computations, such as video filters
+"""
+
+CACHE_DIRECTORY = os.environ.get(
+    "MUGEN_CACHE_DIRECTORY",
+    os.path.join(
+        os.environ.get(
+            "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+        ),
+        "mugen",
+    ),
+)
+CACHE_FILE_NAME = "cache.sqlite"
+
+
+class Cache:
+    """
+    A persistent cache of computation results, stored in an SQLite database.
+
+    Results are keyed by the object they were computed for, the name of the computation,
+    and the computation's version, which should change whenever its results would change.
+
+    Attributes
+    ----------
+    path
+        Path to the cache's database file
+    """
+
+    path: str
+    _connection: Optional[sqlite3.Connection]
+    _lock: threading.Lock
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Parameters
+        ----------
+        path
+            Path to the cache's database file.
+            Defaults to a file in the directory set by the MUGEN_CACHE_DIRECTORY environment variable,
+            or ~/.cache/mugen
+        """
+        self.path = path or os.path.join(CACHE_DIRECTORY, CACHE_FILE_NAME)
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.path}>"
+
+    def __getstate__(self):
+        """
+        Custom pickling
+        """
+        state = self.__dict__.copy()
+
+        # Connections and locks cannot be pickled, and are recreated on use
+        state["_connection"] = None
+        state["_lock"] = None
+
+        return state
+
+    def __setstate__(self, newstate):
+        """
+        Custom unpickling
+        """
+        newstate["_lock"] = threading.Lock()
+        self.__dict__.update(newstate)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if not self._connection:
+            system.ensure_directory_exists(os.path.dirname(os.path.abspath(self.path)))
+            # The cache may be shared between threads and worker processes
+            self._connection = sqlite3.connect(
+                self.path, timeout=60, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT, name TEXT, version TEXT, value TEXT, PRIMARY KEY (key, name, version))"
+            )
+            self._connection.commit()
+
+        return self._connection
+
+    def get(self, key: str, name: str, version: str) -> Optional[Any]:
+        """
+        Returns
+        -------
+        The cached result, or None if there is no cached result
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT value FROM results WHERE key = ? AND name = ? AND version = ?",
+                (key, name, version),
+            ).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, name: str, version: str, value: Any):
+        """
+        Caches a JSON serializable result
+        """
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results (key, name, version, value) VALUES (?, ?, ?, ?)",
+                (key, name, version, json.dumps(value)),
+            )
+            self.connection.commit()
+
+    def close(self):
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+
+_active_cache: ContextVar[Optional[Cache]] = ContextVar("active_cache", default=None)
+
+
+@contextmanager
+def use_cache(cache: Optional[Cache]):
+    """
+    Sets the cache used by :func:`memoize` within the context
+    """
+    token = _active_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _active_cache.reset(token)
+
+
+def memoize(item: Any, name: str, version: str, compute: Callable[[], Any]) -> Any:
+    """
+    Returns the result of a computation from the active cache, computing and caching it if necessary.
+    Computes the result directly if there is no active cache, or the item cannot be cached.
+
+    Parameters
+    ----------
+    item
+        Object the result is computed for, identified by its cache_key property
+
+    name
+        Name of the computation
+
+    version
+        Version of the computation, which should change whenever its results would change
+
+    compute
+        Function which computes a JSON serializable result
+    """
+    cache = _active_cache.get()
+    key = getattr(item, "cache_key", None) if cache else None
+    if key is None:
+        return compute()
+
+    value = cache.get(key, name, version)
+    if value is None:
+        value = compute()
+        cache.set(key, name, version, value)
+
+    return value
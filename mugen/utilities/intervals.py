@@ -0,0 +1,97 @@
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Tuple
+
+"""
+Module for indexing intervals
+"""
+
+
+class IntervalIndex:
+    """
+    A set of intervals, stored as sorted, disjoint start and end arrays.
+    Supports overlap checks in O(log n) time.
+    """
+
+    starts: List[float]
+    ends: List[float]
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {list(self)}>"
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Tuple[float, float]]:
+        return zip(self.starts, self.ends)
+
+    @property
+    def total_length(self) -> float:
+        return sum(end - start for start, end in self)
+
+    def add(self, start: float, end: float):
+        """
+        Adds an interval, merging it with any intervals it overlaps or touches
+        """
+        # Intervals from first_index up to last_index overlap or touch the new interval
+        first_index = bisect_left(self.ends, start)
+        last_index = bisect_right(self.starts, end)
+
+        if first_index < last_index:
+            start = min(start, self.starts[first_index])
+            end = max(end, self.ends[last_index - 1])
+
+        self.starts[first_index:last_index] = [start]
+        self.ends[first_index:last_index] = [end]
+
+    def overlaps(self, start: float, end: float, gap: float = 0) -> bool:
+        """
+        Parameters
+        ----------
+        gap
+            Minimum distance from existing intervals, below which the interval counts as overlapping
+
+        Returns
+        -------
+        True if the interval overlaps any interval in the index, False otherwise
+        """
+        start -= gap
+        end += gap
+
+        # The first interval ending after the start is the only candidate for overlap
+        index = bisect_right(self.ends, start)
+
+        return index < len(self.starts) and self.starts[index] < end
+
+    def gaps(
+        self, start: float, end: float, gap: float = 0
+    ) -> List[Tuple[float, float]]:
+        """
+        Parameters
+        ----------
+        gap
+            Minimum distance from existing intervals, which is excluded from the gaps
+
+        Returns
+        -------
+        The portions of the interval from start to end which do not overlap any interval in the index
+        """
+        gaps = []
+        # Intervals before first_index end before the start, and cannot affect the gaps
+        first_index = bisect_right(self.ends, start - gap)
+        for index in range(first_index, len(self.starts)):
+            interval_start = self.starts[index] - gap
+            if interval_start >= end:
+                break
+
+            if interval_start > start:
+                gaps.append((start, interval_start))
+            start = max(start, self.ends[index] + gap)
+
+        if start < end:
+            gaps.append((start, end))
+
+        return gaps
@@ -0,0 +1,79 @@
+import random
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+import dill
+import numpy
+
+"""
+Module for running work across processes.
+
+Payloads are serialized with dill rather than pickle so that moviepy clips,
+whose frame functions are closures, can be sent to and from worker processes.
+"""
+
+
+def create_process_pool(
+    workers: int, initializer: Optional[Callable[..., Any]] = None, *initargs
+) -> ProcessPoolExecutor:
+    """
+    Parameters
+    ----------
+    workers
+        Number of worker processes
+
+    initializer
+        Function to run in each worker process on startup, with initargs
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_initialize_worker,
+        initargs=(dill.dumps((initializer, initargs)),),
+    )
+
+
+def submit(executor: Executor, function: Callable[..., Any], *args, **kwargs) -> Future:
+    """
+    Submits a function call to an executor, serializing the call and its result with dill
+
+    Returns
+    -------
+    A future for the deserialized result of the function call, which cancels the call when cancelled
+    """
+    future = Future()
+    serialized_future = executor.submit(
+        _call_serialized_function, dill.dumps((function, args, kwargs))
+    )
+
+    def _set_result(serialized_future: Future):
+        if future.cancelled():
+            return
+        elif serialized_future.cancelled():
+            future.cancel()
+        elif serialized_future.exception() is not None:
+            future.set_exception(serialized_future.exception())
+        else:
+            future.set_result(dill.loads(serialized_future.result()))
+
+    serialized_future.add_done_callback(_set_result)
+    # Cancel the call too if it has not started, since executors only cancel calls themselves while still referenced
+    future.add_done_callback(
+        lambda future: serialized_future.cancel() if future.cancelled() else None
+    )
+
+    return future
+
+
+def _initialize_worker(serialized_initializer: bytes):
+    # Forked workers inherit the parent's random state, and would otherwise all draw the same samples
+    random.seed()
+    numpy.random.seed()
+
+    initializer, initargs = dill.loads(serialized_initializer)
+    if initializer:
+        initializer(*initargs)
+
+
+def _call_serialized_function(serialized_call: bytes) -> bytes:
+    function, args, kwargs = dill.loads(serialized_call)
+    return dill.dumps(function(*args, **kwargs))
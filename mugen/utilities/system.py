@@ -30,24 +30,28 @@ def recreate_directory(*directories):
         os.makedirs(directory)
 
 
-def _list_directory(path, include_hidden=False):
-    for file in os.listdir(path):
-        if not include_hidden and file.startswith("."):
-            continue
-        yield os.path.join(path, file)
+def list_directory_files(directory: str) -> List[str]:
+    """
+    Returns
+    -------
+    A sorted list of all files found in the directory, excluding hidden files
+    """
+    with os.scandir(directory) as entries:
+        return sorted(
+            entry.path
+            for entry in entries
+            if not entry.name.startswith(".") and entry.is_file()
+        )
 
 
-def list_directory_files(directory: str) -> List[str]:
+def file_identity(file: str) -> str:
     """
     Returns
     -------
-    A list of all files found in the directory
+    A string identifying a file's content by its path, size, and modification time
     """
-    return [
-        item
-        for item in _list_directory(directory, include_hidden=False)
-        if os.path.isfile(item)
-    ]
+    stat = os.stat(file)
+    return f"{os.path.abspath(file)}:{stat.st_size}:{stat.st_mtime_ns}"
 
 
 def run_command(command) -> CompletedProcess:
@@ -1,26 +1,49 @@
-import operator
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
 from functools import wraps
 from typing import List, Optional
 
-from moviepy.editor import AudioFileClip, VideoClip
+import numpy
+from moviepy.editor import AudioClip, AudioFileClip, VideoClip
+from tqdm import tqdm
 
 from mugen.events.Event import Event
 from mugen.events.EventList import EventList
+from mugen.exceptions import ParameterError
 from mugen.mixins.Persistable import Persistable
-from mugen.utilities import location, system
+from mugen.utilities import location, parallel, system
 from mugen.utilities.system import use_temporary_file_fallback
 from mugen.video import sizing, transformation
+from mugen.video.effects import Crossfade
 from mugen.video.events import Cut
-from mugen.video.io import tracks
+from mugen.video.io import filter_graphs, tracks
 from mugen.video.io.tracks import SubtitleTrack
 from mugen.video.io.VideoWriter import VideoWriter
-from mugen.video.moviepy.CompositeVideoClip import CompositeVideoClip
+from mugen.video.moviepy.SequentialVideoClip import SequentialVideoClip
 from mugen.video.segments.Segment import Segment
+from mugen.video.segments.VideoSegment import VideoSegment
 from mugen.video.sizing import Dimensions
 
 SEGMENTS_DIRECTORY = "video_segments"
 REJECTED_SEGMENTS_DIRECTORY = "rejected_video_segments"
+SEGMENT_FILE_EXTENSION = ".mp4"
+DEFAULT_SEGMENT_WORKERS = 4
+
+
+class RenderBackend(str, Enum):
+    """
+    Method of rendering music videos to video files
+
+    moviepy: Compose the music video with moviepy, decoding every frame through Python.
+    Supports all segments and effects
+    ffmpeg: Render the music video entirely within ffmpeg, using filter graphs.
+    Supports only video segments with fades and crossfades
+    """
+
+    MOVIEPY = "moviepy"
+    FFMPEG = "ffmpeg"
 
 
 def requires_video_segments(func):
@@ -131,17 +154,9 @@ class MusicVideo(Persistable):
         -------
         The largest dimensions available for the music video's aspect ratio
         """
-        if self.aspect_ratio:
-            dimensions = sizing.largest_dimensions_for_aspect_ratio(
-                [segment.dimensions for segment in self.segments], self.aspect_ratio
-            )
-        else:
-            dimensions = max(
-                [segment.dimensions for segment in self.segments],
-                key=operator.attrgetter("resolution"),
-            )
-
-        return dimensions
+        return sizing.largest_dimensions(
+            [segment.dimensions for segment in self.segments], self.aspect_ratio
+        )
 
     @requires_video_segments
     def compose(self) -> VideoClip:
@@ -164,7 +179,7 @@ class MusicVideo(Persistable):
             segment = transformation.apply_contextual_effects(segment, previous_segment)
             composite_video_segments.append(segment)
 
-        music_video = CompositeVideoClip(composite_video_segments)
+        music_video = SequentialVideoClip(composite_video_segments)
 
         if self.audio_file:
             music_video.audio = AudioFileClip(self.audio_file)
@@ -174,7 +189,12 @@ class MusicVideo(Persistable):
     @requires_video_segments
     @use_temporary_file_fallback("output_path", VideoWriter.DEFAULT_VIDEO_EXTENSION)
     def write_to_video_file(
-        self, output_path: Optional[str] = None, *, show_progress: bool = True
+        self,
+        output_path: Optional[str] = None,
+        *,
+        workers: Optional[int] = None,
+        backend: RenderBackend = RenderBackend.MOVIEPY,
+        show_progress: bool = True,
     ):
         """
         writes the music video to a video file
@@ -184,22 +204,255 @@ class MusicVideo(Persistable):
         output_path
             Path for the video file
 
+        workers
+            Number of worker processes to render the music video with.
+            The music video is split at cuts into a chunk for each worker, and the chunks are joined without re-encoding.
+            Defaults to rendering the music video in the current process.
+            With the ffmpeg backend, sets the number of ffmpeg processes to run at once instead
+
+        backend
+            Method of rendering the music video. See :class:`RenderBackend`
+
         show_progress
             Whether to output progress information to stdout
 
         Use this method over moviepy's write_videofile to preserve the audio file's codec and bitrate.
         """
+        if backend == RenderBackend.FFMPEG:
+            temp_output_path = self._write_with_ffmpeg(
+                workers or 1, show_progress=show_progress
+            )
+            self._add_subtitle_tracks(temp_output_path, output_path)
+
+            return output_path
+
         composed_music_video = self.compose()
 
-        temp_output_path = self.writer.write_video_clip_to_file(
-            composed_music_video,
-            audio=self.audio_file if self.audio_file else True,
-            show_progress=show_progress,
-        )
+        if workers and workers > 1:
+            temp_output_path = self._write_in_chunks(
+                composed_music_video, workers, show_progress=show_progress
+            )
+        else:
+            temp_output_path = self.writer.write_video_clip_to_file(
+                composed_music_video,
+                audio=self.audio_file if self.audio_file else True,
+                show_progress=show_progress,
+            )
         self._add_subtitle_tracks(temp_output_path, output_path)
 
         return output_path
 
+    def _write_in_chunks(
+        self, composed_music_video: VideoClip, workers: int, *, show_progress: bool
+    ) -> str:
+        """
+        Writes the composed music video to a video file in chunks, rendering each chunk in a separate worker process
+
+        Returns
+        -------
+        Path to the video file
+        """
+        fps = composed_music_video.fps or Segment.DEFAULT_VIDEO_FPS
+        chunk_boundaries = self._get_chunk_boundaries(workers, fps)
+
+        # Audio is written whole, as audio frames do not line up with video frames at chunk boundaries
+        audio_file = self.audio_file
+        if not audio_file and composed_music_video.audio:
+            audio_file = self.writer.write_audio_clip_to_file(
+                composed_music_video.audio
+            )
+
+        # Composed clips hold open readers which cannot be sent to workers, so each worker composes its own
+        with tempfile.TemporaryDirectory() as directory, parallel.create_process_pool(
+            workers, _initialize_chunk_worker, self
+        ) as pool:
+            futures = [
+                parallel.submit(
+                    pool,
+                    _write_chunk_in_worker,
+                    start,
+                    # End half a frame early, so that rounding errors never add a frame to the chunk
+                    end - 0.5 / fps,
+                    os.path.join(
+                        directory, f"{index}{VideoWriter.DEFAULT_VIDEO_EXTENSION}"
+                    ),
+                )
+                for index, (start, end) in enumerate(
+                    zip(chunk_boundaries, chunk_boundaries[1:])
+                )
+            ]
+            chunk_files = [
+                future.result() for future in tqdm(futures, disable=not show_progress)
+            ]
+
+            return self.writer.concatenate_video_files(
+                chunk_files, audio_file=audio_file
+            )
+
+    def _write_with_ffmpeg(self, workers: int, *, show_progress: bool) -> str:
+        """
+        Renders the music video entirely within ffmpeg.
+        The music video is split at hard cuts into groups of segments, which are each rendered with a filter graph
+        and joined without re-encoding the video.
+
+        Returns
+        -------
+        Path to the video file
+        """
+        if not filter_graphs.supports_segments(self.segments):
+            raise ParameterError(
+                "The ffmpeg backend only supports video segments with fades and crossfades."
+            )
+
+        fps = max(segment.fps for segment in self.segments)
+        audio = not self.audio_file
+        groups = filter_graphs.get_timeline_groups(self.segments, fps)
+
+        def write_group(items: List[filter_graphs.TimelineItem], output_path: str):
+            input_arguments, filter_graph = filter_graphs.build_filter_graph(
+                items, self.dimensions, fps, audio=audio
+            )
+            return self.writer.write_filter_graph_to_file(
+                input_arguments,
+                filter_graph,
+                output_path,
+                audio=audio,
+                audio_codec=VideoWriter.INTERMEDIATE_AUDIO_CODEC,
+            )
+
+        with tempfile.TemporaryDirectory() as directory, ThreadPoolExecutor(
+            max_workers=workers
+        ) as executor:
+            futures = [
+                executor.submit(
+                    write_group,
+                    items,
+                    os.path.join(
+                        directory, f"{index}{VideoWriter.DEFAULT_VIDEO_EXTENSION}"
+                    ),
+                )
+                for index, items in enumerate(groups)
+            ]
+            group_files = [
+                future.result() for future in tqdm(futures, disable=not show_progress)
+            ]
+
+            if self.audio_file:
+                return self.writer.concatenate_video_files(
+                    group_files, audio_file=self.audio_file
+                )
+
+            # Audio is joined uncompressed, then encoded whole, so that no gaps are added between groups
+            return self.writer.encode_audio(
+                self.writer.concatenate_video_files(group_files)
+            )
+
+    def _get_chunk_boundaries(self, chunks: int, fps: float) -> List[float]:
+        """
+        Returns
+        -------
+        Times to split the music video into roughly equal chunks at, including its start and end.
+        Chunks are split at cuts, rounded to the nearest frame.
+        """
+        cut_locations = self.cuts.locations
+        chunk_boundaries = [0]
+        for index in range(1, chunks):
+            if not cut_locations:
+                break
+
+            target_location = self.duration * index / chunks
+            boundary = min(
+                cut_locations, key=lambda location: abs(location - target_location)
+            )
+            boundary = round(boundary * fps) / fps
+            if chunk_boundaries[-1] < boundary < self.duration:
+                chunk_boundaries.append(boundary)
+        chunk_boundaries.append(self.duration)
+
+        return chunk_boundaries
+
+    def _write_segment_chunk(
+        self, segment: Segment, output_path: str, *, fps: float, start_time: float
+    ) -> str:
+        """
+        Writes a single segment of the music video to a video file, to be concatenated with the other segments.
+        Chunks from the same music video share dimensions, frame rate, and streams.
+
+        Parameters
+        ----------
+        segment
+            Segment to write, with its effects.
+            Effects which depend on the previous segment, such as crossfades, are not supported
+
+        output_path
+            Path for the video file
+
+        fps
+            Frame rate for the video file
+
+        start_time
+            Time the segment starts at in the music video.
+            The segment's length is rounded to whole frames from its position,
+            so that rounding errors do not build up over the music video.
+        """
+        if any(isinstance(effect, Crossfade) for effect in segment.effects):
+            raise ParameterError(
+                "Crossfades are not supported when writing segments separately."
+            )
+
+        frames = round((start_time + segment.duration) * fps) - round(start_time * fps)
+        segment = segment.set_duration(frames / fps)
+        audio_file_clip = None
+        if not self.audio_file and isinstance(segment, VideoSegment) and segment.audio:
+            # Segments of the same video file share an audio reader, so chunks written at once read their own
+            audio_file_clip = AudioFileClip(segment.file)
+            segment = segment.set_audio(
+                audio_file_clip.subclip(
+                    segment.source_start_time, segment.source_end_time
+                )
+            )
+        segment = transformation.crop_scale(segment, self.dimensions)
+        segment = transformation.apply_effects(segment)
+        segment = segment.set_fps(fps)
+        if not self.audio_file and segment.audio is None:
+            # Every chunk needs an audio stream to be concatenated with the others
+            segment = segment.set_audio(_get_silent_audio_clip(segment.duration))
+
+        try:
+            return self.writer.write_video_clip_to_file(
+                segment,
+                output_path,
+                audio=not self.audio_file,
+                # Audio is joined uncompressed, then encoded whole, so that no gaps are added between chunks
+                audio_codec=VideoWriter.INTERMEDIATE_AUDIO_CODEC,
+                show_progress=False,
+            )
+        finally:
+            if audio_file_clip:
+                audio_file_clip.close()
+
+    def _concatenate_chunks(self, chunk_files: List[str], output_path: str):
+        """
+        Joins video files written by _write_segment_chunk into the music video, with its audio and subtitle tracks
+
+        Parameters
+        ----------
+        chunk_files
+            Video files for each segment, in order
+
+        output_path
+            Path for the music video file
+        """
+        if self.audio_file:
+            temp_output_path = self.writer.concatenate_video_files(
+                chunk_files, audio_file=self.audio_file
+            )
+        else:
+            temp_output_path = self.writer.encode_audio(
+                self.writer.concatenate_video_files(chunk_files)
+            )
+        self._add_subtitle_tracks(temp_output_path, output_path)
+
     def _add_subtitle_tracks(self, video_file: str, output_path: str):
         """
         Adds metadata subtitle/audio tracks to the music video
@@ -224,7 +477,14 @@ class MusicVideo(Persistable):
         )
 
     @requires_video_segments
-    def write_video_segments(self, directory: str, show_progress: bool = True):
+    def write_video_segments(
+        self,
+        directory: str,
+        show_progress: bool = True,
+        *,
+        scale: bool = True,
+        workers: int = DEFAULT_SEGMENT_WORKERS,
+    ):
         """
         Saves the music video's individual video segments to video files in the specified directory
 
@@ -235,14 +495,30 @@ class MusicVideo(Persistable):
 
         show_progress
             Whether to output progress information to stdout
+
+        scale
+            Whether to crop and scale the video segments to the music video's dimensions.
+            Video segments which need no cropping or scaling are cut from their video files without re-encoding
+
+        workers
+            Maximum number of video segments to write at once
         """
         self._write_video_segments(
             self.segments,
             os.path.join(directory, SEGMENTS_DIRECTORY),
             show_progress=show_progress,
+            scale=scale,
+            workers=workers,
         )
 
-    def write_rejected_video_segments(self, directory: str, show_progress: bool = True):
+    def write_rejected_video_segments(
+        self,
+        directory: str,
+        show_progress: bool = True,
+        *,
+        scale: bool = True,
+        workers: int = DEFAULT_SEGMENT_WORKERS,
+    ):
         """
         Saves the music video's rejected video segments to video files in the specified directory
 
@@ -253,28 +529,38 @@ class MusicVideo(Persistable):
 
         show_progress
             Whether to output progress information to stdout
+
+        scale
+            Whether to crop and scale the video segments to the music video's dimensions.
+            Video segments which need no cropping or scaling are cut from their video files without re-encoding
+
+        workers
+            Maximum number of video segments to write at once
         """
-        failed_filter_names = {
-            filter.name
-            for segment in self.rejected_segments
-            for filter in segment.failed_filters
-        }
-        rejected_video_segments_by_filter_name = dict().fromkeys(
-            failed_filter_names, []
-        )
+        rejected_video_segments_by_filter_name = {}
         for segment in self.rejected_segments:
             for filter in segment.failed_filters:
-                rejected_video_segments_by_filter_name[filter.name].append(segment)
+                rejected_video_segments_by_filter_name.setdefault(
+                    filter.name, []
+                ).append(segment)
 
         for filter_name, segments in rejected_video_segments_by_filter_name.items():
             self._write_video_segments(
                 segments,
                 os.path.join(directory, REJECTED_SEGMENTS_DIRECTORY, filter_name),
                 show_progress=show_progress,
+                scale=scale,
+                workers=workers,
             )
 
     def _write_video_segments(
-        self, segments: List[Segment], directory: str, show_progress: bool = True
+        self,
+        segments: List[Segment],
+        directory: str,
+        show_progress: bool = True,
+        *,
+        scale: bool = True,
+        workers: int = DEFAULT_SEGMENT_WORKERS,
     ):
         """
         Saves video segments to the specified directory
@@ -286,11 +572,82 @@ class MusicVideo(Persistable):
 
         directory
             location to save video segments
+
+        scale
+            Whether to crop and scale the video segments to the music video's dimensions
+
+        workers
+            Maximum number of video segments to write at once.
+            Video segments which are re-encoded are written in worker processes
         """
         system.recreate_directory(directory)
-        segments = [
-            transformation.crop_scale(segment, self.dimensions) for segment in segments
-        ]
-        self.writer.write_video_clips_to_directory(
-            segments, directory, file_extension=".mp4", show_progress=show_progress
+        dimensions = self.dimensions if scale else None
+
+        copied_segments = []
+        encoded_segments = []
+        encoded_segment_paths = []
+        for index, segment in enumerate(segments):
+            if isinstance(segment, VideoSegment) and (
+                dimensions is None or segment.dimensions == dimensions
+            ):
+                # Keep the video file's container, which is known to support its codecs
+                extension = os.path.splitext(segment.file)[1]
+                copied_segments.append(
+                    (segment, os.path.join(directory, f"{index}{extension}"))
+                )
+            else:
+                if dimensions is not None:
+                    segment = transformation.crop_scale(segment, dimensions)
+                encoded_segments.append(segment)
+                encoded_segment_paths.append(
+                    os.path.join(directory, f"{index}{SEGMENT_FILE_EXTENSION}")
+                )
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    self.writer.extract_video_file_segment,
+                    segment.file,
+                    segment.source_start_time,
+                    segment.duration,
+                    output_path,
+                )
+                for segment, output_path in copied_segments
+            ]
+            for future in futures:
+                future.result()
+
+        self.writer.write_video_clips_to_files(
+            encoded_segments,
+            encoded_segment_paths,
+            workers=workers,
+            show_progress=show_progress,
         )
+
+
+def _get_silent_audio_clip(duration: float) -> AudioClip:
+    return AudioClip(
+        lambda t: numpy.zeros((len(t), 2)) if isinstance(t, numpy.ndarray) else [0, 0],
+        duration=duration,
+        fps=44100,
+    )
+
+
+_worker_music_video: Optional[MusicVideo] = None
+_worker_composed_music_video: Optional[VideoClip] = None
+
+
+def _initialize_chunk_worker(music_video: MusicVideo):
+    global _worker_music_video, _worker_composed_music_video
+
+    _worker_music_video = music_video
+    _worker_composed_music_video = music_video.compose().without_audio()
+
+
+def _write_chunk_in_worker(start: float, end: float, output_path: str) -> str:
+    return _worker_music_video.writer.write_video_clip_to_file(
+        _worker_composed_music_video.subclip(start, end),
+        output_path,
+        audio=False,
+        show_progress=False,
+    )
@@ -1,5 +1,9 @@
 import copy
-from typing import Any, List, Optional, Union
+import os
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from tqdm import tqdm
 
@@ -7,16 +11,32 @@ from mugen.audio.Audio import Audio
 from mugen.audio.utilities import create_marked_audio_file, mark_audio_file
 from mugen.constants import TIME_FORMAT
 from mugen.events.EventList import EventList
-from mugen.exceptions import MugenError, ParameterError
+from mugen.exceptions import MugenError, ParameterError, SamplingError
 from mugen.mixins.Filterable import ContextFilter, Filter
+from mugen.utilities import parallel
+from mugen.utilities.cache import Cache
 from mugen.utilities.conversion import convert_time_to_seconds
 from mugen.utilities.system import use_temporary_file_fallback
+from mugen.video import sizing
+from mugen.video.effects import VideoEffect
 from mugen.video.filters import DEFAULT_VIDEO_FILTERS, VideoFilter
+from mugen.video.io.VideoWriter import VideoWriter
 from mugen.video.MusicVideo import MusicVideo
+from mugen.video.segments.ClaimedFootage import ClaimedFootage
 from mugen.video.segments.ColorSegment import ColorSegment
+from mugen.video.segments.FootageLedger import FootageLedger
+from mugen.video.segments.Segment import Segment
+from mugen.video.segments.UsedFootage import UsedFootage
 from mugen.video.segments.VideoSegment import VideoSegment
+from mugen.video.sizing import Dimensions
 from mugen.video.sources.SourceSampler import SourceSampler
-from mugen.video.sources.VideoSource import VideoSource, VideoSourceList
+from mugen.video.sources.VideoSource import (
+    SamplingStrategy,
+    VideoSource,
+    VideoSourceList,
+)
+
+DEFAULT_ENCODING_WORKERS = 4
 
 
 class MusicVideoGenerator:
@@ -46,6 +66,42 @@ class MusicVideoGenerator:
         Custom video filters to use in addition to video_filters.
         Allows functions wrapped by :class:`~mugen.mixins.Filterable.Filter` or
         :class:`~mugen.mixins.Filterable.ContextFilter`
+
+    video_filter_options
+        Options to pass to video filters, by video filter name.
+        e.g. {"not_has_text": {"prescreen": False}}
+
+    workers
+        Number of worker processes to sample and filter video segments with.
+        Content filters run in the workers, while context filters such as is_repeat
+        are applied centrally in order, so results match those of serial generation.
+        Defaults to generating serially in the current process
+
+    sampling_batch_size
+        Number of candidate segments to sample and evaluate concurrently for each duration.
+        Useful for sources where many segments are rejected, e.g. those with lots of on-screen text
+
+    max_sampling_attempts
+        Maximum number of candidate segments to sample for each duration before giving up
+        with a :class:`~mugen.exceptions.SamplingError`. Defaults to sampling until a segment passes
+
+    minimum_repeat_gap
+        Minimum time (seconds) between segments from the same video file.
+        Segments closer than this to a segment already used are rejected by the is_repeat filter
+
+    sampling_strategy
+        Method of choosing start times when sampling from video sources.
+        See :class:`~mugen.video.sources.VideoSource.SamplingStrategy` for supported values.
+        Defaults to each video source's own sampling strategy
+
+    footage_ledger
+        Used footage shared with other music video generators, e.g. those running in other processes.
+        Footage used by any generator sharing the ledger is rejected by the is_repeat filter,
+        and avoided by the coverage sampling strategy. Defaults to only avoiding footage used in this music video
+
+    cache
+        Persistent cache for video filter results, which speeds up generating music videos
+        from the same video sources repeatedly. Defaults to no caching
     """
 
     audio: Audio
@@ -56,6 +112,14 @@ class MusicVideoGenerator:
     exclude_video_filters: Optional[List[str]]
     include_video_filters: Optional[List[str]]
     custom_video_filters: Optional[List[Filter]]
+    video_filter_options: Optional[Dict[str, Dict[str, Any]]]
+    workers: Optional[int]
+    sampling_batch_size: int
+    max_sampling_attempts: Optional[int]
+    minimum_repeat_gap: float
+    sampling_strategy: Optional[SamplingStrategy]
+    footage_ledger: Optional[FootageLedger]
+    cache: Optional[Cache]
 
     @convert_time_to_seconds(["duration"])
     def __init__(
@@ -95,6 +159,14 @@ class MusicVideoGenerator:
         self.exclude_video_filters = None
         self.include_video_filters = None
         self.custom_video_filters = None
+        self.video_filter_options = None
+        self.workers = None
+        self.sampling_batch_size = 1
+        self.max_sampling_attempts = None
+        self.minimum_repeat_gap = 0
+        self.sampling_strategy = None
+        self.footage_ledger = None
+        self.cache = None
 
     @property
     def video_filters(self):
@@ -120,7 +192,19 @@ class MusicVideoGenerator:
         compiled_video_filters = self.collect_video_filters(video_filter_names)
         compiled_video_filters.extend(custom_video_filters)
 
-        return compiled_video_filters
+        video_filter_options = self.video_filter_options or {}
+        for name in video_filter_options:
+            if name not in [
+                video_filter.name for video_filter in compiled_video_filters
+            ]:
+                raise ValueError(f"Options given for unused video filter {name}")
+
+        return [
+            video_filter.with_options(**video_filter_options[video_filter.name])
+            if video_filter.name in video_filter_options
+            else video_filter
+            for video_filter in compiled_video_filters
+        ]
 
     @video_filters.setter
     def video_filters(self, value: EventList):
@@ -180,9 +264,164 @@ class MusicVideoGenerator:
 
         return music_video
 
+    def write_from_events(
+        self,
+        events: Union[EventList, List[TIME_FORMAT]],
+        output_path: str,
+        *,
+        dimensions: Optional[Dimensions] = None,
+        aspect_ratio: Optional[float] = None,
+        writer: Optional[VideoWriter] = None,
+        opening_effects: Optional[List[VideoEffect]] = None,
+        closing_effects: Optional[List[VideoEffect]] = None,
+        use_original_audio: bool = False,
+        encoding_workers: int = DEFAULT_ENCODING_WORKERS,
+        show_progress: bool = True,
+    ) -> MusicVideo:
+        """
+        Generates a MusicVideo from a list of events and writes it to a video file,
+        encoding each segment as soon as it is sampled and joining the encoded segments at the end.
+        Encoding overlaps with sampling, so this is faster than generating the music video and then writing it.
+
+        Parameters
+        ----------
+        events
+            Events corresponding to cuts which occur in the music video.
+            Either a list of events or event locations.
+
+        output_path
+            Path for the video file
+
+        dimensions
+            Width and height for the music video.
+            Defaults to the largest dimensions among the video sources, as segments are written before all are sampled
+
+        aspect_ratio
+            Aspect ratio for the music video (Overruled by dimensions)
+
+        writer
+            Writer with the settings to encode segments with. Defaults to the default writer settings
+
+        opening_effects
+            Effects to add to the first segment. Crossfades are not supported
+
+        closing_effects
+            Effects to add to the last segment. Crossfades are not supported
+
+        use_original_audio
+            Whether to use the original audio from the video segments instead of the generator's audio
+
+        encoding_workers
+            Number of segments to encode at once
+
+        show_progress
+            Whether to output progress information to stdout
+
+        Returns
+        -------
+        The written music video
+        """
+        if not isinstance(events, EventList):
+            events = EventList(events, end=self.duration)
+
+        music_video = MusicVideo(
+            [], self.audio.file if self.audio and not use_original_audio else None
+        )
+        music_video.events = events
+        music_video.rejected_segments = []
+        music_video.aspect_ratio = aspect_ratio
+        music_video.dimensions = dimensions or self._get_video_source_dimensions(
+            aspect_ratio
+        )
+        if writer:
+            music_video.writer = writer
+        fps = self._get_video_source_fps()
+
+        with tempfile.TemporaryDirectory() as directory, ThreadPoolExecutor(
+            max_workers=encoding_workers
+        ) as executor:
+            chunk_futures = []
+            chunk_start_time = 0
+
+            def write_chunk(segment: VideoSegment):
+                nonlocal chunk_start_time
+
+                chunk_file = os.path.join(
+                    directory,
+                    f"{len(chunk_futures)}{VideoWriter.DEFAULT_VIDEO_EXTENSION}",
+                )
+                chunk_futures.append(
+                    executor.submit(
+                        music_video._write_segment_chunk,
+                        segment,
+                        chunk_file,
+                        fps=fps,
+                        start_time=chunk_start_time,
+                    )
+                )
+                chunk_start_time += segment.duration
+
+            # Each segment is written once the next segment is sampled, so that the last segment is known
+            previous_segment = None
+            for segment in tqdm(
+                self.iter_segments(
+                    events, rejected_segments=music_video.rejected_segments
+                ),
+                total=len(events.segment_durations),
+                disable=not show_progress,
+            ):
+                if previous_segment is None:
+                    segment.effects = [*segment.effects, *(opening_effects or [])]
+                else:
+                    write_chunk(previous_segment)
+                music_video.segments.append(segment)
+                previous_segment = segment
+            if previous_segment is None:
+                raise ValueError(
+                    "MusicVideoGenerator's write_from_events method requires one or more segments."
+                )
+            previous_segment.effects = [
+                *previous_segment.effects,
+                *(closing_effects or []),
+            ]
+            write_chunk(previous_segment)
+
+            chunk_files = [chunk_future.result() for chunk_future in chunk_futures]
+            music_video._concatenate_chunks(chunk_files, output_path)
+
+        return music_video
+
+    def iter_segments(
+        self,
+        events: Union[EventList, List[TIME_FORMAT]],
+        *,
+        rejected_segments: Optional[List[VideoSegment]] = None,
+    ) -> Iterator[VideoSegment]:
+        """
+        Samples video segments for a list of events, yielding each segment in order as soon as it passes all filters.
+        Useful for starting work on early segments while later segments are still being sampled.
+        Closing the iterator stops sampling any remaining segments.
+
+        Parameters
+        ----------
+        events
+            Events corresponding to cuts which occur in the music video.
+            Either a list of events or event locations.
+
+        rejected_segments
+            List to add segments which fail filters to, as they are rejected
+        """
+        if not isinstance(events, EventList):
+            events = EventList(events, end=self.duration)
+
+        yield from self._iter_music_video_segments(
+            events.segment_durations,
+            rejected_segments if rejected_segments is not None else [],
+        )
+
     def _generate_music_video_segments(
         self, durations: List[float], *, show_progress: bool = True
-    ) -> List[VideoSegment]:
+    ) -> Tuple[List[VideoSegment], List[VideoSegment]]:
         """
         Generates a list of sampled video segments which pass all trait filters
 
@@ -196,27 +435,243 @@ class MusicVideoGenerator:
 
         Returns
         -------
-        Sampled video segments
+        Sampled video segments, and rejected video segments
         """
-        video_segments = []
         rejected_video_segments = []
-        source_sampler = SourceSampler(self.video_sources)
+        video_segments = list(
+            tqdm(
+                self._iter_music_video_segments(durations, rejected_video_segments),
+                total=len(durations),
+                disable=not show_progress,
+            )
+        )
+
+        return video_segments, rejected_video_segments
+
+    def _iter_music_video_segments(
+        self, durations: List[float], rejected_video_segments: List[VideoSegment]
+    ) -> Iterator[VideoSegment]:
+        """
+        Samples video segments which pass all trait filters, yielding them in order of their durations
+
+        Parameters
+        ----------
+        durations
+            durations for each sampled video segment
+
+        rejected_video_segments
+            List to add rejected video segments to
+        """
+        if self.footage_ledger is not None:
+            used_footage = self.footage_ledger
+            used_footage.minimum_gap = self.minimum_repeat_gap
+        else:
+            used_footage = UsedFootage(minimum_gap=self.minimum_repeat_gap)
+        source_sampler = SourceSampler(
+            self.video_sources,
+            sampling_strategy=self.sampling_strategy,
+            used_footage=used_footage,
+        )
         video_filters = copy.deepcopy(self.video_filters)
 
         # Set memory for all ContextFilters
         for video_filter in video_filters:
             if isinstance(video_filter, ContextFilter) and video_filter.memory is None:
-                video_filter.memory = video_segments
-
-        for duration in tqdm(durations, disable=not show_progress):
-            (
-                next_video_segment,
-                next_rejected_video_segments,
-            ) = source_sampler.sample_with_filters(duration, video_filters)
-            video_segments.append(next_video_segment)
+                video_filter.memory = used_footage
+        # Footage shared with other generators may be used by them at any time, so reserve it before use
+        reserve_used_footage = self.footage_ledger is not None and any(
+            isinstance(video_filter, ContextFilter)
+            and video_filter.memory is used_footage
+            for video_filter in video_filters
+        )
+
+        sample_with_filters = self._get_sample_with_filters(
+            source_sampler, video_filters
+        )
+        if self.workers and self.workers > 1:
+            sampled_video_segments = self._sample_video_segments_in_parallel(
+                source_sampler, durations, video_filters
+            )
+        else:
+            sampled_video_segments = (
+                sample_with_filters(duration) for duration in durations
+            )
+
+        for duration, (next_video_segment, next_rejected_video_segments) in zip(
+            durations, sampled_video_segments
+        ):
             rejected_video_segments.extend(next_rejected_video_segments)
+            if reserve_used_footage:
+                while not used_footage.reserve(next_video_segment):
+                    # Another generator reserved overlapping footage after the segment was sampled
+                    rejected_video_segments.append(next_video_segment)
+                    (
+                        next_video_segment,
+                        next_rejected_video_segments,
+                    ) = sample_with_filters(duration)
+                    rejected_video_segments.extend(next_rejected_video_segments)
+            else:
+                used_footage.append(next_video_segment)
+
+            yield next_video_segment
+
+    def _sample_video_segments_in_parallel(
+        self,
+        source_sampler: SourceSampler,
+        durations: List[float],
+        video_filters: List[Filter],
+    ) -> Iterator[Tuple[VideoSegment, List[VideoSegment]]]:
+        """
+        Samples video segments across worker processes, yielding them in order of their durations
 
-        return video_segments, rejected_video_segments
+        Workers sample candidates which pass all content filters for every duration at once.
+        Candidates are then checked against context filters centrally, in order,
+        and replacements are sampled for any candidates which fail them.
+
+        With the coverage sampling strategy, candidates are instead sampled centrally,
+        avoiding used footage and each other, and workers only check them against content filters.
+        """
+        content_filters = [
+            video_filter
+            for video_filter in video_filters
+            if not isinstance(video_filter, ContextFilter)
+        ]
+        context_filters = [
+            video_filter
+            for video_filter in video_filters
+            if isinstance(video_filter, ContextFilter)
+        ]
+
+        if self._uses_coverage_sampling_strategy():
+            # Workers would otherwise avoid a stale copy of the used footage
+            claimed_footage = ClaimedFootage(source_sampler.used_footage)
+            claiming_source_sampler = copy.copy(source_sampler)
+            claiming_source_sampler.used_footage = claimed_footage
+
+            pool = parallel.create_process_pool(
+                self.workers, _initialize_filtering_worker, content_filters, self.cache
+            )
+
+            def submit_sample(duration: float) -> Future:
+                candidate = claiming_source_sampler.sample(duration)
+                claimed_footage.append(candidate)
+
+                return parallel.submit(pool, _apply_filters_in_worker, candidate)
+
+            release_sample = claimed_footage.release
+        else:
+            pool = parallel.create_process_pool(
+                self.workers,
+                _initialize_worker,
+                self._get_sample_with_filters(source_sampler, content_filters),
+            )
+
+            def submit_sample(duration: float) -> Future:
+                return parallel.submit(pool, _sample_with_filters_in_worker, duration)
+
+            def release_sample(video_segment: VideoSegment):
+                pass
+
+        futures = []
+        try:
+            futures += [submit_sample(duration) for duration in durations]
+            for index, duration in enumerate(durations):
+                rejected_video_segments = []
+                while True:
+                    video_segment, next_rejected_video_segments = futures[
+                        index
+                    ].result()
+                    rejected_video_segments.extend(next_rejected_video_segments)
+
+                    if not video_segment.failed_filters:
+                        video_segment.apply_filters(context_filters)
+                    if not video_segment.failed_filters:
+                        break
+
+                    rejected_video_segments.append(video_segment)
+                    release_sample(video_segment)
+                    if (
+                        self.max_sampling_attempts is not None
+                        and len(rejected_video_segments) >= self.max_sampling_attempts
+                    ):
+                        raise SamplingError(
+                            f"Failed to sample a segment with duration {duration} which passes filters "
+                            f"{[video_filter.name for video_filter in video_filters]} "
+                            f"after {len(rejected_video_segments)} attempts."
+                        )
+                    futures[index] = submit_sample(duration)
+
+                # Release the completed result, which may hold large numbers of segments
+                futures[index] = None
+
+                yield video_segment, rejected_video_segments
+        finally:
+            # Stop sampling remaining durations if the caller stops early, e.g. by closing the iterator
+            for future in futures:
+                if future:
+                    future.cancel()
+            pool.shutdown(wait=False)
+
+    def _uses_coverage_sampling_strategy(self) -> bool:
+        if self.sampling_strategy is not None:
+            return self.sampling_strategy == SamplingStrategy.COVERAGE
+
+        return any(
+            video_source.sampling_strategy == SamplingStrategy.COVERAGE
+            for video_source in self._get_flattened_video_sources()
+        )
+
+    def _get_video_source_dimensions(
+        self, aspect_ratio: Optional[float] = None
+    ) -> Dimensions:
+        """
+        Returns
+        -------
+        The largest dimensions among the video sources
+        """
+        video_sources = self._get_flattened_video_sources()
+        if not video_sources:
+            raise ParameterError(
+                "Dimensions are required for music videos without video file sources."
+            )
+
+        return sizing.largest_dimensions(
+            [video_source.dimensions for video_source in video_sources], aspect_ratio
+        )
+
+    def _get_video_source_fps(self) -> float:
+        """
+        Returns
+        -------
+        The highest frame rate among the video sources
+        """
+        return max(
+            [video_source.fps for video_source in self._get_flattened_video_sources()],
+            default=Segment.DEFAULT_VIDEO_FPS,
+        )
+
+    def _get_flattened_video_sources(self) -> List[VideoSource]:
+        return [
+            source
+            for source, _ in self.video_sources.flatten_weights()
+            if isinstance(source, VideoSource)
+        ]
+
+    def _get_sample_with_filters(
+        self, source_sampler: SourceSampler, video_filters: List[Filter]
+    ) -> Callable[[float], Tuple[VideoSegment, List[VideoSegment]]]:
+        """
+        Returns
+        -------
+        A function which samples a video segment for a duration with the generator's sampling options
+        """
+        return partial(
+            source_sampler.sample_with_filters,
+            filters=video_filters,
+            batch_size=self.sampling_batch_size,
+            max_attempts=self.max_sampling_attempts,
+            cache=self.cache,
+        )
 
     @use_temporary_file_fallback("output_path", ".mkv")
     def preview_from_events(self, events: Union[EventList, List[TIME_FORMAT]]):
@@ -262,3 +717,41 @@ class MusicVideoGenerator:
             )
 
         return marked_audio_file
+
+
+_worker_sample_with_filters: Optional[
+    Callable[[float], Tuple[VideoSegment, List[VideoSegment]]]
+] = None
+
+
+def _initialize_worker(
+    sample_with_filters: Callable[[float], Tuple[VideoSegment, List[VideoSegment]]]
+):
+    global _worker_sample_with_filters
+
+    _worker_sample_with_filters = sample_with_filters
+
+
+def _sample_with_filters_in_worker(
+    duration: float,
+) -> Tuple[VideoSegment, List[VideoSegment]]:
+    return _worker_sample_with_filters(duration)
+
+
+_worker_video_filters: Optional[List[Filter]] = None
+_worker_cache: Optional[Cache] = None
+
+
+def _initialize_filtering_worker(video_filters: List[Filter], cache: Optional[Cache]):
+    global _worker_video_filters, _worker_cache
+
+    _worker_video_filters = video_filters
+    _worker_cache = cache
+
+
+def _apply_filters_in_worker(
+    video_segment: VideoSegment,
+) -> Tuple[VideoSegment, List[VideoSegment]]:
+    video_segment.apply_filters(_worker_video_filters, cache=_worker_cache)
+
+    return video_segment, []
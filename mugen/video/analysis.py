@@ -0,0 +1,270 @@
+import hashlib
+import os
+import subprocess
+from typing import Dict, List, Optional
+
+import numpy
+
+from mugen.utilities import system
+from mugen.utilities.cache import CACHE_DIRECTORY
+
+"""
+Module for analyzing video files ahead of time, so that filters can look up
+measurements for any segment of a video instead of decoding its frames
+"""
+
+ANALYSIS_DIRECTORY = os.path.join(CACHE_DIRECTORY, "analysis")
+ANALYSIS_WIDTH = 160
+ANALYSIS_EXTENSION = ".npz"
+# Change this whenever analysis results would change
+ANALYSIS_VERSION = "1"
+TEXT_EDGE_THRESHOLD = 48
+
+# Frame indexes in memory for this process, by path
+_frame_indexes: Dict[str, "FrameIndex"] = {}
+
+
+class FrameIndex:
+    """
+    A compact index of per-frame measurements for a video file,
+    taken from a grayscale decode of the video at reduced resolution
+
+    Attributes
+    ----------
+    times
+        Time of each frame (seconds)
+
+    luma_minimums
+        Darkest luma value of each frame
+
+    luma_maximums
+        Brightest luma value of each frame
+
+    scene_scores
+        Mean absolute luma difference between each frame and the previous frame, in the range 0-1
+
+    text_scores
+        Likelihood that each frame contains text, in the range 0-1.
+        Measured as the density of sharp horizontal edges, which text strokes produce
+
+    path
+        Path of the index in the analysis cache, which identifies the index when video segments are pickled
+    """
+
+    times: numpy.ndarray
+    luma_minimums: numpy.ndarray
+    luma_maximums: numpy.ndarray
+    scene_scores: numpy.ndarray
+    text_scores: Optional[numpy.ndarray]
+    path: Optional[str]
+
+    def __init__(
+        self,
+        times: numpy.ndarray,
+        luma_minimums: numpy.ndarray,
+        luma_maximums: numpy.ndarray,
+        scene_scores: numpy.ndarray,
+        text_scores: Optional[numpy.ndarray] = None,
+        path: Optional[str] = None,
+    ):
+        self.times = times
+        self.luma_minimums = luma_minimums
+        self.luma_maximums = luma_maximums
+        self.scene_scores = scene_scores
+        self.text_scores = text_scores
+        self.path = path
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: frames: {len(self)}>"
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def luma_ranges(self) -> numpy.ndarray:
+        return self.luma_maximums.astype(int) - self.luma_minimums.astype(int)
+
+    def frame_at(self, time: float) -> int:
+        """
+        Returns
+        -------
+        Index of the frame showing at the given time
+        """
+        index = numpy.searchsorted(self.times, time, side="right") - 1
+        return int(numpy.clip(index, 0, len(self) - 1))
+
+    def frames_between(self, start: float, end: float) -> slice:
+        """
+        Returns
+        -------
+        A slice of the frames showing between the given times
+        """
+        return slice(self.frame_at(start), self.frame_at(end) + 1)
+
+    def save(self, path: str):
+        arrays = {
+            "times": self.times,
+            "luma_minimums": self.luma_minimums,
+            "luma_maximums": self.luma_maximums,
+            "scene_scores": self.scene_scores,
+        }
+        if self.text_scores is not None:
+            arrays["text_scores"] = self.text_scores
+
+        system.ensure_directory_exists(os.path.dirname(os.path.abspath(path)))
+        with open(path, "wb") as file:
+            numpy.savez_compressed(file, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "FrameIndex":
+        with numpy.load(path) as arrays:
+            return cls(
+                arrays["times"],
+                arrays["luma_minimums"],
+                arrays["luma_maximums"],
+                arrays["scene_scores"],
+                arrays["text_scores"] if "text_scores" in arrays else None,
+                path,
+            )
+
+
+def analyze_video_file(
+    file: str,
+    dimensions: tuple,
+    fps: float,
+    *,
+    width: int = ANALYSIS_WIDTH,
+    detect_text: bool = False,
+) -> FrameIndex:
+    """
+    Decodes a video file once at reduced resolution, building an index of per-frame measurements
+
+    Parameters
+    ----------
+    file
+        video file to analyze
+
+    dimensions
+        width and height of the video
+
+    fps
+        frame rate to decode the video at
+
+    width
+        width to decode the video at. Height is scaled to preserve the aspect ratio
+
+    detect_text
+        Whether to measure the likelihood that each frame contains text
+    """
+    video_width, video_height = dimensions
+    width = min(width, video_width)
+    # Round height to an even number, as required by most pixel formats
+    height = max(2, int(round(video_height * width / video_width / 2)) * 2)
+    frame_size = width * height
+
+    process = subprocess.Popen(
+        [
+            "ffmpeg",
+            "-v",
+            "quiet",
+            "-i",
+            file,
+            "-an",
+            "-sn",
+            "-vf",
+            f"fps={fps},scale={width}:{height}",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "gray",
+            "pipe:1",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+
+    luma_minimums = []
+    luma_maximums = []
+    scene_scores = []
+    text_scores = []
+    previous_frame = None
+    try:
+        while True:
+            buffer = process.stdout.read(frame_size)
+            if len(buffer) < frame_size:
+                break
+
+            frame = numpy.frombuffer(buffer, dtype=numpy.uint8).reshape(height, width)
+            luma_minimums.append(frame.min())
+            luma_maximums.append(frame.max())
+            scene_scores.append(
+                0
+                if previous_frame is None
+                else numpy.abs(frame.astype(numpy.int16) - previous_frame).mean() / 255
+            )
+            if detect_text:
+                text_scores.append(frame_text_score(frame))
+            previous_frame = frame.astype(numpy.int16)
+    finally:
+        process.stdout.close()
+        process.wait()
+
+    if not luma_minimums:
+        raise IOError(f"Failed to decode any frames from video file {file}")
+
+    return FrameIndex(
+        numpy.arange(len(luma_minimums), dtype=numpy.float64) / fps,
+        numpy.array(luma_minimums, dtype=numpy.uint8),
+        numpy.array(luma_maximums, dtype=numpy.uint8),
+        numpy.array(scene_scores, dtype=numpy.float32),
+        numpy.array(text_scores, dtype=numpy.float32) if detect_text else None,
+    )
+
+
+def frame_text_score(frame: numpy.ndarray) -> float:
+    """
+    Parameters
+    ----------
+    frame
+        A grayscale frame
+
+    Returns
+    -------
+    The density of sharp horizontal edges in the frame, in the range 0-1
+    """
+    horizontal_gradients = numpy.abs(numpy.diff(frame.astype(numpy.int16), axis=1))
+    return float((horizontal_gradients > TEXT_EDGE_THRESHOLD).mean())
+
+
+def get_analysis_path(file: str, options: List[str]) -> str:
+    """
+    Returns
+    -------
+    The path to store a video file's analysis at, unique to the file's content and analysis options
+    """
+    key = ":".join([system.file_identity(file), ANALYSIS_VERSION, *options])
+    return os.path.join(
+        ANALYSIS_DIRECTORY, hashlib.sha1(key.encode()).hexdigest() + ANALYSIS_EXTENSION
+    )
+
+
+def register_frame_index(frame_index: FrameIndex):
+    """
+    Keeps a frame index in memory by its path,
+    so that video segments can look it up when unpickled instead of carrying the index with them
+    """
+    _frame_indexes[frame_index.path] = frame_index
+
+
+def find_frame_index(path: str) -> Optional[FrameIndex]:
+    """
+    Returns
+    -------
+    The frame index with the given path, from memory or the analysis cache, or None if it cannot be found
+    """
+    frame_index = _frame_indexes.get(path)
+    if frame_index is None and os.path.exists(path):
+        frame_index = FrameIndex.load(path)
+        register_frame_index(frame_index)
+
+    return frame_index
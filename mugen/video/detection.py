@@ -1,28 +1,95 @@
 import json
+import os
 import re
-from typing import List
+import tempfile
+import threading
+from typing import List, Optional, Tuple, Union
 
+import numpy
 import pytesseract
-from moviepy.video.tools.cuts import detect_scenes
 from PIL import Image
 
 from mugen.constants import PLATFORM, Platform
-from mugen.utilities import system
+from mugen.utilities import cache, system
+from mugen.video.segments.UsedFootage import UsedFootage
 from mugen.video.segments.VideoSegment import VideoSegment
 
 LOW_CONTRAST_THRESHOLD = 45
+RELATIVE_CUT_DETECTION_THRESHOLD = 10
 FFPROBE_CUT_DETECTION_THRESHOLD = 0.09
+INDEX_CUT_DETECTION_THRESHOLD = 0.09
+INDEX_TEXT_SCORE_THRESHOLD = 0.005
+# Frames wider than this are downscaled before text detection
+TEXT_DETECTION_WIDTH = 1280
+TEXT_PRESCREEN_WIDTH = 640
+TEXT_PRESCREEN_EDGE_THRESHOLD = 48
+TEXT_PRESCREEN_ROW_EDGE_DENSITY_THRESHOLD = 0.02
 FILE_NAME_SPECIAL_CHARACTERS_REGEX = r"([:\\,;\'[\]])"
 
+# Versions for cached detection results. Change these whenever detection results would change.
+TEXT_DETECTION_VERSION = (
+    f"3:{TEXT_DETECTION_WIDTH}:{TEXT_PRESCREEN_WIDTH}:"
+    f"{TEXT_PRESCREEN_EDGE_THRESHOLD}:{TEXT_PRESCREEN_ROW_EDGE_DENSITY_THRESHOLD}"
+)
+LOW_CONTRAST_DETECTION_VERSION = f"1:{LOW_CONTRAST_THRESHOLD}"
+CUT_DETECTION_VERSION = (
+    f"2:{RELATIVE_CUT_DETECTION_THRESHOLD}:{FFPROBE_CUT_DETECTION_THRESHOLD}"
+)
+LUMA_RANGES_VERSION = "1"
+
+
+class TextDetectionCounts:
+    """
+    Counts of frames resolved at each stage of text detection in the current process
+
+    Attributes
+    ----------
+    prescreened_frames
+        Frames ruled out as having no text by the pre-screen
+
+    recognized_frames
+        Frames passed to OCR
+    """
+
+    prescreened_frames: int
+    recognized_frames: int
+    _lock: threading.Lock
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}: prescreened_frames: {self.prescreened_frames}, "
+            f"recognized_frames: {self.recognized_frames}>"
+        )
+
+    def add(self, *, prescreened_frames: int = 0, recognized_frames: int = 0):
+        with self._lock:
+            self.prescreened_frames += prescreened_frames
+            self.recognized_frames += recognized_frames
+
+    def reset(self):
+        self.prescreened_frames = 0
+        self.recognized_frames = 0
+
+
+text_detection_counts = TextDetectionCounts()
+
 
 def video_segment_is_repeat(
-    video_segment: VideoSegment, video_segments_used: List[VideoSegment]
+    video_segment: VideoSegment,
+    video_segments_used: Union[UsedFootage, List[VideoSegment]],
 ) -> bool:
     """
     Returns
     -------
     True if a video segment is a repeat of a video segment already used, False otherwise
     """
+    if isinstance(video_segments_used, UsedFootage):
+        return video_segments_used.overlaps_segment(video_segment)
+
     for used_segment in video_segments_used:
         if video_segment.overlaps_segment(used_segment):
             return True
@@ -36,65 +103,192 @@ def video_segment_has_cut(video_segment: VideoSegment) -> bool:
     -------
     True if a video segment has a cut between shots, False otherwise
     """
-    cut_is_detected_by_moviepy = check_if_moviepy_detects_cut(video_segment)
+    if video_segment.frame_index is not None:
+        return check_if_frame_index_detects_cut(video_segment)
+
+    return cache.memoize(
+        video_segment,
+        "cut",
+        CUT_DETECTION_VERSION,
+        lambda: video_segments_have_cuts([video_segment])[0],
+    )
+
+
+def video_segments_have_cuts(video_segments: List[VideoSegment]) -> List[bool]:
+    """
+    Detects cuts in a batch of video segments, with one ffprobe invocation per video file
 
-    # To reduce false positives, check if ffprobe agrees using a low threshold
-    cut_is_detected_by_ffprobe = False
-    if cut_is_detected_by_moviepy:
-        cut_is_detected_by_ffprobe = check_if_ffprobe_detects_cut(video_segment)
+    Returns
+    -------
+    For each video segment, True if the video segment has a cut between shots, False otherwise
+    """
+    indices_by_file = {}
+    for index, video_segment in enumerate(video_segments):
+        indices_by_file.setdefault(video_segment.file, []).append(index)
 
-    return cut_is_detected_by_moviepy and cut_is_detected_by_ffprobe
+    verdicts = [False] * len(video_segments)
+    for file, indices in indices_by_file.items():
+        time_ranges = [
+            (
+                video_segments[index].source_start_time,
+                video_segments[index].source_end_time,
+            )
+            for index in indices
+        ]
+        for index, scene_scores in zip(indices, get_scene_scores(file, time_ranges)):
+            # The first frame has no previous frame to compare against
+            verdicts[index] = check_if_scene_scores_detect_cut(scene_scores[1:])
 
+    return verdicts
 
-def check_if_moviepy_detects_cut(video_segment: VideoSegment) -> bool:
-    cuts, _ = detect_scenes(video_segment, logger=None)
-    return len(cuts) > 1
 
+def check_if_frame_index_detects_cut(video_segment: VideoSegment) -> bool:
+    frame_index = video_segment.frame_index
+    frames = frame_index.frames_between(
+        video_segment.source_start_time, video_segment.source_end_time
+    )
+    # The first frame's score measures the change from the frame before the segment
+    scene_scores = frame_index.scene_scores[frames][1:]
 
-def check_if_ffprobe_detects_cut(video_segment: VideoSegment) -> bool:
-    # Three backslash escapes for libav determined through trial and error
-    if PLATFORM == Platform.WINDOWS:
-        # Command does not work with single or double quotes on Windows, so we have to escape special characters manually
-        escaped_file_name = re.sub(
-            FILE_NAME_SPECIAL_CHARACTERS_REGEX,
-            r"\\\\\\\1",
-            video_segment.file,
-        )
-    else:
-        # Escape single quotes manually, and wrap in single quotes to escape all other special characters
-        escaped_file_name = video_segment.file.replace("'", r"'\\\''")
-        escaped_file_name = f"'{escaped_file_name}'"
+    return check_if_scene_scores_detect_cut(
+        scene_scores, absolute_threshold=INDEX_CUT_DETECTION_THRESHOLD
+    )
 
-    # It is important to use all of the options seek_point, trim start, and trim end/duration to precisely target the detection area
+
+def check_if_scene_scores_detect_cut(
+    scene_scores: numpy.ndarray,
+    *,
+    relative_threshold: float = RELATIVE_CUT_DETECTION_THRESHOLD,
+    absolute_threshold: float = FFPROBE_CUT_DETECTION_THRESHOLD,
+) -> bool:
+    """
+    Parameters
+    ----------
+    scene_scores
+        Amount of change between each frame and the previous frame, in the range 0-1
+
+    relative_threshold
+        Multiple of the average change, above which a change counts as a cut
+
+    absolute_threshold
+        Amount of change, above which a change counts as a cut
+
+    Returns
+    -------
+    True if any change between frames is above both thresholds, False otherwise
+    """
+    if len(scene_scores) == 0:
+        return False
+
+    # A large jump relative to the segment's average change, as used by moviepy's detect_scenes,
+    # catches cuts in still scenes, while a large absolute change avoids false positives in fast scenes
+    relative_jumps = scene_scores > relative_threshold * scene_scores.mean()
+    absolute_jumps = scene_scores > absolute_threshold
+
+    return bool(numpy.any(relative_jumps & absolute_jumps))
+
+
+def get_scene_scores(
+    file: str, time_ranges: List[Tuple[float, float]]
+) -> List[numpy.ndarray]:
+    """
+    Measures scene scores for time ranges of a video file in a single ffprobe invocation
+
+    Parameters
+    ----------
+    file
+        video file to measure
+
+    time_ranges
+        start and end times (seconds) to measure
+
+    Returns
+    -------
+    For each time range, ffmpeg's scene score for each frame, in the range 0-1
+    """
+    escaped_file_name = _escape_lavfi_file_name(file)
+
+    # It is important to use all of the options seek_point, trim start, and trim end to precisely target the detection area
     # seek_point makes the detection fast by skipping to the approximate start point
-    # trim start and end/duration keeps the start point and end points precise
+    # trim start and end keeps the start point and end points precise
+    # Each time range gets its own output stream, which ffprobe labels with a stream index
+    filter_graph = ";".join(
+        f"movie={escaped_file_name}:seek_point={start},trim=start={start}:end={end},"
+        f"select=gte(scene\\,0)[out{index}]"
+        for index, (start, end) in enumerate(time_ranges)
+    )
     result = system.run_command(
         [
             "ffprobe",
             "-print_format",
             "json",
-            "-show_frames",
+            "-show_entries",
+            "frame=stream_index:frame_tags=lavfi.scene_score",
             "-f",
             "lavfi",
-            f"movie={escaped_file_name}:seek_point={video_segment.source_start_time},trim={video_segment.source_start_time}:duration={video_segment.duration},select=gt(scene\\,{FFPROBE_CUT_DETECTION_THRESHOLD})",
+            filter_graph,
         ]
     )
-    frames = json.loads(result.stdout).get("frames", [])
 
-    return len(frames) > 0
+    scene_scores = [[] for _ in time_ranges]
+    for frame in json.loads(result.stdout).get("frames", []):
+        scene_score = frame.get("tags", {}).get("lavfi.scene_score")
+        if scene_score is not None:
+            scene_scores[frame.get("stream_index", 0)].append(float(scene_score))
+
+    return [numpy.array(scores, dtype=numpy.float32) for scores in scene_scores]
+
+
+def _escape_lavfi_file_name(file: str) -> str:
+    # Three backslash escapes for libav determined through trial and error
+    if PLATFORM == Platform.WINDOWS:
+        # Command does not work with single or double quotes on Windows, so we have to escape special characters manually
+        return re.sub(
+            FILE_NAME_SPECIAL_CHARACTERS_REGEX,
+            r"\\\\\\\1",
+            file,
+        )
+    else:
+        # Escape single quotes manually, and wrap in single quotes to escape all other special characters
+        escaped_file_name = file.replace("'", r"'\\\''")
+        return f"'{escaped_file_name}'"
 
 
-def video_segment_has_text(video_segment: VideoSegment) -> bool:
+def video_segment_has_text(
+    video_segment: VideoSegment,
+    *,
+    detection_width: Optional[int] = TEXT_DETECTION_WIDTH,
+    prescreen: bool = True,
+) -> bool:
     """
+    Parameters
+    ----------
+    detection_width
+        Width to downscale frames to before detecting text. None to detect text at full resolution
+
+    prescreen
+        Whether to rule out frames which clearly have no text before running OCR
+
     Returns
     -------
     True if a video segment has text, False otherwise
     """
-    for frame in video_segment.first_middle_last_frames:
-        if image_has_text(Image.fromarray(frame)):
-            return True
+    frame_index = video_segment.frame_index
+    if frame_index is not None and frame_index.text_scores is not None:
+        text_scores = frame_index.text_scores[
+            _get_first_middle_last_frame_indices(video_segment)
+        ]
+        # Frames with hardly any sharp edges cannot contain text, so only run OCR on the rest
+        if numpy.all(text_scores < INDEX_TEXT_SCORE_THRESHOLD):
+            return False
 
-    return False
+    images = [
+        Image.fromarray(frame) for frame in video_segment.first_middle_last_frames
+    ]
+
+    return any(
+        images_have_text(images, detection_width=detection_width, prescreen=prescreen)
+    )
 
 
 def video_segment_has_low_contrast(
@@ -105,26 +299,168 @@ def video_segment_has_low_contrast(
     -------
     True if a video segment has low contrast (solid color, dark scene, etc...), False otherwise
     """
-    for frame in video_segment.first_middle_last_frames:
-        if image_has_low_contrast(Image.fromarray(frame), *args, **kwargs):
-            return True
+    if video_segment.frame_index is not None:
+        luma_ranges = video_segment.frame_index.luma_ranges[
+            _get_first_middle_last_frame_indices(video_segment)
+        ]
+        return bool(numpy.any(luma_ranges <= LOW_CONTRAST_THRESHOLD))
 
-    return False
+    luma_ranges = cache.memoize(
+        video_segment,
+        "luma_ranges",
+        LUMA_RANGES_VERSION,
+        lambda: [
+            image_luma_range(Image.fromarray(frame))
+            for frame in video_segment.first_middle_last_frames
+        ],
+    )
+
+    return any(luma_range <= LOW_CONTRAST_THRESHOLD for luma_range in luma_ranges)
+
+
+def _get_first_middle_last_frame_indices(video_segment: VideoSegment) -> List[int]:
+    return [
+        video_segment.frame_index.frame_at(video_segment.source_start_time + time)
+        for time in [0, video_segment.duration / 2, video_segment.duration]
+    ]
 
 
-def image_has_text(image: Image):
+def image_has_text(
+    image: Image,
+    *,
+    detection_width: Optional[int] = TEXT_DETECTION_WIDTH,
+    prescreen: bool = True,
+) -> bool:
     """
     Parameters
     ----------
     image
         A Pillow image
 
+    detection_width
+        Width to downscale the image to before detecting text. None to detect text at full resolution
+
+    prescreen
+        Whether to rule out the image if it clearly has no text before running OCR
+
     Returns
     -------
     True if the image has text, False otherwise
     """
-    text = pytesseract.image_to_string(image)
-    return True if len(text.strip()) > 0 else False
+    return images_have_text(
+        [image], detection_width=detection_width, prescreen=prescreen
+    )[0]
+
+
+def images_have_text(
+    images: List[Image],
+    *,
+    detection_width: Optional[int] = TEXT_DETECTION_WIDTH,
+    prescreen: bool = True,
+) -> List[bool]:
+    """
+    Detects text in a batch of images with a single tesseract invocation,
+    avoiding the cost of starting tesseract and loading its models for each image
+
+    Parameters
+    ----------
+    images
+        Pillow images
+
+    detection_width
+        Width to downscale images to before detecting text. None to detect text at full resolution
+
+    prescreen
+        Whether to rule out images which clearly have no text before running OCR
+
+    Returns
+    -------
+    For each image, True if the image has text, False otherwise
+    """
+    verdicts = [False] * len(images)
+    if prescreen:
+        indices = [
+            index for index, image in enumerate(images) if image_could_have_text(image)
+        ]
+    else:
+        indices = list(range(len(images)))
+
+    text_detection_counts.add(
+        prescreened_frames=len(images) - len(indices), recognized_frames=len(indices)
+    )
+    for index, verdict in zip(
+        indices,
+        _recognize_text([images[index] for index in indices], detection_width),
+    ):
+        verdicts[index] = verdict
+
+    return verdicts
+
+
+def image_could_have_text(image: Image) -> bool:
+    """
+    A fast check for text which rules out images without rows of sharp edges, such as
+    solid colors and smooth gradients. Text strokes produce rows dense with sharp horizontal edges.
+
+    Parameters
+    ----------
+    image
+        A Pillow image
+
+    Returns
+    -------
+    False if the image clearly has no text, True if it might have text
+    """
+    frame = numpy.asarray(
+        downscale_image(image.convert("L"), TEXT_PRESCREEN_WIDTH), dtype=numpy.int16
+    )
+    edges = numpy.abs(numpy.diff(frame, axis=1)) > TEXT_PRESCREEN_EDGE_THRESHOLD
+    if edges.size == 0:
+        return False
+
+    row_edge_densities = edges.mean(axis=1)
+    return bool(row_edge_densities.max() > TEXT_PRESCREEN_ROW_EDGE_DENSITY_THRESHOLD)
+
+
+def _recognize_text(images: List[Image], detection_width: Optional[int]) -> List[bool]:
+    if not images:
+        return []
+
+    with tempfile.TemporaryDirectory() as directory:
+        image_files = []
+        for index, image in enumerate(images):
+            image_file = os.path.join(directory, f"{index}.png")
+            downscale_image(image, detection_width).save(image_file)
+            image_files.append(image_file)
+
+        # Tesseract reads a text file as a list of images
+        image_list_file = os.path.join(directory, "images.txt")
+        with open(image_list_file, "w") as file:
+            file.write("\n".join(image_files) + "\n")
+
+        result = system.run_command(
+            [pytesseract.pytesseract.tesseract_cmd, image_list_file, "stdout"]
+        )
+
+    # Tesseract ends the text of each image with a form feed
+    texts = result.stdout.split("\f")[: len(images)]
+    texts += [""] * (len(images) - len(texts))
+
+    return [len(text.strip()) > 0 for text in texts]
+
+
+def downscale_image(image: Image, width: Optional[int]) -> Image:
+    """
+    Returns
+    -------
+    The image downscaled to the given width, preserving its aspect ratio.
+    The image itself if it is no wider than the given width
+    """
+    if width is None or image.width <= width:
+        return image
+
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
 
 
 def image_has_low_contrast(image: Image) -> bool:
@@ -138,6 +474,20 @@ def image_has_low_contrast(image: Image) -> bool:
     -------
     True if the image has low contrast, False otherwise
     """
+    return True if image_luma_range(image) <= LOW_CONTRAST_THRESHOLD else False
+
+
+def image_luma_range(image: Image) -> int:
+    """
+    Parameters
+    ----------
+    image
+        A Pillow image
+
+    Returns
+    -------
+    The difference between the image's brightest and darkest luma values
+    """
     # Convert the image to grayscale, find the difference in luma
     extrema = image.convert("L").getextrema()
-    return True if abs(extrema[1] - extrema[0]) <= LOW_CONTRAST_THRESHOLD else False
+    return abs(extrema[1] - extrema[0])
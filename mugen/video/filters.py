@@ -10,8 +10,8 @@ def is_repeat(segment: Segment, memory: Any) -> bool:
     return detection.video_segment_is_repeat(segment, video_segments_used=memory)
 
 
-def has_text(segment: Segment) -> bool:
-    return detection.video_segment_has_text(segment)
+def has_text(segment: Segment, **options) -> bool:
+    return detection.video_segment_has_text(segment, **options)
 
 
 def has_cut(segment: Segment) -> bool:
@@ -44,7 +44,9 @@ class VideoFilter(Enum):
     ----------
     has_text
         video segment has detectable text (letters, words, numbers, etc...).
-        Supports foreign langauges
+        Supports foreign langauges.
+        Accepts the options detection_width and prescreen.
+        See :func:`~mugen.video.detection.video_segment_has_text`
 
     has_cut
         video segment has a detectable cut between shots
@@ -57,13 +59,17 @@ class VideoFilter(Enum):
     """
 
     # Content Filters
-    has_text = Filter(has_text)
-    has_cut = Filter(has_cut)
-    has_low_contrast = Filter(has_low_contrast)
-
-    not_has_text = Filter(not_has_text)
-    not_has_cut = Filter(not_has_cut)
-    not_has_low_contrast = Filter(not_has_low_contrast)
+    has_text = Filter(has_text, version=detection.TEXT_DETECTION_VERSION)
+    has_cut = Filter(has_cut, version=detection.CUT_DETECTION_VERSION)
+    has_low_contrast = Filter(
+        has_low_contrast, version=detection.LOW_CONTRAST_DETECTION_VERSION
+    )
+
+    not_has_text = Filter(not_has_text, version=detection.TEXT_DETECTION_VERSION)
+    not_has_cut = Filter(not_has_cut, version=detection.CUT_DETECTION_VERSION)
+    not_has_low_contrast = Filter(
+        not_has_low_contrast, version=detection.LOW_CONTRAST_DETECTION_VERSION
+    )
 
     # Context Filters
     is_repeat = ContextFilter(is_repeat)
@@ -0,0 +1,203 @@
+import atexit
+import copy
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Tuple
+
+from moviepy.video.io.ffmpeg_reader import FFMPEG_VideoReader
+
+from mugen.video.constants import LIST_3D
+
+# Readers can skip forward up to this many frames without restarting ffmpeg
+MAX_FRAMES_SKIPPED = 100
+
+
+class DecoderKey(NamedTuple):
+    """
+    Identifies readers which decode a video file the same way, and so can be shared
+    """
+
+    file: str
+    pix_fmt: str
+    size: Tuple[int, int]
+    resize_algo: str
+    fps_source: str
+
+
+class DecoderPool:
+    """
+    A bounded pool of video file readers shared by all video segments.
+
+    Frame requests are served by an idle reader already positioned at or shortly before the requested frame,
+    avoiding the new ffmpeg process a reader starts whenever it seeks backwards or far forwards.
+    Idle readers beyond the pool's limits are closed, least recently used first.
+
+    Attributes
+    ----------
+    max_readers
+        Maximum number of idle readers to keep open
+
+    max_readers_per_file
+        Maximum number of idle readers to keep open for each video file
+    """
+
+    max_readers: int
+    max_readers_per_file: int
+    _templates: Dict[DecoderKey, FFMPEG_VideoReader]
+    _idle_readers: "OrderedDict[int, Tuple[DecoderKey, FFMPEG_VideoReader]]"
+    _lock: threading.Lock
+
+    def __init__(self, max_readers: int = 16, max_readers_per_file: int = 4):
+        self.max_readers = max_readers
+        self.max_readers_per_file = max_readers_per_file
+        self._templates = {}
+        self._idle_readers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: idle readers: {len(self._idle_readers)}>"
+
+    def add(self, reader: FFMPEG_VideoReader, fps_source: str = "tbr") -> DecoderKey:
+        """
+        Adds an open reader to the pool
+
+        Returns
+        -------
+        The key to request frames from the reader's video file with
+        """
+        key = DecoderKey(
+            reader.filename,
+            reader.pix_fmt,
+            tuple(reader.size),
+            reader.resize_algo,
+            fps_source,
+        )
+        with self._lock:
+            self._templates.setdefault(key, _clone_reader(reader))
+        self._release(key, reader)
+
+        return key
+
+    def get_frame(self, key: DecoderKey, t: float) -> LIST_3D:
+        """
+        Returns
+        -------
+        The frame of the video file at time t
+        """
+        reader = self._acquire(key, t)
+        try:
+            return reader.get_frame(t)
+        finally:
+            self._release(key, reader)
+
+    def close(self):
+        """
+        Closes all idle readers
+        """
+        with self._lock:
+            readers = [reader for _, reader in self._idle_readers.values()]
+            self._idle_readers.clear()
+
+        for reader in readers:
+            reader.close()
+
+    def _acquire(self, key: DecoderKey, t: float) -> FFMPEG_VideoReader:
+        with self._lock:
+            template = self._templates.get(key)
+            if template:
+                # Find the reader that has to skip the fewest frames to reach time t, if any can do so without restarting
+                position = int(template.fps * t + 0.00001) + 1
+                best_reader_id = None
+                best_distance = None
+                for reader_id, (reader_key, reader) in self._idle_readers.items():
+                    if reader_key != key or not reader.proc:
+                        continue
+
+                    distance = position - reader.pos
+                    if 0 <= distance <= MAX_FRAMES_SKIPPED and (
+                        best_distance is None or distance < best_distance
+                    ):
+                        best_reader_id = reader_id
+                        best_distance = distance
+
+                if best_reader_id is not None:
+                    return self._idle_readers.pop(best_reader_id)[1]
+
+                # The new reader starts ffmpeg at time t on its first frame request
+                return _clone_reader(template)
+
+        reader = FFMPEG_VideoReader(
+            key.file,
+            pix_fmt=key.pix_fmt,
+            target_resolution=(key.size[1], key.size[0]),
+            resize_algo=key.resize_algo,
+            fps_source=key.fps_source,
+        )
+        with self._lock:
+            self._templates.setdefault(key, _clone_reader(reader))
+
+        return reader
+
+    def _release(self, key: DecoderKey, reader: FFMPEG_VideoReader):
+        with self._lock:
+            self._idle_readers[id(reader)] = (key, reader)
+            evicted_readers = self._evict(key)
+
+        for evicted_reader in evicted_readers:
+            evicted_reader.close()
+
+    def _evict(self, key: DecoderKey) -> List[FFMPEG_VideoReader]:
+        evicted_readers = []
+
+        file_reader_ids = [
+            reader_id
+            for reader_id, (reader_key, _) in self._idle_readers.items()
+            if reader_key.file == key.file
+        ]
+        for reader_id in file_reader_ids[
+            : max(0, len(file_reader_ids) - self.max_readers_per_file)
+        ]:
+            evicted_readers.append(self._idle_readers.pop(reader_id)[1])
+
+        while len(self._idle_readers) > self.max_readers:
+            evicted_readers.append(self._idle_readers.popitem(last=False)[1][1])
+
+        return evicted_readers
+
+    def _forget_readers(self):
+        """
+        Drops all idle readers without closing them.
+        Used in forked processes, where the readers' ffmpeg processes belong to the parent process.
+        """
+        for _, reader in self._idle_readers.values():
+            reader.proc = None
+        self._idle_readers.clear()
+        self._lock = threading.Lock()
+
+
+def _clone_reader(reader: FFMPEG_VideoReader) -> FFMPEG_VideoReader:
+    """
+    Returns
+    -------
+    A closed copy of a reader, which reuses the reader's file information instead of probing the file again
+    """
+    clone = copy.copy(reader)
+    clone.proc = None
+    clone.__dict__.pop("lastread", None)
+
+    return clone
+
+
+decoder_pool = DecoderPool()
+atexit.register(decoder_pool.close)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=decoder_pool._forget_readers)
+
+
+def read_frame(key: DecoderKey, t: float) -> LIST_3D:
+    """
+    Reads a frame from the shared decoder pool
+    """
+    return decoder_pool.get_frame(key, t)
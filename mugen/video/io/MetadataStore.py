@@ -0,0 +1,192 @@
+import json
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from typing import Dict, List, NamedTuple, Optional
+
+from tqdm import tqdm
+
+from mugen.utilities import system
+from mugen.utilities.cache import Cache
+from mugen.video.sizing import Dimensions
+
+# Change this whenever the stored metadata would change
+METADATA_VERSION = "1"
+DEFAULT_PROBE_WORKERS = 8
+
+
+class VideoMetadata(NamedTuple):
+    """
+    duration: (sec)
+    fps: frames per second
+    dimensions: width and height
+    """
+
+    duration: float
+    fps: float
+    dimensions: Dimensions
+
+
+class MetadataStore:
+    """
+    A process-wide store of ffprobe metadata for media files, keyed by file identity,
+    so that each file is probed once no matter how many segments read its metadata
+
+    Attributes
+    ----------
+    cache
+        Persistent cache to also store metadata in, which is reused between runs.
+        Defaults to storing metadata in memory only
+    """
+
+    cache: Optional[Cache]
+    _metadata: Dict[str, dict]
+    _lock: threading.Lock
+
+    def __init__(self, cache: Optional[Cache] = None):
+        self.cache = cache
+        self._metadata = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: files: {len(self._metadata)}>"
+
+    def get(self, file: str) -> dict:
+        """
+        Returns
+        -------
+        ffprobe's format and streams metadata for the file, probing the file if it has not been probed yet
+        """
+        key = system.file_identity(file)
+        with self._lock:
+            metadata = self._metadata.get(key)
+        if metadata is not None:
+            return metadata
+
+        metadata = (
+            self.cache.get(key, "ffprobe", METADATA_VERSION) if self.cache else None
+        )
+        if metadata is None:
+            metadata = probe_file(file)
+            if self.cache:
+                self.cache.set(key, "ffprobe", METADATA_VERSION, metadata)
+
+        with self._lock:
+            self._metadata[key] = metadata
+
+        return metadata
+
+    def get_video_metadata(self, file: str) -> VideoMetadata:
+        """
+        Returns
+        -------
+        The duration, fps, and dimensions of the file's primary video stream
+
+        Raises
+        ------
+        IOError
+            If the file has no video stream
+        """
+        metadata = self.get(file)
+        video_streams = [
+            stream for stream in metadata["streams"] if stream["codec_type"] == "video"
+        ]
+        if not video_streams:
+            raise IOError(f"No video stream found in file {file}")
+
+        video_stream = video_streams[0]
+        duration = video_stream.get("duration", metadata["format"].get("duration"))
+        frame_rate = video_stream.get("r_frame_rate", "0/0")
+        if frame_rate.endswith("/0"):
+            frame_rate = video_stream.get("avg_frame_rate", "0/0")
+
+        return VideoMetadata(
+            float(duration) if duration is not None else 0.0,
+            float(Fraction(frame_rate)) if not frame_rate.endswith("/0") else 0.0,
+            Dimensions(video_stream["width"], video_stream["height"]),
+        )
+
+    def populate(
+        self,
+        files: List[str],
+        *,
+        workers: int = DEFAULT_PROBE_WORKERS,
+        ignore_errors: bool = False,
+        show_progress: bool = False,
+    ):
+        """
+        Probes many files at once, running up to 'workers' ffprobe processes in parallel
+
+        Parameters
+        ----------
+        files
+            Files to probe. Files which have already been probed are skipped
+
+        workers
+            Maximum number of ffprobe processes to run at once
+
+        ignore_errors
+            Whether to skip files which cannot be probed, instead of raising an IOError
+
+        show_progress
+            Whether to output progress information to stdout
+        """
+
+        def probe(file: str):
+            try:
+                self.get(file)
+            except IOError:
+                if not ignore_errors:
+                    raise
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in tqdm(
+                executor.map(probe, files),
+                total=len(files),
+                disable=not show_progress,
+            ):
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._metadata.clear()
+
+
+def probe_file(file: str) -> dict:
+    """
+    Returns
+    -------
+    ffprobe's format and streams metadata for the file
+
+    Raises
+    ------
+    IOError
+        If ffprobe cannot read the file
+    """
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "quiet",
+            "-print_format",
+            "json",
+            "-show_format",
+            "-show_streams",
+            f"{file}",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise IOError(f"Failed to probe file {file}")
+
+    metadata = json.loads(result.stdout)
+
+    return {
+        "format": metadata.get("format", {}),
+        "streams": metadata.get("streams", []),
+    }
+
+
+metadata_store = MetadataStore()
@@ -1,9 +1,13 @@
 import os
+import tempfile
+from concurrent.futures import as_completed
 from typing import List, Optional, Union
 
-from moviepy.editor import VideoClip
+from moviepy.editor import AudioClip, VideoClip
 from tqdm import tqdm
 
+from mugen.exceptions import WritingError
+from mugen.utilities import parallel, system
 from mugen.utilities.logger import logger
 from mugen.utilities.system import use_temporary_file_fallback
 
@@ -35,6 +39,10 @@ class VideoWriter:
     ffmpeg_parameters
         Any additional ffmpeg parameters you would like to pass as a list of terms,
         like ['-option1', 'value1', '-option2', 'value2']
+
+    threads
+        Number of threads for each ffmpeg process to encode video clips with.
+        Limits each process when writing several video clips at once. Defaults to ffmpeg's choice.
     """
 
     codec: str
@@ -43,13 +51,18 @@ class VideoWriter:
     audio_codec: str
     audio_bitrate: int
     ffmpeg_parameters: list
+    threads: Optional[int]
 
     DEFAULT_VIDEO_CODEC = "libx264"
     DEFAULT_VIDEO_CRF = 18
     DEFAULT_VIDEO_PRESET = "medium"
     DEFAULT_VIDEO_EXTENSION = ".mkv"
+    DEFAULT_AUDIO_EXTENSION = ".mka"
     DEFAULT_AUDIO_CODEC = "libmp3lame"
     DEFAULT_AUDIO_BITRATE = 320
+    DEFAULT_AUDIO_FPS = 44100
+    # Uncompressed audio can be joined without gaps, unlike most compressed audio
+    INTERMEDIATE_AUDIO_CODEC = "pcm_s16le"
 
     def __init__(self):
         self.codec = self.DEFAULT_VIDEO_CODEC
@@ -58,6 +71,7 @@ class VideoWriter:
         self.audio_codec = self.DEFAULT_AUDIO_CODEC
         self.audio_bitrate = self.DEFAULT_AUDIO_BITRATE
         self.ffmpeg_parameters = []
+        self.threads = None
 
     def write_video_clips_to_directory(
         self,
@@ -65,14 +79,111 @@ class VideoWriter:
         directory: str,
         *,
         file_extension: str = DEFAULT_VIDEO_EXTENSION,
-        show_progress: bool = True
-    ):
+        workers: Optional[int] = None,
+        fail_fast: bool = True,
+        show_progress: bool = True,
+    ) -> List[str]:
         """
-        Writes a list of video segments to files in the specified directory
+        Writes a list of video clips to files in the specified directory, named by their index
+
+        See :meth:`write_video_clips_to_files` for the other parameters
+
+        Returns
+        -------
+        Paths to the video files
         """
-        for index, segment in enumerate(tqdm(video_clips, disable=not show_progress)):
-            output_path = os.path.join(directory, str(index) + file_extension)
-            self.write_video_clip_to_file(segment, output_path, show_progress=False)
+        output_paths = [
+            os.path.join(directory, str(index) + file_extension)
+            for index in range(len(video_clips))
+        ]
+
+        return self.write_video_clips_to_files(
+            video_clips,
+            output_paths,
+            workers=workers,
+            fail_fast=fail_fast,
+            show_progress=show_progress,
+        )
+
+    def write_video_clips_to_files(
+        self,
+        video_clips: List[VideoClip],
+        output_paths: List[str],
+        *,
+        workers: Optional[int] = None,
+        fail_fast: bool = True,
+        show_progress: bool = True,
+    ) -> List[str]:
+        """
+        Writes a list of video clips to files, encoding several clips at once in worker processes
+
+        Parameters
+        ----------
+        video_clips
+            Video clips to write
+
+        output_paths
+            Paths for each video clip's file
+
+        workers
+            Number of worker processes to write video clips with.
+            Defaults to writing video clips one at a time in the current process
+
+        fail_fast
+            Whether to stop writing video clips as soon as one fails, raising its error.
+            Otherwise, all video clips are attempted, and failures are raised together as a WritingError
+
+        show_progress
+            Whether to output progress information to stdout
+
+        Returns
+        -------
+        Paths to the video files
+        """
+        errors = {}
+        progress_bar = tqdm(total=len(video_clips), disable=not show_progress)
+
+        if not workers or workers <= 1:
+            for video_clip, output_path in zip(video_clips, output_paths):
+                try:
+                    self.write_video_clip_to_file(
+                        video_clip, output_path, show_progress=False
+                    )
+                except Exception as error:
+                    if fail_fast:
+                        raise
+                    errors[output_path] = error
+                progress_bar.update()
+        else:
+            with parallel.create_process_pool(workers) as pool:
+                futures = {
+                    parallel.submit(
+                        pool, _write_video_clip_in_worker, self, video_clip, output_path
+                    ): output_path
+                    for video_clip, output_path in zip(video_clips, output_paths)
+                }
+                try:
+                    for future in as_completed(futures):
+                        try:
+                            future.result()
+                        except Exception as error:
+                            if fail_fast:
+                                raise
+                            errors[futures[future]] = error
+                        progress_bar.update()
+                finally:
+                    # Stop writing remaining video clips if a write fails
+                    for future in futures:
+                        future.cancel()
+        progress_bar.close()
+
+        if errors:
+            raise WritingError(
+                f"Failed to write {len(errors)} of {len(video_clips)} video clips.",
+                errors,
+            )
+
+        return output_paths
 
     @use_temporary_file_fallback("output_path", DEFAULT_VIDEO_EXTENSION)
     def write_video_clip_to_file(
@@ -81,7 +192,8 @@ class VideoWriter:
         output_path: Optional[str] = None,
         *,
         audio: Union[str, bool] = True,
-        show_progress: bool = True
+        audio_codec: Optional[str] = None,
+        show_progress: bool = True,
     ):
         """
         Writes a video clip to file in the specified directory
@@ -95,6 +207,9 @@ class VideoWriter:
         audio
             Audio for the video clip. Can be True to enable, False to disable, or an external audio file.
 
+        audio_codec
+            Codec to write the video clip's audio with. Defaults to the writer's audio codec
+
         show_progress
             Whether to output progress information to stdout
         """
@@ -103,10 +218,11 @@ class VideoWriter:
 
         video_clip.write_videofile(
             output_path,
+            threads=self.threads,
             audio=audio,
             preset=self.preset,
             codec=self.codec,
-            audio_codec=self.audio_codec,
+            audio_codec=audio_codec or self.audio_codec,
             audio_bitrate=audio_bitrate,
             ffmpeg_params=ffmpeg_parameters,
             verbose=False,
@@ -114,3 +230,198 @@ class VideoWriter:
         )
 
         return output_path
+
+    def extract_video_file_segment(
+        self, file: str, start_time: float, duration: float, output_path: str
+    ):
+        """
+        Cuts a segment out of a video file without re-encoding it, by copying its video and audio streams.
+        The segment is cut at the nearest keyframes, so may include footage from just before its start time
+
+        Parameters
+        ----------
+        file
+            Video file to cut the segment from
+
+        start_time
+            Start time of the segment in the video file (seconds)
+
+        duration
+            Duration of the segment (seconds)
+
+        output_path
+            Path for the video file. Should have an extension whose container supports the video file's codecs
+        """
+        system.run_command(
+            [
+                "ffmpeg",
+                "-y",
+                "-ss",
+                f"{start_time}",
+                "-i",
+                file,
+                "-t",
+                f"{duration}",
+                "-map",
+                "0:v:0",
+                "-map",
+                "0:a?",
+                "-c",
+                "copy",
+                "-avoid_negative_ts",
+                "make_zero",
+                output_path,
+            ]
+        )
+
+        return output_path
+
+    @use_temporary_file_fallback("output_path", DEFAULT_AUDIO_EXTENSION)
+    def write_audio_clip_to_file(
+        self, audio_clip: AudioClip, output_path: Optional[str] = None
+    ):
+        """
+        Writes an audio clip to file with the writer's audio codec and bitrate
+        """
+        # Composite audio clips have no frame rate of their own
+        audio_clip.write_audiofile(
+            output_path,
+            fps=self.DEFAULT_AUDIO_FPS,
+            codec=self.audio_codec,
+            bitrate=str(self.audio_bitrate) + "k",
+            verbose=False,
+            logger=None,
+        )
+
+        return output_path
+
+    @use_temporary_file_fallback("output_path", DEFAULT_VIDEO_EXTENSION)
+    def concatenate_video_files(
+        self,
+        video_files: List[str],
+        output_path: Optional[str] = None,
+        *,
+        audio_file: Optional[str] = None,
+    ):
+        """
+        Joins video files end to end without re-encoding them, using ffmpeg's concat demuxer.
+        The video files must share the same codecs, dimensions, and streams.
+
+        Parameters
+        ----------
+        video_files
+
+        output_path
+
+        audio_file
+            Audio file to use in place of the video files' audio.
+            Its audio stream is copied as is, preserving its codec and bitrate
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file_list:
+            for video_file in video_files:
+                escaped_video_file = os.path.abspath(video_file).replace("'", "'\\''")
+                file_list.write(f"file '{escaped_video_file}'\n")
+
+        ffmpeg_command = ["ffmpeg", "-y", "-f", "concat", "-safe", "0"]
+        ffmpeg_command += ["-i", file_list.name]
+        if audio_file:
+            ffmpeg_command += ["-i", audio_file, "-map", "0:v", "-map", "1:a"]
+        ffmpeg_command += ["-c", "copy", output_path]
+
+        try:
+            system.run_command(ffmpeg_command)
+        finally:
+            os.remove(file_list.name)
+
+        return output_path
+
+    @use_temporary_file_fallback("output_path", DEFAULT_VIDEO_EXTENSION)
+    def write_filter_graph_to_file(
+        self,
+        input_arguments: List[str],
+        filter_graph: str,
+        output_path: Optional[str] = None,
+        *,
+        audio: bool = True,
+        audio_codec: Optional[str] = None,
+    ):
+        """
+        Renders an ffmpeg filter graph to file with the writer's codecs and settings,
+        without decoding frames through Python
+
+        Parameters
+        ----------
+        input_arguments
+            ffmpeg arguments for the filter graph's inputs
+
+        filter_graph
+            ffmpeg filter graph, which outputs its video as [video] and its audio as [audio]
+
+        output_path
+
+        audio
+            Whether to write the filter graph's audio
+
+        audio_codec
+            Codec to write the filter graph's audio with. Defaults to the writer's audio codec
+        """
+        # Filter graphs for long videos can exceed the maximum command length, so are passed by file
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".txt", delete=False
+        ) as filter_graph_file:
+            filter_graph_file.write(filter_graph)
+
+        ffmpeg_command = ["ffmpeg", "-y", *input_arguments]
+        ffmpeg_command += ["-filter_complex_script", filter_graph_file.name]
+        ffmpeg_command += ["-map", "[video]"]
+        ffmpeg_command += ["-c:v", self.codec, "-preset", self.preset]
+        ffmpeg_command += ["-crf", str(self.crf)]
+        if self.threads:
+            ffmpeg_command += ["-threads", str(self.threads)]
+        if audio:
+            ffmpeg_command += [
+                "-map",
+                "[audio]",
+                "-c:a",
+                audio_codec or self.audio_codec,
+            ]
+            ffmpeg_command += ["-b:a", str(self.audio_bitrate) + "k"]
+        ffmpeg_command += [*self.ffmpeg_parameters, output_path]
+
+        try:
+            system.run_command(ffmpeg_command)
+        finally:
+            os.remove(filter_graph_file.name)
+
+        return output_path
+
+    @use_temporary_file_fallback("output_path", DEFAULT_VIDEO_EXTENSION)
+    def encode_audio(self, video_file: str, output_path: Optional[str] = None):
+        """
+        Re-encodes a video file's audio with the writer's audio codec and bitrate, copying its other streams as is
+        """
+        system.run_command(
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                video_file,
+                "-map",
+                "0",
+                "-c",
+                "copy",
+                "-c:a",
+                self.audio_codec,
+                "-b:a",
+                str(self.audio_bitrate) + "k",
+                output_path,
+            ]
+        )
+
+        return output_path
+
+
+def _write_video_clip_in_worker(
+    writer: VideoWriter, video_clip: VideoClip, output_path: str
+) -> str:
+    return writer.write_video_clip_to_file(video_clip, output_path, show_progress=False)
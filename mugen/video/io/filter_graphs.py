@@ -0,0 +1,290 @@
+from typing import List, NamedTuple, Tuple
+
+from mugen.video import sizing
+from mugen.video.effects import Crossfade, FadeIn, FadeOut, VideoEffect
+from mugen.video.segments.Segment import Segment
+from mugen.video.segments.VideoSegment import VideoSegment
+from mugen.video.sizing import Dimensions
+
+"""
+Module for rendering video segments entirely within ffmpeg, using filter graphs
+"""
+
+SUPPORTED_EFFECTS = (FadeIn, FadeOut, Crossfade)
+AUDIO_SAMPLE_RATE = 44100
+# Extra footage to read past the end of each segment, trimmed to an exact number of frames
+INPUT_DURATION_MARGIN = 1
+
+
+class TimelineItem(NamedTuple):
+    """
+    A span of a video file in the music video's timeline
+
+    file: video file to read from
+    source_start_time: start time in the video file (sec)
+    dimensions: dimensions of the video file
+    has_audio: whether the video file has an audio stream
+    frames: number of frames in the timeline
+    crossfade_frames: number of frames the item crossfades in over the end of the previous item
+    effects: fades to apply to the item
+    """
+
+    file: str
+    source_start_time: float
+    dimensions: Dimensions
+    has_audio: bool
+    frames: int
+    crossfade_frames: int
+    effects: List[VideoEffect]
+
+
+def supports_segments(segments: List[Segment]) -> bool:
+    """
+    Returns
+    -------
+    True if the segments can be rendered with ffmpeg filter graphs, False otherwise.
+    Only video segments with fades and crossfades are supported.
+    """
+    for segment in segments:
+        if not isinstance(segment, VideoSegment):
+            return False
+
+        if not all(isinstance(effect, SUPPORTED_EFFECTS) for effect in segment.effects):
+            return False
+
+        crossfades = [
+            effect for effect in segment.effects if isinstance(effect, Crossfade)
+        ]
+        if len(crossfades) > 1:
+            return False
+
+    return True
+
+
+def get_timeline_groups(
+    segments: List[VideoSegment], fps: float
+) -> List[List[TimelineItem]]:
+    """
+    Lays out video segments in a timeline as moviepy would compose them, with buffers for crossfades,
+    and splits the timeline at hard cuts.
+
+    Item lengths are rounded to whole frames from their positions in the timeline,
+    so that rounding errors do not build up over the music video.
+
+    Returns
+    -------
+    Groups of timeline items which are joined by crossfades, in order
+    """
+    groups = []
+    start_time = 0
+    for index, segment in enumerate(segments):
+        crossfade_duration = 0
+        if index > 0:
+            crossfade_duration = next(
+                (
+                    effect.duration
+                    for effect in segment.effects
+                    if isinstance(effect, Crossfade)
+                ),
+                0,
+            )
+
+        if crossfade_duration:
+            # Crossfade over a buffer continuing on from the end of the previous segment
+            previous_segment = segments[index - 1]
+            groups[-1].append(
+                _create_timeline_item(
+                    previous_segment,
+                    previous_segment.source_end_time,
+                    start_time,
+                    crossfade_duration,
+                    fps,
+                    effects=[],
+                )
+            )
+            crossfade_frames = groups[-1][-1].frames
+        else:
+            groups.append([])
+            crossfade_frames = 0
+
+        effects = [
+            effect for effect in segment.effects if not isinstance(effect, Crossfade)
+        ]
+        groups[-1].append(
+            _create_timeline_item(
+                segment,
+                segment.source_start_time,
+                start_time,
+                segment.duration,
+                fps,
+                effects=effects,
+                crossfade_frames=crossfade_frames,
+            )
+        )
+        start_time += segment.duration
+
+    return groups
+
+
+def _create_timeline_item(
+    segment: VideoSegment,
+    source_start_time: float,
+    start_time: float,
+    duration: float,
+    fps: float,
+    *,
+    effects: List[VideoEffect],
+    crossfade_frames: int = 0,
+) -> TimelineItem:
+    frames = round((start_time + duration) * fps) - round(start_time * fps)
+
+    return TimelineItem(
+        segment.file,
+        source_start_time,
+        segment.dimensions,
+        segment.audio_stream is not None,
+        frames,
+        crossfade_frames,
+        effects,
+    )
+
+
+def build_filter_graph(
+    items: List[TimelineItem],
+    dimensions: Tuple[int, int],
+    fps: float,
+    *,
+    audio: bool,
+) -> Tuple[List[str], str]:
+    """
+    Builds an ffmpeg filter graph which renders a group of timeline items.
+    Outputs the rendered video as [video], and the rendered audio as [audio] if audio is enabled.
+
+    Parameters
+    ----------
+    items
+        Timeline items to render, where each item after the first crossfades in over the previous item
+
+    dimensions
+        Dimensions to crop and scale each item to
+
+    fps
+        Frame rate to render at
+
+    audio
+        Whether to render the items' audio.
+        Items without audio streams are rendered with silence.
+
+    Returns
+    -------
+    ffmpeg input arguments for the video files, and the filter graph
+    """
+    dimensions = Dimensions(*dimensions)
+    input_arguments = []
+    filters = []
+    video_label = audio_label = None
+    frames = 0
+    for index, item in enumerate(items):
+        duration = (item.frames + INPUT_DURATION_MARGIN * fps) / fps
+        input_arguments += [
+            "-ss",
+            f"{item.source_start_time}",
+            "-t",
+            f"{duration}",
+            "-i",
+            item.file,
+        ]
+
+        filters.append(
+            f"[{index}:v]{_get_video_filters(item, dimensions, fps)}[v{index}]"
+        )
+        if audio:
+            audio_input = f"[{index}:a]" if item.has_audio else _get_silence_source()
+            filters.append(f"{audio_input}{_get_audio_filters(item, fps)}[a{index}]")
+
+        if index == 0:
+            video_label = f"v{index}"
+            audio_label = f"a{index}"
+            frames = item.frames
+            continue
+
+        if item.crossfade_frames:
+            # Fade in over the end of the footage so far
+            offset = (frames - item.crossfade_frames) / fps
+            crossfade_duration = item.crossfade_frames / fps
+            video_filter = (
+                f"xfade=transition=fade:duration={crossfade_duration}:offset={offset}"
+            )
+            audio_filter = f"acrossfade=d={crossfade_duration}"
+        else:
+            # Continue on from the end of the footage so far,
+            # restoring the frame rate and time base which crossfades require
+            video_filter = f"concat=n=2:v=1:a=0,fps={fps}"
+            audio_filter = "concat=n=2:v=0:a=1"
+
+        filters.append(f"[{video_label}][v{index}]{video_filter}[x{index}]")
+        video_label = f"x{index}"
+        if audio:
+            filters.append(f"[{audio_label}][a{index}]{audio_filter}[ax{index}]")
+            audio_label = f"ax{index}"
+        frames += item.frames - item.crossfade_frames
+
+    filters.append(f"[{video_label}]trim=end_frame={frames},format=yuv420p[video]")
+    if audio:
+        filters.append(f"[{audio_label}]atrim=duration={frames / fps}[audio]")
+
+    return input_arguments, ";".join(filters)
+
+
+def _get_video_filters(item: TimelineItem, dimensions: Dimensions, fps: float) -> str:
+    filters = []
+    if item.dimensions.aspect_ratio != dimensions.aspect_ratio:
+        x1, y1, x2, y2 = sizing.crop_coordinates_for_aspect_ratio(
+            item.dimensions, dimensions.aspect_ratio
+        )
+        filters.append(f"crop={int(x2 - x1)}:{int(y2 - y1)}:{int(x1)}:{int(y1)}")
+    filters.append(f"scale={dimensions.width}:{dimensions.height}")
+    filters += [
+        "setsar=1",
+        "setpts=PTS-STARTPTS",
+        f"fps={fps}",
+        # Repeat the last frame if the video file ends early
+        f"tpad=stop_mode=clone:stop={item.frames}",
+        f"trim=end_frame={item.frames}",
+    ]
+
+    duration = item.frames / fps
+    for effect in item.effects:
+        color = effect.color.replace("#", "0x")
+        if isinstance(effect, FadeIn):
+            filters.append(f"fade=t=in:st=0:d={effect.duration}:c={color}")
+        elif isinstance(effect, FadeOut):
+            filters.append(
+                f"fade=t=out:st={duration - effect.duration}:d={effect.duration}:c={color}"
+            )
+
+    return ",".join(filters)
+
+
+def _get_audio_filters(item: TimelineItem, fps: float) -> str:
+    duration = item.frames / fps
+    filters = [
+        f"aresample={AUDIO_SAMPLE_RATE}",
+        "aformat=sample_fmts=fltp:channel_layouts=stereo",
+        "asetpts=PTS-STARTPTS",
+        "apad",
+        f"atrim=duration={duration}",
+    ]
+    for effect in item.effects:
+        if isinstance(effect, FadeIn):
+            filters.append(f"afade=t=in:st=0:d={effect.duration}")
+        elif isinstance(effect, FadeOut):
+            filters.append(
+                f"afade=t=out:st={duration - effect.duration}:d={effect.duration}"
+            )
+
+    return ",".join(filters)
+
+
+def _get_silence_source() -> str:
+    return f"anullsrc=r={AUDIO_SAMPLE_RATE}:cl=stereo,"
@@ -0,0 +1,133 @@
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+import moviepy.editor as moviepy
+import numpy
+
+from mugen.video.constants import LIST_3D
+
+
+class SequentialVideoClip(moviepy.VideoClip):
+    """
+    A clip which plays clips one after another, positioned by their start times.
+
+    Each frame is read directly from the clip playing at that time, found by binary search over the clips' start times,
+    instead of compositing every clip as moviepy's CompositeVideoClip does.
+    Frames are only composited in windows where clips overlap, such as during crossfades.
+
+    Attributes
+    ----------
+    clips
+        Clips to play, sorted by start time
+
+    bg_color
+        Color of the background, where no clip is playing
+    """
+
+    clips: List[moviepy.VideoClip]
+    bg_color: Tuple[int, int, int]
+    _starts: numpy.ndarray
+    _ends: numpy.ndarray
+    _overlap_windows: List[Tuple[float, float, List[moviepy.VideoClip]]]
+
+    def __init__(
+        self,
+        clips: List[moviepy.VideoClip],
+        size: Optional[Tuple[int, int]] = None,
+        bg_color: Tuple[int, int, int] = (0, 0, 0),
+    ):
+        """
+        Parameters
+        ----------
+        clips
+            Clips to play, with start times set. Defaults the size to the size of the first clip
+
+        size
+            Size of the clip
+
+        bg_color
+            Color of the background, where no clip is playing
+        """
+        super().__init__()
+        self.clips = sorted(clips, key=lambda clip: clip.start)
+        self.size = size if size is not None else self.clips[0].size
+        self.bg_color = bg_color
+        self._starts = numpy.array([clip.start for clip in self.clips])
+        self._ends = numpy.array([clip.end for clip in self.clips])
+        self._overlap_windows = self._get_overlap_windows()
+
+        fpss = [clip.fps for clip in self.clips if getattr(clip, "fps", None)]
+        self.fps = max(fpss) if fpss else None
+        self.duration = self.end = max(self._ends)
+
+        audio_clips = [clip.audio for clip in self.clips if clip.audio is not None]
+        if audio_clips:
+            self.audio = moviepy.CompositeAudioClip(audio_clips)
+
+        self.make_frame = self._make_frame
+
+    def _make_frame(self, t: float) -> LIST_3D:
+        window_index = bisect_right(self._overlap_windows, (t, float("inf"))) - 1
+        if window_index >= 0:
+            window_start, window_end, window_clips = self._overlap_windows[window_index]
+            if window_start <= t < window_end:
+                return self._composite_frame(
+                    [clip for clip in window_clips if clip.is_playing(t)], t
+                )
+
+        index = bisect_right(self._starts, t) - 1
+        if index < 0 or t >= self._ends[index]:
+            return self._composite_frame([], t)
+
+        clip = self.clips[index]
+        if tuple(clip.size) != tuple(self.size) or clip.pos(t) != (0, 0):
+            return self._composite_frame([clip], t)
+
+        return clip.get_frame(t - clip.start)
+
+    def _composite_frame(self, clips: List[moviepy.VideoClip], t: float) -> LIST_3D:
+        """
+        Returns
+        -------
+        The clips' frames at time t, blitted over the background in order
+        """
+        width, height = self.size
+        frame = numpy.full((height, width, 3), self.bg_color, dtype=numpy.uint8)
+        for clip in clips:
+            frame = clip.blit_on(frame, t)
+
+        return frame
+
+    def _get_overlap_windows(
+        self,
+    ) -> List[Tuple[float, float, List[moviepy.VideoClip]]]:
+        """
+        Returns
+        -------
+        Sorted, disjoint time windows where two or more clips play at once, with the clips playing in each window
+        """
+        overlaps = []
+        for index, clip in enumerate(self.clips):
+            for other_index in range(index + 1, len(self.clips)):
+                if self._starts[other_index] >= self._ends[index]:
+                    break
+                overlaps.append(
+                    (
+                        self._starts[other_index],
+                        min(self._ends[index], self._ends[other_index]),
+                        (index, other_index),
+                    )
+                )
+
+        windows = []
+        for start, end, clip_indexes in sorted(overlaps):
+            if windows and start <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], end)
+                windows[-1][2].update(clip_indexes)
+            else:
+                windows.append([start, end, set(clip_indexes)])
+
+        return [
+            (start, end, [self.clips[index] for index in sorted(clip_indexes)])
+            for start, end, clip_indexes in windows
+        ]
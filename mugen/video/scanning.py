@@ -0,0 +1,161 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from mugen.utilities import system
+from mugen.video.io.MetadataStore import DEFAULT_PROBE_WORKERS, metadata_store
+
+"""
+Module for finding video files in directories
+"""
+
+VIDEO_EXTENSIONS = {
+    ".3g2",
+    ".3gp",
+    ".asf",
+    ".avi",
+    ".flv",
+    ".gif",
+    ".m2ts",
+    ".m4v",
+    ".mkv",
+    ".mov",
+    ".mp4",
+    ".mpeg",
+    ".mpg",
+    ".mts",
+    ".mxf",
+    ".ogv",
+    ".ts",
+    ".vob",
+    ".webm",
+    ".wmv",
+}
+
+
+class ScanReport:
+    """
+    Files found while scanning for video files
+
+    Attributes
+    ----------
+    video_files
+        Files with a readable video stream
+
+    skipped_files
+        Files skipped without being read, as their extensions are not known video extensions
+
+    unreadable_files
+        Files with known video extensions, which have no readable video stream
+    """
+
+    video_files: List[str]
+    skipped_files: List[str]
+    unreadable_files: List[str]
+
+    def __init__(self):
+        self.video_files = []
+        self.skipped_files = []
+        self.unreadable_files = []
+
+    def extend(self, report: "ScanReport"):
+        """
+        Adds the results of another report to this report
+        """
+        self.video_files.extend(report.video_files)
+        self.skipped_files.extend(report.skipped_files)
+        self.unreadable_files.extend(report.unreadable_files)
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}: video_files: {len(self.video_files)}, "
+            f"skipped_files: {len(self.skipped_files)}, unreadable_files: {len(self.unreadable_files)}>"
+        )
+
+
+def is_video_file_name(file: str) -> bool:
+    """
+    Returns
+    -------
+    True if the file has a known video extension, False otherwise
+    """
+    return os.path.splitext(file)[1].lower() in VIDEO_EXTENSIONS
+
+
+def scan_directory(
+    directory: str,
+    *,
+    workers: int = DEFAULT_PROBE_WORKERS,
+    report: Optional[ScanReport] = None,
+) -> ScanReport:
+    """
+    Finds the video files in a directory, excluding hidden files and subdirectories
+
+    Parameters
+    ----------
+    directory
+        directory to scan
+
+    workers
+        Maximum number of files to probe at once
+
+    report
+        Report to add the scan's results to. Defaults to a new report
+    """
+    return scan_files(
+        system.list_directory_files(directory), workers=workers, report=report
+    )
+
+
+def scan_files(
+    files: List[str],
+    *,
+    workers: int = DEFAULT_PROBE_WORKERS,
+    report: Optional[ScanReport] = None,
+) -> ScanReport:
+    """
+    Finds the video files among a list of files.
+
+    Files are first filtered by extension, then probed in parallel through the shared
+    :data:`~mugen.video.io.MetadataStore.metadata_store`. When the metadata store has a persistent cache,
+    files which have not changed since they were last scanned are not probed again.
+
+    Parameters
+    ----------
+    files
+        files to scan
+
+    workers
+        Maximum number of files to probe at once
+
+    report
+        Report to add the scan's results to. Defaults to a new report
+    """
+    report = report if report is not None else ScanReport()
+
+    candidate_files = []
+    for file in files:
+        if is_video_file_name(file):
+            candidate_files.append(file)
+        else:
+            report.skipped_files.append(file)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        readable = list(executor.map(_is_readable_video_file, candidate_files))
+
+    for file, is_readable in zip(candidate_files, readable):
+        if is_readable:
+            report.video_files.append(file)
+        else:
+            report.unreadable_files.append(file)
+
+    return report
+
+
+def _is_readable_video_file(file: str) -> bool:
+    try:
+        metadata_store.get_video_metadata(file)
+    except IOError:
+        return False
+
+    return True
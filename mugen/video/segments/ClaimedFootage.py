@@ -0,0 +1,104 @@
+from typing import Dict, List, Tuple
+
+from mugen.video.segments.Segment import Segment
+from mugen.video.segments.UsedFootage import UsedFootage
+from mugen.video.segments.VideoSegment import VideoSegment
+
+
+class ClaimedFootage(UsedFootage):
+    """
+    Footage claimed by candidate video segments which are still being evaluated, on top of used footage.
+    Overlap checks and unused time ranges account for both, so that candidates sampled at once
+    avoid used footage and each other. Claims can be released once their candidates are rejected.
+
+    Attributes
+    ----------
+    used_footage
+        Footage which has already been used, e.g. a footage ledger shared with other processes.
+        Checked on every query, so footage used after the claims were made is still accounted for
+    """
+
+    used_footage: UsedFootage
+    _claims: Dict[str, List[Tuple[float, float]]]
+
+    def __init__(self, used_footage: UsedFootage):
+        """
+        Parameters
+        ----------
+        used_footage
+            Footage which has already been used
+        """
+        self.used_footage = used_footage
+        self._claims = {}
+        super().__init__(minimum_gap=used_footage.minimum_gap)
+
+    def add(self, file: str, start: float, end: float):
+        """
+        Claims a time range of a file
+        """
+        self._claims.setdefault(file, []).append((start, end))
+        super().add(file, start, end)
+
+    def remove(self, file: str, start: float, end: float):
+        """
+        Releases a claim on a time range of a file
+        """
+        claims = self._claims.get(file, [])
+        if (start, end) not in claims:
+            return
+
+        claims.remove((start, end))
+        del self._indexes[file]
+        for claim_start, claim_end in claims:
+            super().add(file, claim_start, claim_end)
+
+    def release(self, segment: Segment):
+        """
+        Releases the claim of a video segment, which may be a copy of the claimed video segment
+        """
+        if not isinstance(segment, VideoSegment):
+            return
+
+        self.remove(segment.file, segment.source_start_time, segment.source_end_time)
+        for index, claimed_segment in enumerate(self):
+            if (
+                claimed_segment.file == segment.file
+                and claimed_segment.source_start_time == segment.source_start_time
+                and claimed_segment.duration == segment.duration
+            ):
+                del self[index]
+                break
+
+    def append(self, segment: Segment):
+        # Only video segments claim footage
+        if isinstance(segment, VideoSegment):
+            super().append(segment)
+
+    def overlaps(self, file: str, start: float, end: float) -> bool:
+        """
+        Returns
+        -------
+        True if the time range of the file overlaps used or claimed footage, False otherwise
+        """
+        return self.used_footage.overlaps(file, start, end) or super().overlaps(
+            file, start, end
+        )
+
+    def unused_time_ranges(
+        self, file: str, start: float, end: float
+    ) -> List[Tuple[float, float]]:
+        """
+        Returns
+        -------
+        The portions of the time range of the file which are at least the minimum gap away from
+        used and claimed footage
+        """
+        unused_time_ranges = []
+        for unused_start, unused_end in self.used_footage.unused_time_ranges(
+            file, start, end
+        ):
+            unused_time_ranges += super().unused_time_ranges(
+                file, unused_start, unused_end
+            )
+
+        return unused_time_ranges
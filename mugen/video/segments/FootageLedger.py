@@ -0,0 +1,179 @@
+import os
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+from mugen.utilities import system
+from mugen.utilities.cache import CACHE_DIRECTORY
+from mugen.video.segments.UsedFootage import UsedFootage
+from mugen.video.segments.VideoSegment import VideoSegment
+
+FOOTAGE_LEDGER_FILE_NAME = "footage_ledger.sqlite"
+
+
+class FootageLedger(UsedFootage):
+    """
+    Used footage which is stored in an SQLite database, and shared between processes.
+    Use to avoid repeating footage across several music videos generated at once from the same video files.
+
+    Reservations from other processes are read incrementally before each overlap check,
+    and checked against an in-memory index, so checks stay fast with large numbers of reservations.
+    Files are identified by their absolute paths, so processes running from different directories agree.
+
+    Attributes
+    ----------
+    path
+        Path to the ledger's database file
+    """
+
+    path: str
+    _connection: Optional[sqlite3.Connection]
+    _lock: threading.RLock
+    _last_reservation_id: int
+
+    def __init__(self, path: Optional[str] = None, *, minimum_gap: float = 0):
+        """
+        Parameters
+        ----------
+        path
+            Path to the ledger's database file.
+            Defaults to a file in the directory set by the MUGEN_CACHE_DIRECTORY environment variable,
+            or ~/.cache/mugen
+
+        minimum_gap
+            Minimum time (seconds) between a video segment and used footage from the same file,
+            below which the video segment counts as a repeat
+        """
+        self.path = path or os.path.join(CACHE_DIRECTORY, FOOTAGE_LEDGER_FILE_NAME)
+        self._connection = None
+        self._lock = threading.RLock()
+        self._last_reservation_id = 0
+        super().__init__(minimum_gap=minimum_gap)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.path}>"
+
+    def __getstate__(self):
+        """
+        Custom pickling
+        """
+        state = self.__dict__.copy()
+
+        # Connections and locks cannot be pickled, and are recreated on use
+        state["_connection"] = None
+        state["_lock"] = None
+
+        return state
+
+    def __setstate__(self, newstate):
+        """
+        Custom unpickling
+        """
+        newstate["_lock"] = threading.RLock()
+        self.__dict__.update(newstate)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if not self._connection:
+            system.ensure_directory_exists(os.path.dirname(os.path.abspath(self.path)))
+            # Transactions are managed explicitly, so that reservations can be made atomically
+            self._connection = sqlite3.connect(
+                self.path, timeout=60, check_same_thread=False, isolation_level=None
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS reservations "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, file TEXT, start REAL, end REAL)"
+            )
+
+        return self._connection
+
+    def add(self, file: str, start: float, end: float):
+        """
+        Marks a time range of a file as used, for all processes sharing the ledger
+        """
+        with self._lock:
+            self._insert(file, start, end)
+
+    def overlaps(self, file: str, start: float, end: float) -> bool:
+        """
+        Returns
+        -------
+        True if the time range of the file overlaps footage used by any process sharing the ledger,
+        False otherwise
+        """
+        with self._lock:
+            self._sync()
+            return super().overlaps(os.path.abspath(file), start, end)
+
+    def unused_time_ranges(
+        self, file: str, start: float, end: float
+    ) -> List[Tuple[float, float]]:
+        """
+        Returns
+        -------
+        The portions of the time range of the file which are at least the minimum gap away from footage used
+        by any process sharing the ledger
+        """
+        with self._lock:
+            self._sync()
+            return super().unused_time_ranges(os.path.abspath(file), start, end)
+
+    def reserve(self, segment: VideoSegment) -> bool:
+        """
+        Atomically appends the video segment if it does not overlap footage used by any process sharing the ledger
+
+        Returns
+        -------
+        True if the video segment was reserved, False otherwise
+        """
+        with self._lock:
+            # Hold the database's write lock between checking and reserving the footage
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._sync()
+                if self.overlaps_segment(segment):
+                    return False
+
+                list.append(self, segment)
+                self._insert(
+                    segment.file, segment.source_start_time, segment.source_end_time
+                )
+            finally:
+                self.connection.execute("COMMIT")
+
+        return True
+
+    def clear(self):
+        """
+        Removes all reservations from the ledger.
+        Other processes sharing the ledger keep any reservations they have already read
+        """
+        with self._lock:
+            self.connection.execute("DELETE FROM reservations")
+            self._indexes.clear()
+            list.clear(self)
+
+    def close(self):
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+    def _insert(self, file: str, start: float, end: float):
+        self.connection.execute(
+            "INSERT INTO reservations (file, start, end) VALUES (?, ?, ?)",
+            (os.path.abspath(file), start, end),
+        )
+        self._sync()
+
+    def _sync(self):
+        """
+        Reads reservations made since the last sync into the in-memory index
+        """
+        rows = self.connection.execute(
+            "SELECT id, file, start, end FROM reservations WHERE id > ? ORDER BY id",
+            (self._last_reservation_id,),
+        ).fetchall()
+        for reservation_id, file, start, end in rows:
+            super().add(file, start, end)
+            self._last_reservation_id = reservation_id
@@ -0,0 +1,94 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from mugen.utilities.intervals import IntervalIndex
+from mugen.video.segments.VideoSegment import VideoSegment
+
+
+class UsedFootage(list):
+    """
+    A list of video segments which have been used, indexed by file for fast overlap checks.
+    Use as the memory for the is_repeat ContextFilter.
+
+    Attributes
+    ----------
+    minimum_gap
+        Minimum time (seconds) between a video segment and used footage from the same file,
+        below which the video segment counts as a repeat
+    """
+
+    minimum_gap: float
+    _indexes: Dict[str, IntervalIndex]
+
+    def __init__(
+        self, segments: Optional[List[VideoSegment]] = None, *, minimum_gap: float = 0
+    ):
+        super().__init__()
+        self.minimum_gap = minimum_gap
+        self._indexes = {}
+
+        self.extend(segments or [])
+
+    def append(self, segment: VideoSegment):
+        super().append(segment)
+
+        if isinstance(segment, VideoSegment):
+            self.add(segment.file, segment.source_start_time, segment.source_end_time)
+
+    def extend(self, segments: Iterable[VideoSegment]):
+        for segment in segments:
+            self.append(segment)
+
+    def add(self, file: str, start: float, end: float):
+        """
+        Marks a time range of a file as used
+        """
+        self._indexes.setdefault(file, IntervalIndex()).add(start, end)
+
+    def reserve(self, segment: VideoSegment) -> bool:
+        """
+        Appends the video segment if it does not overlap used footage
+
+        Returns
+        -------
+        True if the video segment was reserved, False otherwise
+        """
+        if self.overlaps_segment(segment):
+            return False
+
+        self.append(segment)
+
+        return True
+
+    def overlaps(self, file: str, start: float, end: float) -> bool:
+        """
+        Returns
+        -------
+        True if the time range of the file overlaps used footage, False otherwise
+        """
+        index = self._indexes.get(file)
+
+        return index is not None and index.overlaps(start, end, self.minimum_gap)
+
+    def overlaps_segment(self, segment: VideoSegment) -> bool:
+        """
+        Returns
+        -------
+        True if the video segment overlaps used footage, False otherwise
+        """
+        return self.overlaps(
+            segment.file, segment.source_start_time, segment.source_end_time
+        )
+
+    def unused_time_ranges(
+        self, file: str, start: float, end: float
+    ) -> List[Tuple[float, float]]:
+        """
+        Returns
+        -------
+        The portions of the time range of the file which are at least the minimum gap away from used footage
+        """
+        index = self._indexes.get(file)
+        if index is None:
+            return [(start, end)] if start < end else []
+
+        return index.gaps(start, end, self.minimum_gap)
@@ -1,4 +1,4 @@
-import json
+from functools import partial
 from pathlib import Path
 from typing import List, Optional
 
@@ -9,6 +9,10 @@ from moviepy.video.io.VideoFileClip import VideoFileClip
 from mugen.constants import TIME_FORMAT
 from mugen.utilities import conversion, general, system
 from mugen.utilities.conversion import convert_time_to_seconds
+from mugen.video import analysis
+from mugen.video.analysis import FrameIndex
+from mugen.video.io.DecoderPool import DecoderKey, decoder_pool, read_frame
+from mugen.video.io.MetadataStore import metadata_store
 from mugen.video.segments.Segment import Segment
 
 
@@ -20,10 +24,15 @@ class VideoSegment(Segment, VideoFileClip):
     ----------
     source_start_time
         Start time of the video segment in the video file (seconds)
+
+    frame_index
+        Per-frame measurements for the video file, used by filters in place of decoding frames.
+        See :func:`~mugen.video.sources.VideoSource.VideoSource.analyze`
     """
 
     source_start_time: float
-    _streams: List[dict]
+    frame_index: Optional[FrameIndex]
+    _decoder_key: DecoderKey
 
     def __init__(self, file: str = None, **kwargs):
         """
@@ -35,10 +44,17 @@ class VideoSegment(Segment, VideoFileClip):
         """
         super().__init__(file, **kwargs)
 
+        # Read frames through the shared decoder pool, which reuses warm readers across segments and subclips
+        self._decoder_key = decoder_pool.add(
+            self.reader, fps_source=kwargs.get("fps_source", "tbr")
+        )
+        self.reader = None
+        self.make_frame = partial(read_frame, self._decoder_key)
+
         self.source_start_time = 0
         if not self.fps:
             self.fps = Segment.DEFAULT_VIDEO_FPS
-        self._streams = None
+        self.frame_index = None
 
     def __repr__(self):
         return (
@@ -55,6 +71,13 @@ class VideoSegment(Segment, VideoFileClip):
         # Remove the video segment's audio and reader to allow pickling
         state["reader"] = None
         state["audio"] = None
+        state["_has_audio"] = self.audio is not None
+
+        # Frame indexes cover the whole video file, so are looked up by path on unpickling instead
+        state["frame_index"] = None
+        state["_frame_index_path"] = (
+            self.frame_index.path if self.frame_index is not None else None
+        )
 
         return state
 
@@ -62,12 +85,18 @@ class VideoSegment(Segment, VideoFileClip):
         """
         Custom unpickling
         """
-        # Recreate the video segment's audio and reader
-        newstate["reader"] = FFMPEG_VideoReader(newstate["filename"])
-        newstate["audio"] = AudioFileClip(newstate["filename"]).subclip(
-            newstate["source_start_time"],
-            newstate["source_start_time"] + newstate["duration"],
-        )
+        # Recreate the video segment's audio, and its reader if it does not read through the decoder pool
+        if "_decoder_key" not in newstate:
+            newstate["reader"] = FFMPEG_VideoReader(newstate["filename"])
+        if newstate.pop("_has_audio", True):
+            newstate["audio"] = AudioFileClip(newstate["filename"]).subclip(
+                newstate["source_start_time"],
+                newstate["source_start_time"] + newstate["duration"],
+            )
+        newstate.pop("_reader_lock", None)
+        frame_index_path = newstate.pop("_frame_index_path", None)
+        if frame_index_path:
+            newstate["frame_index"] = analysis.find_frame_index(frame_index_path)
         self.__dict__.update(newstate)
 
     """ PROPERTIES """
@@ -89,23 +118,19 @@ class VideoSegment(Segment, VideoFileClip):
         return conversion.seconds_to_time_code(self.source_start_time)
 
     @property
-    def streams(self) -> List[dict]:
-        if not self._streams:
-            result = system.run_command(
-                [
-                    "ffprobe",
-                    "-v",
-                    "quiet",
-                    "-print_format",
-                    "json",
-                    "-show_format",
-                    "-show_streams",
-                    f"{self.file}",
-                ]
-            )
-            self._streams = json.loads(result.stdout).get("streams", [])
+    def cache_key(self) -> str:
+        key = f"{system.file_identity(self.file)}:{self.source_start_time:.3f}:{self.source_end_time:.3f}"
+
+        # Results looked up from a frame index are measured differently from results for decoded frames
+        if self.frame_index is not None:
+            key += ":indexed"
 
-        return self._streams
+        return key
+
+    @property
+    def streams(self) -> List[dict]:
+        # Shared by all segments of the file, including subclips and unpickled segments
+        return metadata_store.get(self.file)["streams"]
 
     @property
     def video_streams(self) -> List[dict]:
@@ -163,6 +188,8 @@ class VideoSegment(Segment, VideoFileClip):
         return subclip
 
     def trailing_buffer(self, duration) -> "VideoSegment":
+        # Rebuild the buffer from the video file, as the segment may have effects applied already.
+        # Frames are still read through the decoder pool
         return VideoSegment(self.file).subclip(
             self.source_end_time, self.source_end_time + duration
         )
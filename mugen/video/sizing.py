@@ -1,5 +1,6 @@
+import operator
 from enum import Enum
-from typing import Any, List, NamedTuple, Tuple, Union
+from typing import Any, List, NamedTuple, Optional, Tuple, Union
 
 
 class AspectRatio(float, Enum):
@@ -107,3 +108,17 @@ def largest_dimensions_for_aspect_ratio(
             largest_dimensions = nearest_dimensions_to_aspect_ratio
 
     return largest_dimensions
+
+
+def largest_dimensions(
+    dimensions_list: List[Dimensions], aspect_ratio: Optional[float] = None
+) -> Dimensions:
+    """
+    Returns
+    -------
+    The largest dimensions, after cropping each dimensions to reach the aspect ratio if one is given
+    """
+    if aspect_ratio:
+        return largest_dimensions_for_aspect_ratio(dimensions_list, aspect_ratio)
+
+    return max(dimensions_list, key=operator.attrgetter("resolution"))
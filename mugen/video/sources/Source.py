@@ -75,14 +75,12 @@ class SourceList(WeightableList):
         -------
         A string describing the weights for the sources
         """
-        flattened_sources = self.flatten()
+        flattened_weights = self.flatten_weights()
 
         string = ""
-        for index, (source, weight) in enumerate(
-            zip(flattened_sources, flattened_sources.weight_percentages)
-        ):
-            string += f"{source.name}: {weight:.2f}%"
-            if index != len(flattened_sources) - 1:
+        for index, (source, weight) in enumerate(flattened_weights):
+            string += f"{source.name}: {weight * 100:.2f}%"
+            if index != len(flattened_weights) - 1:
                 string += ", \n"
 
         return string
@@ -1,20 +1,48 @@
-from typing import List, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
 
-from numpy.random import choice
+import numpy
 
+from mugen.exceptions import ParameterError, SamplingError
+from mugen.utilities.cache import Cache
 from mugen.video.filters import VideoFilter
 from mugen.video.segments import Segment
-from mugen.video.sources.Source import SourceList
+from mugen.video.segments.UsedFootage import UsedFootage
+from mugen.video.sources.Source import Source, SourceList
+from mugen.video.sources.VideoSource import SamplingStrategy, VideoSource
 
 
 class SourceSampler:
     """
     A set of content sources for sampling video segments
+
+    Attributes
+    ----------
+    sources
+        The flattened sources, shared with the nested list the sampler was created from
+
+    weights
+        Each source's weight, distributed and normalized across the nested list
+
+    used_footage
+        Footage which has already been used, which video sources avoid when sampling with the coverage strategy
     """
 
     sources: SourceList
-
-    def __init__(self, sources: Union[SourceList, list]):
+    weights: numpy.ndarray
+    sampling_strategy: Optional[SamplingStrategy]
+    used_footage: Optional[UsedFootage]
+    _cumulative_weights: numpy.ndarray
+    _last_weighted_index: int
+    _unfit_durations: Dict[Source, float]
+
+    def __init__(
+        self,
+        sources: Union[SourceList, list],
+        *,
+        sampling_strategy: Optional[SamplingStrategy] = None,
+        used_footage: Optional[UsedFootage] = None,
+    ):
         """
         video_segments
 
@@ -23,11 +51,54 @@ class SourceSampler:
         sources
             An arbitrarily nested list of sources. Sources will be flattened internally.
             e.g. [S1, S2, [S3, S4]] -> [S1, S2, S3, S4]
+
+        sampling_strategy
+            Method of choosing start times when sampling from video sources.
+            Defaults to each video source's own sampling strategy
+
+        used_footage
+            Footage which has already been used, which video sources avoid when sampling with the coverage strategy.
+            Keep it up to date as segments are used
         """
         if not isinstance(sources, SourceList):
             sources = SourceList(sources)
+        if not sum(sources.weights) > 0:
+            raise ParameterError("Sources must have a positive total weight.")
+
+        flattened_weights = sources.flatten_weights()
+        self.sources = SourceList([source for source, _ in flattened_weights])
+        self.weights = numpy.array([weight for _, weight in flattened_weights])
+        self.sampling_strategy = sampling_strategy
+        self.used_footage = used_footage
+        self._cumulative_weights = numpy.cumsum(self.weights)
+        self._last_weighted_index = numpy.flatnonzero(self.weights > 0)[-1]
+        self._unfit_durations = {}
+
+    def sample_sources(self, count: int) -> List[Source]:
+        """
+        Randomly selects sources according to their weights.
+        Each selection is a binary search over the sources' cumulative weights, precomputed on creation.
 
-        self.sources = sources.flatten()
+        Parameters
+        ----------
+        count
+            Number of sources to select
+
+        Returns
+        -------
+        The selected sources, which may repeat
+        """
+        total_weight = self._cumulative_weights[-1]
+        indexes = numpy.searchsorted(
+            self._cumulative_weights,
+            numpy.random.random(count) * total_weight,
+            side="right",
+        )
+        # Guard against floating point error at the top of the range,
+        # which would otherwise select trailing sources without weight
+        indexes = numpy.minimum(indexes, self._last_weighted_index)
+
+        return [self.sources[index] for index in indexes]
 
     def sample(self, duration: float) -> Segment:
         """
@@ -42,12 +113,65 @@ class SourceSampler:
         -------
         A randomly sampled segment with the specified duration
         """
-        selected_source = choice(self.sources, p=self.sources.normalized_weights)
-        sample = selected_source.sample(duration)
-
-        return sample
+        return self._sample_from_source(self.sample_sources(1)[0], duration)
 
-    def sample_with_filters(self, duration: float, filters: List[VideoFilter]):
+    def _sample_from_source(self, source: Source, duration: float) -> Segment:
+        """
+        Samples a segment from the source, or from another source if the source cannot fit the duration.
+        Sources which cannot fit a duration are excluded from later samples at least as long.
+        """
+        while True:
+            if not self._is_unfit(source, duration):
+                try:
+                    return self._sample_segment(source, duration)
+                except SamplingError:
+                    self._unfit_durations[source] = min(
+                        duration, self._unfit_durations.get(source, numpy.inf)
+                    )
+                    continue
+
+            source = self._sample_fitting_source(duration)
+
+    def _is_unfit(self, source: Source, duration: float) -> bool:
+        return duration >= self._unfit_durations.get(source, numpy.inf)
+
+    def _sample_fitting_source(self, duration: float) -> Source:
+        weights = numpy.array(
+            [
+                0 if self._is_unfit(source, duration) else weight
+                for source, weight in zip(self.sources, self.weights)
+            ]
+        )
+        total_weight = weights.sum()
+        if not total_weight > 0:
+            raise SamplingError(
+                f"No source can fit a segment with duration {duration}. "
+                f"Try using longer sources or wider time boundaries."
+            )
+
+        return self.sources[
+            numpy.random.choice(len(self.sources), p=weights / total_weight)
+        ]
+
+    def _sample_segment(self, source: Source, duration: float) -> Segment:
+        if isinstance(source, VideoSource):
+            return source.sample(
+                duration,
+                strategy=self.sampling_strategy,
+                used_footage=self.used_footage,
+            )
+
+        return source.sample(duration)
+
+    def sample_with_filters(
+        self,
+        duration: float,
+        filters: List[VideoFilter],
+        *,
+        batch_size: int = 1,
+        max_attempts: Optional[int] = None,
+        cache: Optional[Cache] = None,
+    ):
         """
         Randomly samples a segment with the specified duration which passes the specified filters
 
@@ -55,21 +179,73 @@ class SourceSampler:
         ----------
         duration
             duration of the sample
+
         filters
-            duration of the sample
+            filters the sample must pass
+
+        batch_size
+            Number of candidate segments to sample and evaluate concurrently at a time.
+            The first candidate in a batch to pass all filters is returned.
+            Filters must be safe to run from multiple threads when greater than 1
+
+        max_attempts
+            Maximum number of candidate segments to sample before giving up.
+            Defaults to sampling until a segment passes
+
+        cache
+            Cache to look up and store filter results in
 
         Returns
         -------
         A tuple of a randomly sampled segment with the specified duration, and any rejected segments
         """
-        video_segment = None
+        if batch_size < 1:
+            raise ValueError(f"Batch size must be at least 1, got {batch_size}")
+
+        attempts = 0
         rejected_video_segments = []
-        while not video_segment:
-            sampled_segment = self.sample(duration)
-            sampled_segment.apply_filters(filters)
-            if not sampled_segment.failed_filters:
-                video_segment = sampled_segment
-            else:
-                rejected_video_segments.append(sampled_segment)
-
-        return video_segment, rejected_video_segments
+        # Single candidates are evaluated inline, without the overhead of a thread pool
+        executor = (
+            ThreadPoolExecutor(max_workers=batch_size) if batch_size > 1 else None
+        )
+        try:
+            while max_attempts is None or attempts < max_attempts:
+                number_of_candidates = batch_size
+                if max_attempts is not None:
+                    number_of_candidates = min(batch_size, max_attempts - attempts)
+                attempts += number_of_candidates
+
+                candidates = [
+                    self._sample_from_source(source, duration)
+                    for source in self.sample_sources(number_of_candidates)
+                ]
+                evaluations = [
+                    executor.submit(candidate.apply_filters, filters, cache=cache)
+                    if executor
+                    else None
+                    for candidate in candidates
+                ]
+                for candidate, evaluation in zip(candidates, evaluations):
+                    if evaluation:
+                        evaluation.result()
+                    else:
+                        candidate.apply_filters(filters, cache=cache)
+
+                    if not candidate.failed_filters:
+                        # Skip evaluating any later candidates which have not started yet
+                        for remaining_evaluation in evaluations:
+                            if remaining_evaluation:
+                                remaining_evaluation.cancel()
+
+                        return candidate, rejected_video_segments
+
+                    rejected_video_segments.append(candidate)
+        finally:
+            if executor:
+                executor.shutdown()
+
+        raise SamplingError(
+            f"Failed to sample a segment with duration {duration} which passes filters "
+            f"{[filter.name for filter in filters]} after {attempts} attempts. "
+            f"Try using longer or more varied sources, or fewer filters."
+        )
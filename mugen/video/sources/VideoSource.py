@@ -2,16 +2,34 @@ import glob as globber
 import os
 import random
 import re
+import threading
+from collections import OrderedDict
+from enum import Enum
 from pathlib import Path
 from typing import List, NamedTuple, Optional, Tuple, Union
 
+import numpy
+from moviepy.audio.io.AudioFileClip import AudioFileClip
+from moviepy.audio.io.readers import FFMPEG_AudioReader
 from numpy.random import choice
+from tqdm import tqdm
 
+from mugen import lists
 from mugen.constants import TIME_FORMAT
-from mugen.exceptions import ParameterError
-from mugen.utilities import system
+from mugen.exceptions import ParameterError, SamplingError
+from mugen.utilities import conversion, system
 from mugen.utilities.conversion import convert_time_to_seconds
+from mugen.video import analysis, detection, scanning
+from mugen.video.analysis import FrameIndex
+from mugen.video.io.MetadataStore import (
+    DEFAULT_PROBE_WORKERS,
+    VideoMetadata,
+    metadata_store,
+)
+from mugen.video.scanning import ScanReport
+from mugen.video.segments.UsedFootage import UsedFootage
 from mugen.video.segments.VideoSegment import VideoSegment
+from mugen.video.sizing import Dimensions
 from mugen.video.sources.Source import Source, SourceList
 
 GLOB_STAR = "*"
@@ -35,18 +53,55 @@ class TimeRange(TimeRangeBase):
         return self.end - self.start
 
 
+class SamplingStrategy(str, Enum):
+    """
+    Method of choosing start times when sampling video segments
+
+    uniform: Sample start times uniformly at random, leaving filters to reject unsuitable segments
+    shots: Sample start times only within shots, spans of the video without cuts or low contrast.
+    Requires the video source to be analyzed
+    coverage: Sample start times only within footage which has not been used yet,
+    so that sampled segments are never repeats
+    """
+
+    UNIFORM = "uniform"
+    SHOTS = "shots"
+    COVERAGE = "coverage"
+
+
 class VideoSource(Source):
     """
     A video source for sampling video segments
+
+    Attributes
+    ----------
+    sampling_strategy
+        Method of choosing start times when sampling video segments
+
+    lazy
+        Whether the video file is only opened once a segment is sampled from it.
+        Until then, the source only holds the video file's metadata.
     """
 
+    MAX_OPEN_LAZY_SOURCES = 32
+
     time_boundaries: List[Tuple[(TIME_FORMAT, TIME_FORMAT)]]
+    sampling_strategy: SamplingStrategy
+    lazy: bool
+    _file: str
+    _segment: Optional[VideoSegment]
+    _metadata: Optional[VideoMetadata]
+    _frame_index: Optional[FrameIndex]
+    _shot_time_ranges: Optional[Tuple[list, List[TimeRange]]]
+    _time_boundary_arrays: Optional[Tuple[list, numpy.ndarray, numpy.ndarray]]
 
     def __init__(
         self,
         file: str,
         *,
         time_boundaries: Optional[List[Tuple[(TIME_FORMAT, TIME_FORMAT)]]] = None,
+        sampling_strategy: SamplingStrategy = SamplingStrategy.UNIFORM,
+        lazy: bool = False,
         **kwargs,
     ):
         """
@@ -58,26 +113,238 @@ class VideoSource(Source):
         time_boundaries
             the set of time ranges to sample from in the video.
             For supported formats, see :data:`~mugen.constants.TIME_FORMAT`.
+
+        sampling_strategy
+            Method of choosing start times when sampling video segments
+
+        lazy
+            Whether to only open the video file once a segment is sampled from it.
+            Useful for large libraries of video files, most of which may never be sampled from
         """
         super().__init__(**kwargs)
-        self.segment = VideoSegment(file)
+        self.lazy = lazy
+        self._file = file
+        self._segment = None
+        self._metadata = None
+        self._frame_index = None
+        if lazy:
+            self._metadata = metadata_store.get_video_metadata(file)
+        else:
+            self._segment = VideoSegment(file)
         self.time_boundaries = time_boundaries if time_boundaries else []
+        self.sampling_strategy = sampling_strategy
+        self._shot_time_ranges = None
+        self._time_boundary_arrays = None
+        if self.time_boundaries:
+            self._get_time_boundary_arrays()
 
     def __repr__(self):
         return (
-            f"<{self.__class__.__name__}: {self.name}, duration: {self.segment.duration_time_code}, "
+            f"<{self.__class__.__name__}: {self.name}, "
+            f"duration: {conversion.seconds_to_time_code(self.duration)}, "
             f"weight: {self.weight}>"
         )
 
     @property
-    def file(self):
-        return self.segment.file
+    def segment(self) -> VideoSegment:
+        """
+        The video segment for the whole video file, which is opened on first access for lazy sources
+        """
+        if self._segment is None:
+            self._segment = VideoSegment(self._file)
+            self._segment.frame_index = self._frame_index
+            if self.lazy and self._segment.audio is not None:
+                audio = self._segment.audio
+                # Read through the audio clip itself, so that segments sampled before it closes reopen it
+                audio.make_frame = lambda t: _read_audio_frame(audio, t)
+
+        if self.lazy:
+            _track_open_lazy_video_source(self)
+
+        return self._segment
+
+    @segment.setter
+    def segment(self, segment: VideoSegment):
+        self._segment = segment
+
+    @property
+    def file(self) -> str:
+        return self._file
+
+    @property
+    def name(self) -> str:
+        return Path(self._file).stem
+
+    @property
+    def duration(self) -> float:
+        return self._metadata.duration if self._metadata else self.segment.duration
+
+    @property
+    def fps(self) -> float:
+        return self._metadata.fps if self._metadata else self.segment.fps
+
+    @property
+    def dimensions(self) -> Dimensions:
+        return self._metadata.dimensions if self._metadata else self.segment.dimensions
+
+    @property
+    def frame_index(self) -> Optional[FrameIndex]:
+        return self._segment.frame_index if self._segment else self._frame_index
+
+    def close(self):
+        """
+        Closes the video file's audio reader, which reopens when the audio is next read.
+        Video frames are read through the shared decoder pool, which keeps its own limit on open readers.
+        """
+        audio = self._segment.audio if self._segment else None
+        if audio is not None and audio.reader is not None:
+            audio.close()
+
+    def analyze(
+        self,
+        *,
+        width: int = analysis.ANALYSIS_WIDTH,
+        detect_text: bool = False,
+        use_cache: bool = True,
+    ) -> FrameIndex:
+        """
+        Analyzes the video file in a single pass, indexing measurements for every frame.
+        Filters then look up measurements for sampled segments from the index instead of decoding their frames.
+
+        Parameters
+        ----------
+        width
+            width to decode the video at for analysis
+
+        detect_text
+            Whether to also measure the likelihood of text in each frame,
+            allowing text detection to skip frames which cannot contain text
+
+        use_cache
+            Whether to reuse and store the analysis in the cache directory
+        """
+        analysis_path = analysis.get_analysis_path(
+            self.file, [str(width), str(self.fps), str(detect_text)]
+        )
+        if use_cache and os.path.exists(analysis_path):
+            frame_index = FrameIndex.load(analysis_path)
+        else:
+            frame_index = analysis.analyze_video_file(
+                self.file,
+                self.dimensions,
+                self.fps,
+                width=width,
+                detect_text=detect_text,
+            )
+            frame_index.path = analysis_path
+            if use_cache:
+                frame_index.save(analysis_path)
+        analysis.register_frame_index(frame_index)
+
+        self._frame_index = frame_index
+        if self._segment:
+            self._segment.frame_index = frame_index
+        self._shot_time_ranges = None
+
+        return frame_index
 
     @property
-    def name(self):
-        return self.segment.name
+    def shot_time_ranges(self) -> List[TimeRange]:
+        """
+        Returns
+        -------
+        Maximal time ranges in the video without cuts or low contrast, within the video's time boundaries
+        """
+        if self.frame_index is None:
+            raise ParameterError(
+                f"Video source {self.name} must be analyzed before finding shots."
+            )
+
+        # Shots depend on time boundaries, which may be changed at any time
+        time_boundaries = [tuple(boundary) for boundary in self.time_boundaries]
+        if (
+            self._shot_time_ranges is None
+            or self._shot_time_ranges[0] != time_boundaries
+        ):
+            self._shot_time_ranges = (time_boundaries, self._get_shot_time_ranges())
+
+        return self._shot_time_ranges[1]
+
+    def _get_shot_time_ranges(self) -> List[TimeRange]:
+        frame_index = self.frame_index
+
+        # Shots are runs of frames with good contrast, broken by frames which change abruptly
+        usable_frames = frame_index.luma_ranges > detection.LOW_CONTRAST_THRESHOLD
+        cut_frames = frame_index.scene_scores > detection.INDEX_CUT_DETECTION_THRESHOLD
+        first_frames, end_frames = _get_shot_frame_ranges(usable_frames, cut_frames)
+
+        # Shots end when their last frame stops showing, at the next frame or the end of the video
+        times = numpy.append(frame_index.times, self.duration)
+        shot_time_ranges = [
+            TimeRange(float(times[first_frame]), float(times[end_frame]))
+            for first_frame, end_frame in zip(first_frames, end_frames)
+        ]
+
+        return _intersect_time_ranges(
+            shot_time_ranges, self._get_boundary_time_ranges()
+        )
+
+    def _get_boundary_time_ranges(self) -> List[TimeRange]:
+        if self.time_boundaries:
+            return [
+                TimeRange(start, end)
+                for start, end in zip(*self._get_time_boundary_arrays())
+            ]
 
-    def sample(self, duration: float) -> VideoSegment:
+        return [TimeRange(0, self.duration)]
+
+    def _get_unused_time_ranges(
+        self, used_footage: Optional[UsedFootage]
+    ) -> List[TimeRange]:
+        """
+        Returns
+        -------
+        Time ranges in the video which are not used footage, within the video's time boundaries
+        """
+        time_ranges = self._get_boundary_time_ranges()
+        if used_footage is None:
+            return time_ranges
+
+        return [
+            TimeRange(start, end)
+            for time_range in time_ranges
+            for start, end in used_footage.unused_time_ranges(
+                self.file, time_range.start, time_range.end
+            )
+        ]
+
+    def _get_time_boundary_arrays(self) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Returns
+        -------
+        The start and end times (seconds) of the time boundaries,
+        parsed once and again only when the time boundaries change
+        """
+        if (
+            self._time_boundary_arrays is None
+            or self._time_boundary_arrays[0] != self.time_boundaries
+        ):
+            time_ranges = [TimeRange(*boundary) for boundary in self.time_boundaries]
+            self._time_boundary_arrays = (
+                list(self.time_boundaries),
+                numpy.array([time_range.start for time_range in time_ranges]),
+                numpy.array([time_range.end for time_range in time_ranges]),
+            )
+
+        return self._time_boundary_arrays[1], self._time_boundary_arrays[2]
+
+    def sample(
+        self,
+        duration: float,
+        *,
+        strategy: Optional[SamplingStrategy] = None,
+        used_footage: Optional[UsedFootage] = None,
+    ) -> VideoSegment:
         """
         Randomly samples a video segment with the specified duration.
 
@@ -85,24 +352,51 @@ class VideoSource(Source):
         ----------
         duration
             duration of the video segment to sample
+
+        strategy
+            Method of choosing the start time. Defaults to the video source's sampling strategy
+
+        used_footage
+            Footage which has already been used, to avoid with the coverage sampling strategy
         """
-        if self.time_boundaries:
+        strategy = strategy or self.sampling_strategy
+
+        if strategy in [SamplingStrategy.SHOTS, SamplingStrategy.COVERAGE]:
+            if strategy == SamplingStrategy.SHOTS:
+                time_ranges = self.shot_time_ranges
+            else:
+                time_ranges = self._get_unused_time_ranges(used_footage)
+
+            time_range_to_sample = _choose_time_range(time_ranges, duration)
+            if time_range_to_sample is None:
+                # No time range is long enough, so leave rejecting unsuitable segments to filters
+                return self.sample(duration, strategy=SamplingStrategy.UNIFORM)
+        elif self.time_boundaries:
             # Select a random time boundary to sample from, weighted by duration
-            time_ranges = [TimeRange(*boundary) for boundary in self.time_boundaries]
-            time_ranges = [
-                time_range
-                for time_range in time_ranges
-                if time_range.duration >= duration
-            ]
-            total_duration = sum([time_range.duration for time_range in time_ranges])
-            time_range_weights = [
-                time_range.duration / total_duration for time_range in time_ranges
-            ]
-            time_range_to_sample = time_ranges[
-                choice(len(time_ranges), p=time_range_weights)
-            ]
+            starts, ends = self._get_time_boundary_arrays()
+            durations = ends - starts
+            fits_duration = durations >= duration
+            if not fits_duration.any():
+                raise SamplingError(
+                    f"No time boundary of video source {self.name} is at least {duration} seconds long. "
+                    f"Time boundaries: {self.time_boundaries}"
+                )
+
+            cumulative_durations = numpy.cumsum(
+                numpy.where(fits_duration, durations, 0)
+            )
+            if cumulative_durations[-1] > 0:
+                index = numpy.searchsorted(
+                    cumulative_durations,
+                    numpy.random.random() * cumulative_durations[-1],
+                    side="right",
+                )
+                index = min(index, len(cumulative_durations) - 1)
+            else:
+                index = choice(numpy.flatnonzero(fits_duration))
+            time_range_to_sample = TimeRange(starts[index], ends[index])
         else:
-            time_range_to_sample = TimeRange(0, self.segment.duration)
+            time_range_to_sample = TimeRange(0, self.duration)
 
         start_time = random.uniform(
             time_range_to_sample.start, time_range_to_sample.end - duration
@@ -112,16 +406,128 @@ class VideoSource(Source):
         return sampled_clip
 
 
+_open_lazy_video_sources: "OrderedDict[int, VideoSource]" = OrderedDict()
+_open_lazy_video_sources_lock = threading.Lock()
+
+
+def _track_open_lazy_video_source(video_source: VideoSource):
+    """
+    Marks a lazy video source as most recently used,
+    closing the least recently used lazy video sources beyond the limit of open sources
+    """
+    with _open_lazy_video_sources_lock:
+        _open_lazy_video_sources.pop(id(video_source), None)
+        _open_lazy_video_sources[id(video_source)] = video_source
+
+        closed_video_sources = []
+        while len(_open_lazy_video_sources) > VideoSource.MAX_OPEN_LAZY_SOURCES:
+            closed_video_sources.append(_open_lazy_video_sources.popitem(last=False)[1])
+
+    for closed_video_source in closed_video_sources:
+        closed_video_source.close()
+
+
+def _read_audio_frame(audio: AudioFileClip, t: float) -> numpy.ndarray:
+    """
+    Reads an audio clip's frame at time t, reopening its reader if the clip has been closed
+    """
+    if audio.reader is None:
+        audio.reader = FFMPEG_AudioReader(
+            audio.filename, fps=audio.fps, buffersize=audio.buffersize
+        )
+
+    return audio.reader.get_frame(t)
+
+
+def _get_shot_frame_ranges(
+    usable_frames: numpy.ndarray, cut_frames: numpy.ndarray
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Finds shots in a single pass over the frames, as runs of usable frames which are not broken by cuts
+
+    Returns
+    -------
+    The first frame of each shot, and the frame after the last frame of each shot
+    """
+    if not len(usable_frames):
+        return numpy.array([], dtype=int), numpy.array([], dtype=int)
+
+    # Number frames by shot, and mark unusable frames, so that each run of equal numbers is a shot or a gap
+    shot_numbers = numpy.where(
+        usable_frames, numpy.cumsum(cut_frames | ~usable_frames), -1
+    )
+    run_starts = numpy.flatnonzero(numpy.diff(shot_numbers)) + 1
+    first_frames = numpy.concatenate(([0], run_starts))
+    end_frames = numpy.concatenate((run_starts, [len(shot_numbers)]))
+    shots = usable_frames[first_frames]
+
+    return first_frames[shots], end_frames[shots]
+
+
+def _choose_time_range(
+    time_ranges: List[TimeRange], duration: float
+) -> Optional[TimeRange]:
+    """
+    Returns
+    -------
+    A random time range at least as long as the duration, weighted by its span of possible start times,
+    or None if no time range is long enough
+    """
+    time_ranges = [
+        time_range for time_range in time_ranges if time_range.duration >= duration
+    ]
+    if not time_ranges:
+        return None
+
+    start_time_spans = numpy.array(
+        [time_range.duration - duration for time_range in time_ranges]
+    )
+    time_range_weights = (
+        start_time_spans / start_time_spans.sum()
+        if start_time_spans.sum() > 0
+        else None
+    )
+
+    return time_ranges[choice(len(time_ranges), p=time_range_weights)]
+
+
+def _intersect_time_ranges(
+    time_ranges: List[TimeRange], other_time_ranges: List[TimeRange]
+) -> List[TimeRange]:
+    """
+    Returns
+    -------
+    The overlapping portions of two lists of time ranges
+    """
+    intersections = []
+    for time_range in time_ranges:
+        for other_time_range in other_time_ranges:
+            start = max(time_range.start, other_time_range.start)
+            end = min(time_range.end, other_time_range.end)
+            if start < end:
+                intersections.append(TimeRange(start, end))
+
+    return intersections
+
+
 class VideoSourceList(SourceList):
     """
     A list of video sources
+
+    Attributes
+    ----------
+    scan_report
+        Video files found, and other files skipped or unreadable, while scanning directories and globs for the list
     """
 
     name: Optional[str]
+    scan_report: ScanReport
 
     def __init__(
         self,
         sources=Optional[Union[List[Union[str, Source, "VideoSourceList"]], str]],
+        *,
+        lazy: bool = False,
         **kwargs,
     ):
         """
@@ -130,15 +536,24 @@ class VideoSourceList(SourceList):
         sources
             A list of sources.
             Accepts arbitrarily nested video files, directories, globs, Sources, VideoSources, and VideoSourceLists.
+
+        lazy
+            Whether to create lazy video sources from video files, which are only opened once sampled from.
+            See :class:`~mugen.video.sources.VideoSource.VideoSource`
         """
         self.name = None
+        self.scan_report = ScanReport()
         video_sources = []
 
         if isinstance(sources, str):
             self.name = Path(sources).stem
-            video_sources = self._get_sources_from_path(sources)
+            video_sources = self._get_sources_from_path(
+                sources, lazy=lazy, report=self.scan_report
+            )
         else:
-            video_sources = self._get_sources_from_list(sources)
+            video_sources = self._get_sources_from_list(
+                sources, lazy=lazy, report=self.scan_report
+            )
 
         super().__init__(video_sources, **kwargs)
 
@@ -151,18 +566,67 @@ class VideoSourceList(SourceList):
 
         return super().list_repr()
 
+    def analyze(self, *, show_progress: bool = True, **kwargs):
+        """
+        Analyzes all video sources in the list.
+        See :meth:`~mugen.video.sources.VideoSource.VideoSource.analyze` for supported parameters
+
+        Parameters
+        ----------
+        show_progress
+            Whether to output progress information to stdout
+        """
+        video_sources = [
+            source for source in lists.flatten(self) if isinstance(source, VideoSource)
+        ]
+        for video_source in tqdm(video_sources, disable=not show_progress):
+            video_source.analyze(**kwargs)
+
+    def probe(
+        self,
+        *,
+        workers: int = DEFAULT_PROBE_WORKERS,
+        show_progress: bool = True,
+    ):
+        """
+        Probes the metadata of all video sources in the list in parallel,
+        storing it in the shared :data:`~mugen.video.io.MetadataStore.metadata_store`
+
+        Parameters
+        ----------
+        workers
+            Maximum number of ffprobe processes to run at once
+
+        show_progress
+            Whether to output progress information to stdout
+        """
+        metadata_store.populate(
+            [
+                source.file
+                for source in lists.flatten(self)
+                if isinstance(source, VideoSource)
+            ],
+            workers=workers,
+            show_progress=show_progress,
+        )
+
     @staticmethod
     def _get_sources_from_path(
-        path: str,
+        path: str, *, lazy: bool = False, report: Optional[ScanReport] = None
     ) -> List[Union[VideoSource, "VideoSourceList"]]:
         sources = []
+        report = report if report is not None else ScanReport()
 
         if GLOB_STAR in path:
-            sources = VideoSourceList._get_sources_from_glob_path(path)
+            sources = VideoSourceList._get_sources_from_glob_path(
+                path, lazy=lazy, report=report
+            )
         elif os.path.isdir(path):
-            sources = VideoSourceList._get_sources_from_directory(path)
+            sources = VideoSourceList._get_sources_from_directory(
+                path, lazy=lazy, report=report
+            )
         else:
-            sources = [VideoSource(path)]
+            sources = [VideoSource(path, lazy=lazy)]
 
         if len(sources) == 0:
             raise IOError(f"No file(s) found for {path}")
@@ -171,49 +635,104 @@ class VideoSourceList(SourceList):
 
     @staticmethod
     def _get_sources_from_glob_path(
-        glob_path: str,
+        glob_path: str, *, lazy: bool = False, report: Optional[ScanReport] = None
     ) -> List[Union[VideoSource, "VideoSourceList"]]:
         sources = []
         # Escape square brackets, which are common in file names and affect glob
         paths = globber.glob(re.sub(r"([\[\]])", "[\\1]", glob_path))
+        file_sources = {
+            source.file: source
+            for source in VideoSourceList._get_sources_from_files(
+                [path for path in paths if os.path.isfile(path)],
+                lazy=lazy,
+                report=report,
+            )
+        }
         for path in paths:
-            path_sources = VideoSourceList._get_sources_from_path(path)
             if os.path.isdir(path):
-                sources.append(VideoSourceList(path_sources))
-            else:
-                sources.extend(path_sources)
+                sources.append(
+                    VideoSourceList(
+                        VideoSourceList._get_sources_from_path(
+                            path, lazy=lazy, report=report
+                        )
+                    )
+                )
+            elif path in file_sources:
+                sources.append(file_sources[path])
 
         return sources
 
     @staticmethod
     def _get_sources_from_directory(
-        directory: str,
-    ) -> List[Union[VideoSource, "VideoSourceList"]]:
+        directory: str, *, lazy: bool = False, report: Optional[ScanReport] = None
+    ) -> List[VideoSource]:
+        return VideoSourceList._get_sources_from_files(
+            system.list_directory_files(directory), lazy=lazy, report=report
+        )
+
+    @staticmethod
+    def _get_sources_from_files(
+        files: List[str], *, lazy: bool = False, report: Optional[ScanReport] = None
+    ) -> List[VideoSource]:
+        # Only probed files with video streams are opened
+        files_report = scanning.scan_files(files)
+        if report is not None:
+            report.skipped_files.extend(files_report.skipped_files)
+            report.unreadable_files.extend(files_report.unreadable_files)
+
+        return VideoSourceList._create_video_sources(
+            files_report.video_files, lazy=lazy, report=report
+        )
+
+    @staticmethod
+    def _create_video_sources(
+        files: List[str], *, lazy: bool = False, report: Optional[ScanReport] = None
+    ) -> List[VideoSource]:
         sources = []
-        for file in system.list_directory_files(directory):
+        for file in files:
             try:
-                sources.append(VideoSource(file))
+                sources.append(VideoSource(file, lazy=lazy))
             except IOError:
+                # Files which ffprobe can read may still fail to open
+                if report is not None:
+                    report.unreadable_files.append(file)
                 continue
 
+            if report is not None:
+                report.video_files.append(file)
+
         return sources
 
     @staticmethod
     def _get_sources_from_list(
         sources_list: List[Union[str, Source, "VideoSourceList"]],
+        *,
+        lazy: bool = False,
+        report: Optional[ScanReport] = None,
     ) -> List[Union[Source, "VideoSourceList"]]:
         sources = []
         for source in sources_list:
             if isinstance(source, str) and os.path.isfile(source):
-                sources.extend(VideoSourceList._get_sources_from_path(source))
+                sources.extend(
+                    VideoSourceList._get_sources_from_path(
+                        source, lazy=lazy, report=report
+                    )
+                )
             elif isinstance(source, str):
                 sources.append(
-                    VideoSourceList(VideoSourceList._get_sources_from_path(source))
+                    VideoSourceList(
+                        VideoSourceList._get_sources_from_path(
+                            source, lazy=lazy, report=report
+                        )
+                    )
                 )
             elif isinstance(source, Source) or isinstance(source, VideoSourceList):
                 sources.append(source)
             elif isinstance(source, list):
-                sources.append(VideoSourceList(source))
+                video_source_list = VideoSourceList(source, lazy=lazy)
+                if report is not None:
+                    report.extend(video_source_list.scan_report)
+                sources.append(video_source_list)
             else:
                 raise ParameterError(f"Unknown source type {source}")
 
@@ -73,21 +73,30 @@ def _get_effect_buffers(segment: Segment, next_segment: Segment):
 
 def apply_effects(segment) -> Segment:
     """
-    Composes the segment, applying all effects
+    Composes the segment, applying all effects which do not depend on the previous segment
 
     Returns
     -------
-    A new segment with all effects applied
+    A new segment with effects applied
     """
     segment = segment.copy()
     for effect in segment.effects:
-        segment = effect.apply(segment)
+        if not isinstance(effect, Crossfade):
+            segment = effect.apply(segment)
 
     return segment
 
 
 def apply_contextual_effects(segment: Segment, previous_segment: Segment):
+    """
+    Applies effects which depend on the previous segment, such as crossfades
+
+    Returns
+    -------
+    A new segment with contextual effects applied
+    """
     for effect in segment.effects:
-        segment = effect.apply(segment, previous_segment)
+        if isinstance(effect, Crossfade):
+            segment = effect.apply(segment, previous_segment)
 
     return segment
@@ -3,17 +3,27 @@ from pathlib import Path
 from typing import List
 
 from mugen import Filter, MusicVideo, MusicVideoGenerator
-from mugen.exceptions import ParameterError
+from mugen.exceptions import ParameterError, SamplingError
 from mugen.mixins import Persistable
 from mugen.utilities import system
+from mugen.utilities.cache import Cache
+from mugen.video import detection
 from mugen.video.effects import FadeIn, FadeOut
+from mugen.video.io.MetadataStore import metadata_store
 from mugen.video.io.VideoWriter import VideoWriter
-from mugen.video.sources.VideoSource import VideoSourceList
+from mugen.video.MusicVideo import RenderBackend
+from mugen.video.segments.FootageLedger import FootageLedger
+from mugen.video.sources.VideoSource import SamplingStrategy, VideoSourceList
 from scripts.cli.events import prepare_events
 from scripts.cli.utilities import message, shutdown
 
 
 def create_music_video(args):
+    if args.pipelined_render:
+        music_video, generator = generate_and_write_music_video(args)
+        print_rejected_segment_stats(music_video, generator.video_filters)
+        return
+
     music_video, generator = generate_music_video(args)
     apply_effects(music_video, args)
     print_rejected_segment_stats(music_video, generator.video_filters)
@@ -21,6 +31,59 @@ def create_music_video(args):
 
 
 def generate_music_video(args) -> MusicVideo:
+    generator, events = prepare_generator(args)
+
+    message("Generating music video from video segments and audio...")
+
+    try:
+        music_video = generator.generate_from_events(events)
+    except SamplingError as error:
+        shutdown(str(error))
+
+    return music_video, generator
+
+
+def generate_and_write_music_video(args) -> MusicVideo:
+    fade_in = args.fade_in
+    fade_out = args.fade_out
+    use_original_audio = args.use_original_audio
+    video_dimensions = args.video_dimensions
+    video_aspect_ratio = args.video_aspect_ratio
+
+    generator, events = prepare_generator(args)
+    (
+        music_video_directory,
+        music_video_output_path,
+        music_video_pickle_path,
+    ) = prepare_output_directory(args)
+
+    message(
+        f"Generating and writing music video '{music_video_output_path}' from video segments and audio..."
+    )
+
+    writer = VideoWriter()
+    configure_writer(writer, args)
+    try:
+        music_video = generator.write_from_events(
+            events,
+            music_video_output_path,
+            dimensions=video_dimensions,
+            aspect_ratio=video_aspect_ratio,
+            writer=writer,
+            opening_effects=[FadeIn(fade_in)] if fade_in else None,
+            closing_effects=[FadeOut(fade_out)] if fade_out else None,
+            use_original_audio=use_original_audio,
+        )
+    except SamplingError as error:
+        shutdown(str(error))
+
+    music_video.save(music_video_pickle_path)
+    output_segments(music_video, music_video_directory, args)
+
+    return music_video, generator
+
+
+def prepare_generator(args):
     audio_source = args.audio_source
     duration = args.duration
     video_sources = args.video_sources
@@ -28,27 +91,53 @@ def generate_music_video(args) -> MusicVideo:
     video_filters = args.video_filters
     exclude_video_filters = args.exclude_video_filters
     include_video_filters = args.include_video_filters
-
-    video_sources = VideoSourceList(video_sources, weights=video_source_weights)
+    workers = args.workers
+    sampling_batch_size = args.sampling_batch_size
+    max_sampling_attempts = args.max_sampling_attempts
+    minimum_repeat_gap = args.minimum_repeat_gap
+    footage_ledger = args.footage_ledger
+    use_cache = args.use_cache
+    analyze_video_sources = args.analyze_video_sources
+    lazy_video_sources = args.lazy_video_sources
+    sampling_strategy = SamplingStrategy(args.sampling_strategy)
+
+    video_sources = VideoSourceList(
+        video_sources, weights=video_source_weights, lazy=lazy_video_sources
+    )
+    scan_report = video_sources.scan_report
+    if scan_report.skipped_files:
+        message(
+            f"Skipped {len(scan_report.skipped_files)} files without video extensions"
+        )
+    for file in scan_report.unreadable_files:
+        message(f"Skipped unreadable video file '{file}'")
     generator = MusicVideoGenerator(audio_source, video_sources, duration=duration)
     generator.video_filters = video_filters
     generator.exclude_video_filters = exclude_video_filters
     generator.include_video_filters = include_video_filters
-
-    message(
-        f"Weights\n------------\n{generator.video_sources.flatten().weight_stats()}"
-    )
+    generator.workers = workers
+    generator.sampling_batch_size = sampling_batch_size
+    generator.max_sampling_attempts = max_sampling_attempts
+    generator.minimum_repeat_gap = minimum_repeat_gap
+    if footage_ledger:
+        generator.footage_ledger = FootageLedger(footage_ledger)
+    generator.sampling_strategy = sampling_strategy
+    if use_cache:
+        generator.cache = Cache()
+        metadata_store.cache = generator.cache
+
+    message(f"Weights\n------------\n{generator.video_sources.weight_stats()}")
 
     try:
         events = prepare_events(generator, args)
     except ParameterError as error:
         shutdown(str(error))
 
-    message("Generating music video from video segments and audio...")
+    if analyze_video_sources or sampling_strategy == SamplingStrategy.SHOTS:
+        message("Analyzing video sources...")
+        generator.video_sources.analyze()
 
-    music_video = generator.generate_from_events(events)
-
-    return music_video, generator
+    return generator, events
 
 
 def apply_effects(music_video: MusicVideo, args):
@@ -63,14 +152,11 @@ def apply_effects(music_video: MusicVideo, args):
 
 
 def output_music_video(music_video: MusicVideo, args):
-    video_preset = args.video_preset
-    video_codec = args.video_codec
-    video_crf = args.video_crf
-    audio_codec = args.audio_codec
-    audio_bitrate = args.audio_bitrate
     use_original_audio = args.use_original_audio
     video_dimensions = args.video_dimensions
     video_aspect_ratio = args.video_aspect_ratio
+    render_workers = args.render_workers
+    render_backend = RenderBackend(args.render_backend)
 
     (
         music_video_directory,
@@ -80,11 +166,7 @@ def output_music_video(music_video: MusicVideo, args):
 
     message(f"Writing music video '{music_video_output_path}'...")
 
-    music_video.writer.preset = video_preset
-    music_video.writer.codec = video_codec
-    music_video.writer.crf = video_crf
-    music_video.writer.audio_codec = audio_codec
-    music_video.writer.audio_bitrate = audio_bitrate
+    configure_writer(music_video.writer, args)
     if use_original_audio:
         music_video.audio_file = None
     if video_dimensions:
@@ -92,11 +174,22 @@ def output_music_video(music_video: MusicVideo, args):
     if video_aspect_ratio:
         music_video.aspect_ratio = video_aspect_ratio
 
-    music_video.write_to_video_file(music_video_output_path)
+    music_video.write_to_video_file(
+        music_video_output_path, workers=render_workers, backend=render_backend
+    )
     music_video.save(music_video_pickle_path)
     output_segments(music_video, music_video_directory, args)
 
 
+def configure_writer(writer: VideoWriter, args):
+    writer.preset = args.video_preset
+    writer.codec = args.video_codec
+    writer.crf = args.video_crf
+    writer.audio_codec = args.audio_codec
+    writer.audio_bitrate = args.audio_bitrate
+    writer.threads = args.video_threads
+
+
 def prepare_output_directory(args):
     output_directory = args.output_directory
     video_name = args.video_name
@@ -118,14 +211,20 @@ def prepare_output_directory(args):
 def output_segments(music_video: MusicVideo, directory: str, args):
     save_segments = args.save_segments
     save_rejected_segments = args.save_rejected_segments
+    scale_saved_segments = args.scale_saved_segments
+    save_segment_workers = args.save_segment_workers
 
     if save_segments:
         message("Saving video segments...")
-        music_video.write_video_segments(directory)
+        music_video.write_video_segments(
+            directory, scale=scale_saved_segments, workers=save_segment_workers
+        )
 
     if save_rejected_segments:
         message("Saving rejected video segments...")
-        music_video.write_rejected_video_segments(directory)
+        music_video.write_rejected_video_segments(
+            directory, scale=scale_saved_segments, workers=save_segment_workers
+        )
 
 
 def preview_music_video(args):
@@ -192,3 +291,14 @@ def print_rejected_segment_stats(music_video: MusicVideo, video_filters: List[Fi
         print(
             f"{number_of_failing_segments} segments failed filter {video_filter.name}"
         )
+
+    # Counts are only collected in the current process, so are empty when generating with workers
+    text_detection_counts = detection.text_detection_counts
+    if (
+        text_detection_counts.prescreened_frames
+        or text_detection_counts.recognized_frames
+    ):
+        print(
+            f"{text_detection_counts.prescreened_frames} frames ruled out by the text pre-screen, "
+            f"{text_detection_counts.recognized_frames} frames checked for text with OCR"
+        )
@@ -1,5 +1,7 @@
 import argparse
 
+from mugen.video.MusicVideo import RenderBackend
+from mugen.video.sources.VideoSource import SamplingStrategy
 from scripts.cli.commands import create_music_video, preview_music_video
 
 
@@ -51,6 +53,118 @@ def add_create_parser(command_parsers, parents):
         type=float,
         help="Fade-out for the music video (seconds)",
     )
+    create_parser.add_argument(
+        "-w",
+        "--workers",
+        dest="workers",
+        type=int,
+        help="""Number of worker processes to use for sampling and filtering video segments.
+         Speeds up generation on machines with multiple cores. Defaults to a single process""",
+    )
+    create_parser.add_argument(
+        "-rw",
+        "--render-workers",
+        dest="render_workers",
+        type=int,
+        help="""Number of worker processes to render the music video with.
+         The music video is split at cuts into a chunk for each worker, and the chunks are joined without re-encoding.
+         Defaults to a single process""",
+    )
+    create_parser.add_argument(
+        "-rb",
+        "--render-backend",
+        dest="render_backend",
+        default=RenderBackend.MOVIEPY.value,
+        choices=[e.value for e in RenderBackend],
+        help=f"""Method of rendering the music video.
+         {RenderBackend.FFMPEG.value} renders entirely within ffmpeg, which is much faster,
+         but supports only video segments with fades and crossfades.
+         Supported values are {[e.value for e in RenderBackend]}""",
+    )
+    create_parser.add_argument(
+        "-sbs",
+        "--sampling-batch-size",
+        dest="sampling_batch_size",
+        type=int,
+        default=1,
+        help="""Number of candidate segments to sample and filter concurrently for each cut.
+         Speeds up generation for video sources where many segments are rejected""",
+    )
+    create_parser.add_argument(
+        "-msa",
+        "--max-sampling-attempts",
+        dest="max_sampling_attempts",
+        type=int,
+        help="""Maximum number of candidate segments to sample for each cut before giving up.
+         Defaults to sampling until a segment passes the video filters""",
+    )
+    create_parser.add_argument(
+        "-mrg",
+        "--minimum-repeat-gap",
+        dest="minimum_repeat_gap",
+        type=float,
+        default=0,
+        help="""Minimum time (seconds) between segments from the same video file.
+         Segments closer than this to footage already used are rejected by the is_repeat filter""",
+    )
+    create_parser.add_argument(
+        "-fl",
+        "--footage-ledger",
+        dest="footage_ledger",
+        help="""Path to a footage ledger shared with other runs, e.g. several music videos generated at once.
+         Footage used by any run sharing the ledger is rejected by the is_repeat filter""",
+    )
+    create_parser.add_argument(
+        "-sst",
+        "--sampling-strategy",
+        dest="sampling_strategy",
+        default=SamplingStrategy.UNIFORM.value,
+        choices=[e.value for e in SamplingStrategy],
+        help=f"""Method of choosing start times when sampling video segments.
+         {SamplingStrategy.SHOTS.value} samples only within shots without cuts or low contrast,
+         which greatly reduces rejected segments, and implies --analyze-video-sources.
+         {SamplingStrategy.COVERAGE.value} samples only from footage which has not been used yet,
+         which avoids segments rejected as repeats.
+         Supported values are {[e.value for e in SamplingStrategy]}""",
+    )
+    create_parser.add_argument(
+        "-pr",
+        "--pipelined-render",
+        dest="pipelined_render",
+        action="store_true",
+        default=False,
+        help="""Encode each video segment as soon as it is sampled, and join the encoded segments at the end,
+         so that writing the music video overlaps with sampling. Without --video-dimensions,
+         the music video uses the largest dimensions among the video sources""",
+    )
+    create_parser.add_argument(
+        "-lvs",
+        "--lazy-video-sources",
+        dest="lazy_video_sources",
+        action="store_true",
+        default=False,
+        help="""Only open each video file once a segment is sampled from it.
+         Speeds up starting with large libraries of video files""",
+    )
+    create_parser.add_argument(
+        "-avs",
+        "--analyze-video-sources",
+        dest="analyze_video_sources",
+        action="store_true",
+        default=False,
+        help="""Analyze each video source in a single pass before generating the music video,
+         so that video filters can look up results instead of decoding each segment.
+         Analyses are stored in the cache directory and reused on subsequent runs""",
+    )
+    create_parser.add_argument(
+        "-uc",
+        "--use-cache",
+        dest="use_cache",
+        action="store_true",
+        default=False,
+        help="""Cache video filter results to speed up creating music videos from the same video sources repeatedly.
+         The cache is stored in the directory set by the MUGEN_CACHE_DIRECTORY environment variable, or ~/.cache/mugen""",
+    )
 
     return create_parser
 
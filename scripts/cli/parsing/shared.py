@@ -4,6 +4,7 @@ from fractions import Fraction
 from mugen import VideoFilter
 from mugen.video.filters import DEFAULT_VIDEO_FILTERS
 from mugen.video.io.VideoWriter import VideoWriter
+from mugen.video.MusicVideo import DEFAULT_SEGMENT_WORKERS
 from scripts.cli.events import AudioEventsMode, BeatsMode, OnsetsMode, TargetGroups
 
 DEFAULT_MUSIC_VIDEO_NAME = "music_video"
@@ -125,6 +126,15 @@ def get_video_parser():
         default=VideoWriter.DEFAULT_VIDEO_CRF,
         help="The crf quality value for the music video. Takes an integer from 0 (lossless) to 51 (lossy)",
     )
+    video_parser.add_argument(
+        "-vth",
+        "--video-threads",
+        dest="video_threads",
+        type=int,
+        help="""Number of threads for each ffmpeg process to encode with.
+         Useful to limit each process when rendering or saving segments with several workers.
+         Defaults to ffmpeg's choice""",
+    )
     video_parser.add_argument(
         "-vdim",
         "--video-dimensions",
@@ -160,6 +170,24 @@ def get_video_parser():
         default=False,
         help="Save all rejected segments that did not pass filters.",
     )
+    video_parser.add_argument(
+        "-uss",
+        "--unscaled-saved-segments",
+        dest="scale_saved_segments",
+        action="store_false",
+        default=True,
+        help="""Save segments at their original dimensions instead of cropping and scaling them to the music video.
+         Saved video segments are then cut from their video files without re-encoding, which is much faster,
+         but cuts are snapped to the nearest keyframes.""",
+    )
+    video_parser.add_argument(
+        "-ssw",
+        "--save-segment-workers",
+        dest="save_segment_workers",
+        type=int,
+        default=DEFAULT_SEGMENT_WORKERS,
+        help="Number of worker processes to save segments with",
+    )
 
     return video_parser
 
@@ -1,3 +1,5 @@
+from mugen.video import transformation
+from mugen.video.effects import FadeOut
 from mugen.video.segments.VideoSegment import VideoSegment
 from tests import MUSIC_VIDEO_PATH, TRACKING_SHOT_VIDEO_PATH
 
@@ -21,3 +23,39 @@ def test_video_segment__parses_streams():
     assert len(music_video_segment.get_subtitle_stream_content(0)) > 0
     assert len(music_video_segment.get_subtitle_stream_content(1)) > 0
     assert len(music_video_segment.get_subtitle_stream_content(2)) > 0
+
+
+def test_video_segment__trailing_buffer__continues_from_end_of_segment():
+    video_segment = get_tracking_shot_segment()
+    segment = video_segment.subclip(1, 2)
+    buffer = segment.trailing_buffer(0.5)
+
+    assert buffer.source_start_time == 2
+    assert buffer.duration == 0.5
+    assert (buffer.first_frame == video_segment.get_frame(2)).all()
+
+
+def test_video_segment__trailing_buffer__excludes_applied_effects():
+    video_segment = get_tracking_shot_segment()
+    segment = video_segment.subclip(1, 2)
+    segment.effects = [FadeOut(0.5)]
+    buffer = transformation.apply_effects(segment).trailing_buffer(0.5)
+
+    assert buffer.effects == []
+    assert (buffer.first_frame == video_segment.get_frame(2)).all()
+
+
+def test_video_segment__reads_same_frames_as_subclips_through_decoder_pool():
+    video_segment = get_tracking_shot_segment()
+    subclip = video_segment.subclip(2, 3)
+
+    assert (subclip.first_frame == video_segment.get_frame(2)).all()
+    assert (
+        video_segment.get_frame(1) == get_tracking_shot_segment().get_frame(1)
+    ).all()
+
+
+def test_video_segment__shares_streams_with_subclips():
+    music_video_segment = get_music_video_segment()
+
+    assert music_video_segment.subclip(1, 2).streams is music_video_segment.streams
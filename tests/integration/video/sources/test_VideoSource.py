@@ -1,8 +1,18 @@
 import os
+import shutil
 
+import numpy
 import pytest
 
-from mugen.video.sources.VideoSource import TimeRange, VideoSource, VideoSourceList
+from mugen.exceptions import SamplingError
+from mugen.video.analysis import FrameIndex
+from mugen.video.segments.UsedFootage import UsedFootage
+from mugen.video.sources.VideoSource import (
+    SamplingStrategy,
+    TimeRange,
+    VideoSource,
+    VideoSourceList,
+)
 from tests import (
     MEDIA_PATH,
     MUSIC_VIDEO_PATH,
@@ -23,7 +33,7 @@ def get_five_percent_duration(video_source) -> float:
     """
     Returns a duration corresponding to five percent of the video source's duration
     """
-    return video_source.segment.duration * 0.05
+    return video_source.duration * 0.05
 
 
 def test_sample__has_correct_duration():
@@ -60,6 +70,70 @@ def test_time_boundaries__multiple_boundaries():
     )
 
 
+def test_time_boundaries__raises_error_when_no_boundary_fits_duration():
+    tracking_shot_source = get_tracking_shot_source()
+    duration = get_five_percent_duration(tracking_shot_source)
+    tracking_shot_source.time_boundaries.append(TimeRange(0, duration / 2))
+
+    with pytest.raises(SamplingError):
+        tracking_shot_source.sample(duration)
+
+
+def test_sample__samples_within_shots_with_shots_strategy():
+    tracking_shot_source = get_tracking_shot_source()
+    tracking_shot_source.analyze(use_cache=False)
+    duration = get_five_percent_duration(tracking_shot_source)
+    sample = tracking_shot_source.sample(duration, strategy=SamplingStrategy.SHOTS)
+
+    assert any(
+        shot.start <= sample.source_start_time
+        and sample.source_end_time <= shot.end + 0.001
+        for shot in tracking_shot_source.shot_time_ranges
+    )
+
+
+def test_shot_time_ranges__include_last_frame_of_each_shot():
+    tracking_shot_source = get_tracking_shot_source()
+    tracking_shot_source.segment.frame_index = FrameIndex(
+        numpy.array([0, 0.5, 1, 1.5]),
+        numpy.zeros(4, dtype=numpy.uint8),
+        numpy.full(4, 255, dtype=numpy.uint8),
+        numpy.array([0, 1, 0, 0], dtype=numpy.float32),
+    )
+
+    assert tracking_shot_source.shot_time_ranges == [
+        TimeRange(0, 0.5),
+        TimeRange(0.5, tracking_shot_source.duration),
+    ]
+
+
+def test_sample__lazy_source_opens_video_file_on_first_sample():
+    tracking_shot_source = VideoSource(TRACKING_SHOT_VIDEO_PATH, lazy=True)
+    eager_tracking_shot_source = get_tracking_shot_source()
+
+    assert tracking_shot_source._segment is None
+    assert tracking_shot_source.duration == pytest.approx(
+        eager_tracking_shot_source.duration, abs=0.1
+    )
+    assert tracking_shot_source.dimensions == eager_tracking_shot_source.dimensions
+
+    duration = get_five_percent_duration(tracking_shot_source)
+    assert tracking_shot_source.sample(duration).duration == pytest.approx(duration)
+    assert tracking_shot_source._segment is not None
+
+
+def test_close__reopens_audio_for_previously_sampled_segments():
+    music_video_source = VideoSource(MUSIC_VIDEO_PATH, lazy=True)
+    segment = music_video_source.sample(1)
+    audio_frame = segment.audio.get_frame(0.5)
+
+    music_video_source.close()
+
+    assert music_video_source.segment.audio.reader is None
+    assert (segment.audio.get_frame(0.5) == audio_frame).all()
+    assert music_video_source.segment.audio.reader is not None
+
+
 def test_video_source_list__populates_from_path():
     video_source_list = VideoSourceList(TRACKING_SHOT_VIDEO_PATH)
 
@@ -86,6 +160,12 @@ def test_video_source_list__populates_from_directory():
     assert type(video_source_list[1]) == VideoSource
 
 
+def test_video_source_list__populates_lazy_sources_from_directory():
+    video_source_list = VideoSourceList(VIDEO_DIRECTORY, lazy=True)
+
+    assert all(video_source.lazy for video_source in video_source_list)
+
+
 def test_video_source_list__populates_from_file_glob():
     video_source_list = VideoSourceList(FACE_VIDEO_GLOB)
 
@@ -146,3 +226,32 @@ def test_video_source_list__throws_error_for_nonexistant_files():
         VideoSourceList("non_existant_directory")
     with pytest.raises(IOError):
         VideoSourceList(["non_existant_file.mkv"])
+
+
+def test_video_source_list__reports_skipped_and_unreadable_files(tmp_path):
+    skipped_file = os.path.join(tmp_path, "notes.txt")
+    unreadable_file = os.path.join(tmp_path, "broken.mp4")
+    for file in [skipped_file, unreadable_file]:
+        with open(file, "w") as text_file:
+            text_file.write("Not a video")
+    shutil.copy(TRACKING_SHOT_VIDEO_PATH, tmp_path)
+
+    video_source_list = VideoSourceList(str(tmp_path))
+
+    assert len(video_source_list) == 1
+    assert video_source_list.scan_report.skipped_files == [skipped_file]
+    assert video_source_list.scan_report.unreadable_files == [unreadable_file]
+
+
+def test_sample__samples_unused_footage_with_coverage_strategy():
+    tracking_shot_source = get_tracking_shot_source()
+    duration = get_five_percent_duration(tracking_shot_source)
+    used_footage = UsedFootage()
+    used_footage.add(tracking_shot_source.file, 0, tracking_shot_source.duration / 2)
+
+    for _ in range(10):
+        sample = tracking_shot_source.sample(
+            duration, strategy=SamplingStrategy.COVERAGE, used_footage=used_footage
+        )
+
+        assert not used_footage.overlaps_segment(sample)
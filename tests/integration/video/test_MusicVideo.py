@@ -2,7 +2,9 @@ import os
 
 from mugen import MusicVideo
 from mugen.utilities import system
+from mugen.video.effects import Crossfade
 from mugen.video.filters import VideoFilter
+from mugen.video.MusicVideo import RenderBackend
 from tests.integration.video.segments.test_ImageSegment import (
     get_landscape_image_segment,
 )
@@ -26,6 +28,15 @@ def test_music_video__writes_to_file():
     assert os.path.isfile(music_video_path)
 
 
+def test_music_video__writes_to_file_in_chunks():
+    music_video = get_basic_music_video()
+    music_video.segments[1].effects.append(Crossfade(0.5))
+
+    music_video_path = music_video.write_to_video_file(workers=2, show_progress=False)
+
+    assert os.path.isfile(music_video_path)
+
+
 def test_music_video__saves_and_loads():
     music_video = get_basic_music_video()
     music_video_file = music_video.save()
@@ -46,6 +57,20 @@ def test_music_video__saves_segments(tmp_path):
     assert len(segment_files) == len(music_video.segments)
 
 
+def test_music_video__saves_unscaled_segments_without_re_encoding(tmp_path):
+    music_video = get_basic_music_video()
+    segments_path = os.path.join(tmp_path, "music_video")
+    music_video.write_video_segments(segments_path, scale=False, workers=2)
+
+    segment_files = system.list_directory_files(
+        os.path.join(segments_path, "video_segments")
+    )
+    tracking_shot_extension = os.path.splitext(music_video.segments[0].file)[1]
+
+    assert len(segment_files) == len(music_video.segments)
+    assert any(file.endswith(tracking_shot_extension) for file in segment_files)
+
+
 def test_music_video__saves_rejected_segments(tmp_path):
     music_video = get_basic_music_video()
     landscape_image = get_landscape_image_segment()
@@ -64,3 +89,17 @@ def test_music_video__saves_rejected_segments(tmp_path):
     )
 
     assert len(segment_files) == len(music_video.rejected_segments)
+
+
+def test_music_video__writes_to_file_with_ffmpeg():
+    short_tracking_shot_segment = get_tracking_shot_segment().subclip(end_time=1)
+    music_video = MusicVideo(
+        [short_tracking_shot_segment, short_tracking_shot_segment.subclip(0.5)]
+    )
+    music_video.segments[1].effects.append(Crossfade(0.25))
+
+    music_video_path = music_video.write_to_video_file(
+        workers=2, backend=RenderBackend.FFMPEG, show_progress=False
+    )
+
+    assert os.path.isfile(music_video_path)
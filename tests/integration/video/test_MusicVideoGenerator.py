@@ -1,6 +1,8 @@
 import os
 
 from mugen import MusicVideoGenerator
+from mugen.video.segments.UsedFootage import UsedFootage
+from mugen.video.sources.VideoSource import SamplingStrategy
 from tests import TWO_BEATS_AUDIO_PATH
 from tests.integration.video.sources.test_VideoSource import get_tracking_shot_source
 
@@ -17,6 +19,39 @@ def test_music_video_generator__generates_music_video():
     assert os.path.isfile(music_video_path)
 
 
+def test_music_video_generator__writes_music_video_while_generating(tmp_path):
+    generator = MusicVideoGenerator(
+        audio_file=TWO_BEATS_AUDIO_PATH, video_sources=[get_tracking_shot_source()]
+    )
+    music_video_path = os.path.join(tmp_path, "music_video.mkv")
+
+    two_beats_music_video = generator.write_from_events(
+        generator.audio.beats(), music_video_path, show_progress=False
+    )
+
+    assert len(two_beats_music_video.segments) == 3
+    assert os.path.isfile(music_video_path)
+
+
+def test_music_video_generator__samples_coverage_without_overlaps_with_workers():
+    tracking_shot_source = get_tracking_shot_source()
+    generator = MusicVideoGenerator(
+        video_sources=[tracking_shot_source], duration=tracking_shot_source.duration / 2
+    )
+    generator.video_filters = []
+    generator.sampling_strategy = SamplingStrategy.COVERAGE
+    generator.workers = 2
+    events = [generator.duration * index / 8 for index in range(1, 8)]
+
+    music_video = generator.generate_from_events(events, show_progress=False)
+
+    used_footage = UsedFootage()
+    for segment in music_video.segments:
+        assert not used_footage.overlaps_segment(segment)
+        used_footage.append(segment)
+    assert len(music_video.segments) == 8
+
+
 def test_music_video_generator__creates_preview():
     generator = MusicVideoGenerator(audio_file=TWO_BEATS_AUDIO_PATH)
     preview = generator.preview_from_events(generator.audio.beats())
@@ -65,6 +65,15 @@ def test_image_has_text__does_not_detect_text_when_there_is_no_text(file):
     assert detection.image_has_text(Image.open(file)) is False
 
 
+def test_images_have_text__detects_text_for_each_image_in_batch():
+    files = image_files_with_text + image_files_without_text
+    images = [Image.open(file) for file in files]
+
+    assert detection.images_have_text(images) == [True] * len(image_files_with_text) + [
+        False
+    ] * len(image_files_without_text)
+
+
 @pytest.mark.parametrize("file", video_segment_files_with_cuts)
 def test_video_segment_has_cut__detects_cut_when_there_is_a_cut(file):
     assert detection.video_segment_has_cut(VideoSegment(file)) is True
@@ -86,3 +95,14 @@ def test_video_segment_has_cut__detects_cut_in_precise_time_range_correctly():
     )
     assert detection.video_segment_has_cut(segment_with_cut_at_very_end) is True
     assert detection.video_segment_has_cut(segment_with_cut_at_very_beginning) is True
+
+
+def test_video_segments_have_cuts__detects_cuts_in_multiple_time_ranges_of_a_file():
+    video_segment = VideoSegment(PRECISE_CUT_VIDEO_PATH)
+    video_segments = [
+        video_segment.subclip(1.6, 4.6),
+        video_segment.subclip(1.6, 4.4),
+        video_segment.subclip(0.9, 3.9),
+    ]
+
+    assert detection.video_segments_have_cuts(video_segments) == [True, False, True]
@@ -1,6 +1,9 @@
+import os
+
 import pytest
 
 from mugen.mixins.Filterable import ContextFilter, Filter, Filterable
+from mugen.utilities.cache import Cache
 
 
 def is_repeat(x, memory):
@@ -93,3 +96,36 @@ def test_apply_filters___shorts_circuits_properly():
     filterable.apply_filters(get_failing_filter_combo_short_circuit())
     assert len(filterable.passed_filters) == 0
     assert len(filterable.failed_filters) == 1
+
+
+class CacheableFilterable(Filterable):
+    cache_key = "filterable"
+
+
+def test_apply_filters__uses_cached_results_for_versioned_filters(tmp_path):
+    calls = []
+
+    def has_text(x):
+        calls.append(x)
+        return True
+
+    filter_cache = Cache(os.path.join(tmp_path, "cache.sqlite"))
+    for _ in range(2):
+        filterable = CacheableFilterable()
+        filterable.apply_filters([Filter(has_text, version="1")], cache=filter_cache)
+        assert len(filterable.passed_filters) == 1
+
+    assert len(calls) == 1
+
+
+def test_filter__with_options__passes_options_to_filter_function():
+    def has_text(x, threshold=0):
+        return x > threshold
+
+    video_filter = Filter(has_text, version="1")
+    strict_video_filter = video_filter.with_options(threshold=5)
+
+    assert video_filter(3) is True
+    assert strict_video_filter(3) is False
+    assert video_filter.cache_version == "1"
+    assert strict_video_filter.cache_version == "1:threshold=5"
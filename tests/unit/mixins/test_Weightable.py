@@ -153,3 +153,18 @@ def test_weight_fractions(weightables, expected_fractions):
 def test_weightable_list(weightables, expected_weights):
     flat_weightables = weightables.flatten()
     assert flat_weightables.weights == expected_weights
+
+
+def test_weightable_list__flatten_weights_does_not_copy_weightables():
+    weightables = get_nested_weightables()
+
+    flattened_weights = weightables.flatten_weights()
+
+    assert flattened_weights[0][0] is weightables[0]
+    assert [weight for _, weight in flattened_weights] == [
+        pytest.approx(1 / 2),
+        pytest.approx(1 / 6),
+        pytest.approx(1 / 6),
+        pytest.approx(1 / 6),
+    ]
+    assert weightables[0].weight == 3
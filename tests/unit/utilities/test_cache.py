@@ -0,0 +1,45 @@
+import os
+
+from mugen.utilities import cache
+from mugen.utilities.cache import Cache
+
+
+class Item:
+    cache_key = "item"
+
+
+def get_cache(directory) -> Cache:
+    return Cache(os.path.join(directory, "cache.sqlite"))
+
+
+def test_cache__returns_cached_value_for_key_name_and_version(tmp_path):
+    test_cache = get_cache(tmp_path)
+    test_cache.set("key", "name", "1", [1, 2, 3])
+
+    assert test_cache.get("key", "name", "1") == [1, 2, 3]
+    assert test_cache.get("key", "name", "2") is None
+    assert test_cache.get("other_key", "name", "1") is None
+
+
+def test_cache__persists_values_between_instances(tmp_path):
+    get_cache(tmp_path).set("key", "name", "1", True)
+
+    assert get_cache(tmp_path).get("key", "name", "1") is True
+
+
+def test_memoize__computes_value_once_with_active_cache(tmp_path):
+    computations = []
+
+    def compute():
+        computations.append(1)
+        return 5
+
+    with cache.use_cache(get_cache(tmp_path)):
+        assert cache.memoize(Item(), "name", "1", compute) == 5
+        assert cache.memoize(Item(), "name", "1", compute) == 5
+
+    assert len(computations) == 1
+
+
+def test_memoize__computes_value_without_active_cache():
+    assert cache.memoize(Item(), "name", "1", lambda: 5) == 5
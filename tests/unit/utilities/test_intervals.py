@@ -0,0 +1,72 @@
+import pytest
+
+from mugen.utilities.intervals import IntervalIndex
+
+
+def get_interval_index(intervals) -> IntervalIndex:
+    index = IntervalIndex()
+    for start, end in intervals:
+        index.add(start, end)
+
+    return index
+
+
+@pytest.mark.parametrize(
+    "intervals, expected_intervals",
+    [
+        ([(0, 1), (2, 3)], [(0, 1), (2, 3)]),
+        ([(2, 3), (0, 1)], [(0, 1), (2, 3)]),
+        ([(0, 2), (1, 3)], [(0, 3)]),
+        ([(0, 1), (1, 2)], [(0, 2)]),
+        ([(0, 1), (2, 3), (4, 5), (0.5, 4.5)], [(0, 5)]),
+        ([(0, 10), (2, 3)], [(0, 10)]),
+    ],
+)
+def test_interval_index__add__merges_overlapping_intervals(
+    intervals, expected_intervals
+):
+    assert list(get_interval_index(intervals)) == expected_intervals
+
+
+@pytest.mark.parametrize(
+    "start, end, gap, expected_overlaps",
+    [
+        (1.5, 1.8, 0, False),
+        (0.5, 1.5, 0, True),
+        (1.5, 2.5, 0, True),
+        (1, 2, 0, False),
+        (-1, 0, 0, False),
+        (3, 4, 0, False),
+        (5, 6, 0, False),
+        (4.5, 4.6, 0, True),
+        (1.5, 1.8, 0.25, True),
+        (3.3, 3.6, 0.25, False),
+        (3.3, 3.6, 0.5, True),
+    ],
+)
+def test_interval_index__overlaps(start, end, gap, expected_overlaps):
+    index = get_interval_index([(0, 1), (2, 3), (4, 5)])
+
+    assert index.overlaps(start, end, gap) == expected_overlaps
+
+
+def test_interval_index__total_length():
+    assert get_interval_index([(0, 1), (0.5, 2), (4, 5)]).total_length == 3
+
+
+@pytest.mark.parametrize(
+    "start, end, gap, expected_gaps",
+    [
+        (0, 5, 0, [(1, 2), (3, 4)]),
+        (-1, 6, 0, [(-1, 0), (1, 2), (3, 4), (5, 6)]),
+        (0.5, 2.5, 0, [(1, 2)]),
+        (1.2, 1.8, 0, [(1.2, 1.8)]),
+        (0, 1, 0, []),
+        (-1, 6, 0.25, [(-1, -0.25), (1.25, 1.75), (3.25, 3.75), (5.25, 6)]),
+        (0, 5, 0.5, []),
+    ],
+)
+def test_interval_index__gaps(start, end, gap, expected_gaps):
+    index = get_interval_index([(0, 1), (2, 3), (4, 5)])
+
+    assert index.gaps(start, end, gap) == expected_gaps
@@ -0,0 +1,136 @@
+import pytest
+
+from mugen.video.io import DecoderPool as decoder_pool_module
+from mugen.video.io.DecoderPool import DecoderKey, DecoderPool
+
+
+class VideoReaderStub:
+    """
+    Stands in for a video file reader, returning itself and the time requested as frames
+    """
+
+    def __init__(self, file: str, **kwargs):
+        self.filename = file
+        self.pix_fmt = "rgb24"
+        self.size = (320, 240)
+        self.resize_algo = "bicubic"
+        self.fps = 10
+        self.proc = None
+        self.pos = 1
+        self.closed = False
+
+    def get_frame(self, t: float):
+        # Start "ffmpeg" on the first read, and move to the frame after time t
+        self.proc = self.proc or object()
+        self.pos = int(self.fps * t + 0.00001) + 1
+
+        return self, t
+
+    def close(self):
+        self.proc = None
+        self.closed = True
+
+
+def open_reader_stub(file: str) -> VideoReaderStub:
+    reader = VideoReaderStub(file)
+    reader.get_frame(0)
+
+    return reader
+
+
+@pytest.fixture
+def stub_video_reader(monkeypatch):
+    monkeypatch.setattr(decoder_pool_module, "FFMPEG_VideoReader", VideoReaderStub)
+
+
+def test_decoder_pool__reuses_reader_at_later_position():
+    pool = DecoderPool()
+    reader = open_reader_stub("video.mp4")
+    key = pool.add(reader)
+
+    frame_reader, t = pool.get_frame(key, 2)
+
+    assert frame_reader is reader
+    assert t == 2
+
+
+def test_decoder_pool__opens_new_reader_to_seek_backwards_or_far_forwards():
+    pool = DecoderPool()
+    reader = open_reader_stub("video.mp4")
+    key = pool.add(reader)
+    pool.get_frame(key, 5)
+
+    backwards_reader, _ = pool.get_frame(key, 1)
+    far_forwards_reader, _ = pool.get_frame(
+        key, 5 + (decoder_pool_module.MAX_FRAMES_SKIPPED + 1) / reader.fps
+    )
+
+    assert backwards_reader is not reader
+    assert far_forwards_reader is not reader
+    assert not reader.closed
+
+
+def test_decoder_pool__releases_readers_after_use():
+    pool = DecoderPool()
+    key = pool.add(open_reader_stub("video.mp4"))
+
+    first_reader, _ = pool.get_frame(key, 1)
+    second_reader, _ = pool.get_frame(key, 2)
+
+    assert first_reader is second_reader
+    assert len(pool._idle_readers) == 1
+
+
+def test_decoder_pool__opens_reader_for_unknown_key(stub_video_reader):
+    pool = DecoderPool()
+    key = DecoderKey("video.mp4", "rgb24", (320, 240), "bicubic", "tbr")
+
+    reader, _ = pool.get_frame(key, 1)
+
+    assert isinstance(reader, VideoReaderStub)
+    assert reader.filename == "video.mp4"
+    assert pool.get_frame(key, 2)[0] is reader
+
+
+def test_decoder_pool__evicts_least_recently_used_readers():
+    pool = DecoderPool(max_readers=2)
+    first_reader = open_reader_stub("first.mp4")
+    second_reader = open_reader_stub("second.mp4")
+    third_reader = open_reader_stub("third.mp4")
+
+    first_key = pool.add(first_reader)
+    pool.add(second_reader)
+    pool.get_frame(first_key, 1)
+    pool.add(third_reader)
+
+    assert second_reader.closed
+    assert not first_reader.closed
+    assert not third_reader.closed
+    assert len(pool._idle_readers) == 2
+
+
+def test_decoder_pool__evicts_readers_beyond_limit_per_file():
+    pool = DecoderPool(max_readers_per_file=1)
+    first_reader = open_reader_stub("video.mp4")
+    second_reader = open_reader_stub("video.mp4")
+    other_reader = open_reader_stub("other.mp4")
+
+    pool.add(first_reader)
+    pool.add(other_reader)
+    pool.add(second_reader)
+
+    assert first_reader.closed
+    assert not second_reader.closed
+    assert not other_reader.closed
+
+
+def test_decoder_pool__close_closes_idle_readers():
+    pool = DecoderPool()
+    readers = [open_reader_stub("first.mp4"), open_reader_stub("second.mp4")]
+    for reader in readers:
+        pool.add(reader)
+
+    pool.close()
+
+    assert all(reader.closed for reader in readers)
+    assert len(pool._idle_readers) == 0
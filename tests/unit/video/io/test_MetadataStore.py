@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from mugen.utilities.cache import Cache
+from mugen.video.io import MetadataStore as metadata_store_module
+from mugen.video.io.MetadataStore import MetadataStore
+from mugen.video.sizing import Dimensions
+
+
+def get_metadata(duration: float = 10) -> dict:
+    return {
+        "format": {"duration": str(duration)},
+        "streams": [
+            {
+                "codec_type": "video",
+                "duration": str(duration),
+                "r_frame_rate": "24/1",
+                "width": 320,
+                "height": 240,
+            }
+        ],
+    }
+
+
+def create_files(directory, names):
+    files = []
+    for name in names:
+        file = os.path.join(directory, name)
+        with open(file, "w") as video_file:
+            video_file.write(name)
+        files.append(file)
+
+    return files
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    probed_files = []
+
+    def probe_file(file: str) -> dict:
+        probed_files.append(file)
+        if "broken" in file:
+            raise IOError(f"Failed to probe file {file}")
+
+        return get_metadata()
+
+    monkeypatch.setattr(metadata_store_module, "probe_file", probe_file)
+
+    return probed_files
+
+
+def test_metadata_store__probes_each_file_once(tmp_path, probes):
+    (file,) = create_files(tmp_path, ["video.mp4"])
+    store = MetadataStore()
+
+    assert store.get(file) == get_metadata()
+    assert store.get(file) == get_metadata()
+    assert store.get_video_metadata(file) == (10, 24, Dimensions(320, 240))
+    assert probes == [file]
+
+
+def test_metadata_store__persists_metadata_in_cache(tmp_path, probes):
+    (file,) = create_files(tmp_path, ["video.mp4"])
+    cache_file = os.path.join(tmp_path, "cache.sqlite")
+
+    MetadataStore(Cache(cache_file)).get(file)
+    metadata = MetadataStore(Cache(cache_file)).get(file)
+
+    assert metadata == get_metadata()
+    assert probes == [file]
+
+
+def test_metadata_store__populate__skips_files_which_fail_with_ignore_errors(
+    tmp_path, probes
+):
+    files = create_files(tmp_path, ["video.mp4", "broken.mp4", "other_video.mp4"])
+    store = MetadataStore()
+
+    store.populate(files, workers=2, ignore_errors=True)
+
+    assert sorted(probes) == sorted(files)
+    assert len(store._metadata) == 2
+    with pytest.raises(IOError):
+        store.populate(files, ignore_errors=False)
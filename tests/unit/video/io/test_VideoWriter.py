@@ -0,0 +1,127 @@
+import os
+import time
+from typing import Optional
+
+import pytest
+
+from mugen.exceptions import WritingError
+from mugen.utilities import parallel
+from mugen.video.io.VideoWriter import VideoWriter
+
+
+class VideoClipStub:
+    """
+    Stands in for a video clip, writing a text file instead of encoding a video file
+    """
+
+    def __init__(self, fails: bool = False, release_path: Optional[str] = None):
+        """
+        Parameters
+        ----------
+        fails
+            Whether writing fails
+
+        release_path
+            If given, writing blocks until a file exists at this path, serving as an event
+            which can be set from another process
+        """
+        self.fails = fails
+        self.release_path = release_path
+
+    def write_videofile(self, output_path, **kwargs):
+        # Time out eventually so that a broken test cannot hang
+        deadline = time.monotonic() + 30
+        while (
+            self.release_path
+            and not os.path.exists(self.release_path)
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+
+        if self.fails:
+            raise IOError(f"Failed to write {output_path}")
+
+        with open(output_path, "w") as file:
+            file.write(str(kwargs["threads"]))
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_write_video_clips_to_directory__writes_each_clip(tmp_path, workers):
+    writer = VideoWriter()
+    writer.threads = 1
+
+    output_paths = writer.write_video_clips_to_directory(
+        [VideoClipStub(), VideoClipStub()],
+        str(tmp_path),
+        workers=workers,
+        show_progress=False,
+    )
+
+    assert [path.split("/")[-1] for path in output_paths] == ["0.mkv", "1.mkv"]
+    for output_path in output_paths:
+        with open(output_path) as file:
+            assert file.read() == "1"
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_write_video_clips_to_directory__collects_errors(tmp_path, workers):
+    with pytest.raises(WritingError) as error:
+        VideoWriter().write_video_clips_to_directory(
+            [VideoClipStub(fails=True), VideoClipStub(), VideoClipStub(fails=True)],
+            str(tmp_path),
+            workers=workers,
+            fail_fast=False,
+            show_progress=False,
+        )
+
+    assert sorted(path.split("/")[-1] for path in error.value.errors) == [
+        "0.mkv",
+        "2.mkv",
+    ]
+    assert (tmp_path / "1.mkv").exists()
+
+
+def test_write_video_clips_to_directory__fails_fast(tmp_path):
+    with pytest.raises(IOError):
+        VideoWriter().write_video_clips_to_directory(
+            [VideoClipStub(fails=True), VideoClipStub()],
+            str(tmp_path),
+            show_progress=False,
+        )
+
+    assert not (tmp_path / "1.mkv").exists()
+
+
+def test_write_video_clips_to_directory__fails_fast_with_workers(tmp_path, monkeypatch):
+    release_path = str(tmp_path / "release")
+    output_directory = tmp_path / "output"
+    output_directory.mkdir()
+    futures = []
+
+    def release_writes(future):
+        # Unblock writes already running in workers once the writer cancels
+        if future.cancelled():
+            open(release_path, "w").close()
+
+    def submit(pool, function, *args):
+        future = submit_to_pool(pool, function, *args)
+        future.add_done_callback(release_writes)
+        futures.append(future)
+        return future
+
+    submit_to_pool = parallel.submit
+    monkeypatch.setattr(parallel, "submit", submit)
+
+    with pytest.raises(IOError):
+        VideoWriter().write_video_clips_to_directory(
+            [VideoClipStub(fails=True)]
+            + [VideoClipStub(release_path=release_path) for _ in range(10)],
+            str(output_directory),
+            workers=2,
+            show_progress=False,
+        )
+
+    # The remaining writes block until cancellation, so none can finish before the failure
+    assert len(futures) == 11
+    assert not futures[0].cancelled()
+    assert all(future.cancelled() for future in futures[1:])
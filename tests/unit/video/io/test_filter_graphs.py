@@ -0,0 +1,51 @@
+from mugen.video.effects import FadeIn
+from mugen.video.io import filter_graphs
+from mugen.video.io.filter_graphs import TimelineItem
+from mugen.video.sizing import Dimensions
+from tests.unit.video.test_MusicVideo import get_music_video
+
+
+def get_timeline_item(frames: int, crossfade_frames: int = 0, effects=None):
+    return TimelineItem(
+        "video.mp4",
+        10,
+        Dimensions(1920, 1080),
+        True,
+        frames,
+        crossfade_frames,
+        effects or [],
+    )
+
+
+def test_supports_segments__rejects_segments_without_video_files():
+    assert not filter_graphs.supports_segments(get_music_video().segments)
+
+
+def test_build_filter_graph__crops_scales_and_fades_items():
+    input_arguments, filter_graph = filter_graphs.build_filter_graph(
+        [get_timeline_item(24, effects=[FadeIn(0.5)])],
+        (1000, 1000),
+        24,
+        audio=False,
+    )
+
+    assert input_arguments[:4] == ["-ss", "10", "-t", "2.0"]
+    assert "crop=1080:1080:420:0,scale=1000:1000" in filter_graph
+    assert "fade=t=in:st=0:d=0.5:c=0x000000" in filter_graph
+    assert "[audio]" not in filter_graph
+    assert filter_graph.endswith("trim=end_frame=24,format=yuv420p[video]")
+
+
+def test_build_filter_graph__crossfades_over_buffers():
+    _, filter_graph = filter_graphs.build_filter_graph(
+        [get_timeline_item(24), get_timeline_item(12), get_timeline_item(24, 12)],
+        (1920, 1080),
+        24,
+        audio=True,
+    )
+
+    assert "[v0][v1]concat=n=2:v=1:a=0" in filter_graph
+    assert "xfade=transition=fade:duration=0.5:offset=1.0" in filter_graph
+    assert "acrossfade=d=0.5" in filter_graph
+    assert "trim=end_frame=48,format=yuv420p[video]" in filter_graph
+    assert filter_graph.endswith("atrim=duration=2.0[audio]")
@@ -0,0 +1,45 @@
+import os
+
+from mugen.video.segments.ClaimedFootage import ClaimedFootage
+from mugen.video.segments.FootageLedger import FootageLedger
+from mugen.video.segments.UsedFootage import UsedFootage
+
+
+def test_claimed_footage__accounts_for_footage_used_by_other_ledgers(tmp_path):
+    path = os.path.join(tmp_path, "ledger.sqlite")
+    ledger = FootageLedger(path)
+    other_ledger = FootageLedger(path)
+    claimed_footage = ClaimedFootage(ledger)
+
+    # Reserved by another process after the claims were made
+    other_ledger.add("/v.mp4", 2, 3)
+
+    assert claimed_footage.overlaps("/v.mp4", 2, 3)
+    assert claimed_footage.unused_time_ranges("/v.mp4", 0, 20) == [(0, 2), (3, 20)]
+
+
+def test_claimed_footage__accounts_for_claims(tmp_path):
+    path = os.path.join(tmp_path, "ledger.sqlite")
+    claimed_footage = ClaimedFootage(FootageLedger(path))
+    FootageLedger(path).add("/v.mp4", 2, 3)
+
+    claimed_footage.add("/v.mp4", 5, 6)
+
+    assert claimed_footage.overlaps("/v.mp4", 5.5, 7)
+    assert claimed_footage.unused_time_ranges("/v.mp4", 0, 20) == [
+        (0, 2),
+        (3, 5),
+        (6, 20),
+    ]
+
+
+def test_claimed_footage__releases_claims():
+    claimed_footage = ClaimedFootage(UsedFootage())
+    claimed_footage.add("/v.mp4", 2, 3)
+    claimed_footage.add("/v.mp4", 5, 6)
+
+    claimed_footage.remove("/v.mp4", 2, 3)
+
+    assert not claimed_footage.overlaps("/v.mp4", 2, 3)
+    assert claimed_footage.overlaps("/v.mp4", 5, 6)
+    assert claimed_footage.unused_time_ranges("/v.mp4", 0, 10) == [(0, 5), (6, 10)]
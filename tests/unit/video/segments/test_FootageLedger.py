@@ -0,0 +1,40 @@
+import os
+
+from mugen.video.segments.FootageLedger import FootageLedger
+
+
+def test_footage_ledger__shares_used_footage_between_ledgers(tmp_path):
+    path = os.path.join(tmp_path, "ledger.sqlite")
+    ledger = FootageLedger(path)
+    other_ledger = FootageLedger(path, minimum_gap=0.5)
+
+    ledger.add("video.mp4", 2, 3)
+
+    assert other_ledger.overlaps("video.mp4", 3.2, 4)
+    assert not other_ledger.overlaps("video.mp4", 3.6, 4)
+    assert not other_ledger.overlaps("other_video.mp4", 2, 3)
+
+
+def test_footage_ledger__identifies_files_by_absolute_path(tmp_path, monkeypatch):
+    path = os.path.join(tmp_path, "ledger.sqlite")
+    ledger = FootageLedger(path)
+    other_ledger = FootageLedger(path)
+    monkeypatch.chdir(tmp_path)
+
+    ledger.add("video.mp4", 2, 3)
+
+    assert other_ledger.overlaps(os.path.join(tmp_path, "video.mp4"), 2, 3)
+    assert other_ledger.unused_time_ranges(
+        os.path.join(tmp_path, "video.mp4"), 0, 5
+    ) == [(0, 2), (3, 5)]
+
+
+def test_footage_ledger__clear_removes_reservations(tmp_path):
+    path = os.path.join(tmp_path, "ledger.sqlite")
+    ledger = FootageLedger(path)
+    ledger.add("video.mp4", 2, 3)
+
+    ledger.clear()
+
+    assert not ledger.overlaps("video.mp4", 2, 3)
+    assert not FootageLedger(path).overlaps("video.mp4", 2, 3)
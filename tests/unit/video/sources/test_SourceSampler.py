@@ -1,5 +1,9 @@
+import numpy
 import pytest
 
+from mugen.exceptions import ParameterError, SamplingError
+from mugen.mixins.Filterable import Filter
+from mugen.video.sources.ColorSource import ColorSource
 from mugen.video.sources.Source import SourceList
 from mugen.video.sources.SourceSampler import SourceSampler
 from tests.unit.video.sources.test_ColorSource import (
@@ -10,6 +14,22 @@ from tests.unit.video.sources.test_ColorSource import (
 )
 
 
+class ShortSource(ColorSource):
+    """A source which cannot fit durations of its length or longer"""
+
+    def __init__(self, length: float, **kwargs):
+        super().__init__("black", **kwargs)
+        self.length = length
+        self.samples = 0
+
+    def sample(self, duration: float):
+        self.samples += 1
+        if duration >= self.length:
+            raise SamplingError(f"No footage is at least {duration} seconds long")
+
+        return super().sample(duration)
+
+
 def source_sampler(weights) -> SourceSampler:
     return SourceSampler(
         SourceList(
@@ -29,3 +49,97 @@ def source_sampler(weights) -> SourceSampler:
 )
 def test_sample(sampler, expected_segment_color):
     assert sampler.sample(1).color == expected_segment_color
+
+
+def test_sample_with_filters__returns_first_passing_candidate_in_batch():
+    sampler = source_sampler([1, 1, 1, 1])
+    is_purple = Filter(lambda segment: segment.color == "#800080")
+
+    segment, rejected_segments = sampler.sample_with_filters(
+        1, [is_purple], batch_size=4
+    )
+
+    assert segment.color == "#800080"
+    assert all(segment.color != "#800080" for segment in rejected_segments)
+
+
+def test_sample_with_filters__evaluates_single_candidates_without_thread_pool(
+    monkeypatch,
+):
+    def raise_error(*args, **kwargs):
+        raise AssertionError("A thread pool should not be created")
+
+    monkeypatch.setattr(
+        "mugen.video.sources.SourceSampler.ThreadPoolExecutor", raise_error
+    )
+    sampler = source_sampler([0, 0, 0, 1])
+    is_purple = Filter(lambda segment: segment.color == "#800080")
+
+    segment, _ = sampler.sample_with_filters(1, [is_purple])
+
+    assert segment.color == "#800080"
+
+
+def test_sample_with_filters__raises_error_after_max_attempts():
+    sampler = source_sampler([1, 1, 1, 1])
+    is_never_satisfied = Filter(lambda segment: False)
+
+    with pytest.raises(SamplingError):
+        sampler.sample_with_filters(
+            1, [is_never_satisfied], batch_size=3, max_attempts=10
+        )
+
+
+def test_sample_sources__selects_sources_in_proportion_to_weights():
+    sampler = source_sampler([1, 0, 3, 0])
+    numpy.random.seed(0)
+
+    colors = [source.color for source in sampler.sample_sources(4000)]
+
+    assert set(colors) == {"#000000", "#FFA500"}
+    assert colors.count("#FFA500") / len(colors) == pytest.approx(0.75, abs=0.03)
+
+
+def test_sample_sources__never_selects_trailing_sources_without_weight(monkeypatch):
+    sampler = source_sampler([1, 3, 0, 0])
+    # Floating point error can push random draws to the top of the range
+    monkeypatch.setattr(
+        numpy.random, "random", lambda count: numpy.full(count, 1 + 1e-12)
+    )
+
+    colors = [source.color for source in sampler.sample_sources(10)]
+
+    assert set(colors) == {"#ffffff"}
+
+
+def test_source_sampler__raises_error_for_zero_total_weight():
+    with pytest.raises(ParameterError):
+        source_sampler([0, 0, 0, 0])
+
+
+def test_sample__resamples_from_other_sources_when_source_cannot_fit_duration():
+    short_source = ShortSource(1, weight=100)
+    sampler = SourceSampler([short_source, get_purple_source()])
+
+    segments = [sampler.sample(duration) for duration in [1, 1.5, 2, 1.2, 3]]
+
+    assert all(segment.color == "#800080" for segment in segments)
+    # Durations at least as long as one which did not fit are not sampled from the source again
+    assert short_source.samples == 1
+
+
+def test_sample__samples_shorter_durations_from_source_which_cannot_fit_longer_ones():
+    short_source = ShortSource(1)
+    sampler = SourceSampler([short_source])
+    with pytest.raises(SamplingError):
+        sampler.sample(2)
+
+    assert sampler.sample(0.5).duration == 0.5
+    assert short_source.samples == 2
+
+
+def test_sample__raises_error_when_no_source_can_fit_duration():
+    sampler = SourceSampler([ShortSource(1), ShortSource(2)])
+
+    with pytest.raises(SamplingError):
+        sampler.sample(2)
@@ -0,0 +1,33 @@
+import numpy
+
+from mugen.video.sources.VideoSource import _get_shot_frame_ranges
+
+
+def test_get_shot_frame_ranges__splits_shots_at_cuts_and_unusable_frames():
+    usable_frames = numpy.array([True, True, False, True, True, True, True, False])
+    cut_frames = numpy.array([False, False, False, False, False, True, False, False])
+
+    first_frames, end_frames = _get_shot_frame_ranges(usable_frames, cut_frames)
+
+    assert list(first_frames) == [0, 3, 5]
+    assert list(end_frames) == [2, 5, 7]
+
+
+def test_get_shot_frame_ranges__includes_shot_ending_at_last_frame():
+    usable_frames = numpy.array([False, True, True])
+    cut_frames = numpy.array([False, True, False])
+
+    first_frames, end_frames = _get_shot_frame_ranges(usable_frames, cut_frames)
+
+    assert list(first_frames) == [1]
+    assert list(end_frames) == [3]
+
+
+def test_get_shot_frame_ranges__finds_no_shots_without_usable_frames():
+    for usable_frames in [numpy.array([False, False]), numpy.array([], dtype=bool)]:
+        first_frames, end_frames = _get_shot_frame_ranges(
+            usable_frames, numpy.zeros(len(usable_frames), dtype=bool)
+        )
+
+        assert len(first_frames) == 0
+        assert len(end_frames) == 0
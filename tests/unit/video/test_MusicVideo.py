@@ -1,4 +1,9 @@
+import pytest
+
 from mugen import MusicVideo
+from mugen.exceptions import ParameterError
+from mugen.video.effects import Crossfade
+from mugen.video.MusicVideo import RenderBackend
 from tests.unit.video.segments.test_ColorSegment import (
     get_black_segment,
     get_orange_segment,
@@ -35,3 +40,46 @@ def test_compose__duration_is_sum_of_segment_durations():
     assert composed_music_video.duration == sum(
         segment.duration for segment in music_video.segments
     )
+
+
+def test_compose__applies_crossfades():
+    music_video = get_music_video()
+    music_video.segments[1].effects.append(Crossfade(0.5))
+    composed_music_video = music_video.compose()
+
+    assert composed_music_video.duration == 3
+
+
+@pytest.mark.parametrize(
+    "chunks, expected_chunk_boundaries",
+    [(1, [0, 3]), (2, [0, 1, 3]), (3, [0, 1, 2, 3]), (5, [0, 1, 2, 3])],
+)
+def test_get_chunk_boundaries__splits_at_cuts(chunks, expected_chunk_boundaries):
+    assert (
+        get_music_video()._get_chunk_boundaries(chunks, 24) == expected_chunk_boundaries
+    )
+
+
+@pytest.mark.parametrize(
+    "time, expected_color",
+    [(0.5, [0, 0, 0]), (1.5, [255, 255, 255]), (2.5, [255, 69, 0])],
+)
+def test_compose__plays_segments_in_order(time, expected_color):
+    composed_music_video = get_music_video().compose()
+
+    assert composed_music_video.get_frame(time)[0][0].tolist() == expected_color
+
+
+def test_compose__blends_segments_during_crossfades():
+    music_video = get_music_video()
+    music_video.segments[1].effects.append(Crossfade(0.5))
+    composed_music_video = music_video.compose()
+
+    blended_value = composed_music_video.get_frame(1.25)[0][0][0]
+    assert 0 < blended_value < 255
+    assert composed_music_video.get_frame(1.75)[0][0].tolist() == [255, 255, 255]
+
+
+def test_write_to_video_file__ffmpeg_backend_rejects_unsupported_segments():
+    with pytest.raises(ParameterError):
+        get_music_video().write_to_video_file(backend=RenderBackend.FFMPEG)
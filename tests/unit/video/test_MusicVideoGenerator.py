@@ -2,6 +2,9 @@ import pytest
 
 from mugen import MusicVideoGenerator
 from mugen.exceptions import ParameterError
+from mugen.utilities import parallel
+from mugen.video.io.VideoWriter import VideoWriter
+from mugen.video.MusicVideo import MusicVideo
 from tests.unit.video.sources.test_ColorSource import get_orange_source
 
 
@@ -18,3 +21,150 @@ def test_music_video_generator__creates_music_video_with_duration():
 
     assert len(music_video.segments) == 3
     assert music_video.compose().duration == 0.1
+
+
+def test_music_video_generator__creates_music_video_with_workers():
+    generator = MusicVideoGenerator(video_sources=[get_orange_source()], duration=0.1)
+    generator.video_filters = []
+    generator.workers = 2
+
+    music_video = generator.generate_from_events([0.02, 0.04], show_progress=False)
+
+    assert [segment.duration for segment in music_video.segments] == pytest.approx(
+        [0.02, 0.02, 0.06]
+    )
+    assert music_video.compose().duration == 0.1
+
+
+class VideoWriterStub(VideoWriter):
+    """
+    Stands in for a video writer, writing each chunk's number of frames to a text file instead of encoding it
+    """
+
+    def __init__(self, fails: bool = False):
+        super().__init__()
+        self.fails = fails
+        self.concatenated_files = []
+        self.audio_encodings = 0
+
+    def write_video_clip_to_file(self, video_clip, output_path=None, **kwargs):
+        if self.fails:
+            raise IOError(f"Failed to write {output_path}")
+
+        with open(output_path, "w") as file:
+            file.write(str(video_clip.duration * video_clip.fps))
+
+        return output_path
+
+    def concatenate_video_files(self, video_files, output_path=None, **kwargs):
+        for video_file in video_files:
+            with open(video_file) as file:
+                self.concatenated_files.append(float(file.read()))
+
+        return "concatenated.mkv"
+
+    def encode_audio(self, video_file, output_path=None):
+        self.audio_encodings += 1
+
+        return "encoded.mkv"
+
+
+@pytest.fixture
+def stub_subtitle_tracks(monkeypatch):
+    monkeypatch.setattr(MusicVideo, "_add_subtitle_tracks", lambda *args: None)
+
+
+def test_music_video_generator__write_from_events__writes_whole_frame_chunks_in_order(
+    tmp_path, stub_subtitle_tracks
+):
+    generator = MusicVideoGenerator(video_sources=[get_orange_source()], duration=0.9)
+    generator.video_filters = []
+    writer = VideoWriterStub()
+
+    music_video = generator.write_from_events(
+        [0.11, 0.37, 0.52],
+        str(tmp_path / "music_video.mkv"),
+        dimensions=(10, 10),
+        writer=writer,
+        show_progress=False,
+    )
+
+    # Chunks end on the frames nearest to each cut at 24 fps: 3, 9, 12, and 22
+    assert writer.concatenated_files == pytest.approx([3, 6, 3, 10])
+    assert writer.audio_encodings == 1
+    assert len(music_video.segments) == 4
+
+
+def test_music_video_generator__write_from_events__raises_chunk_errors(
+    tmp_path, stub_subtitle_tracks
+):
+    generator = MusicVideoGenerator(video_sources=[get_orange_source()], duration=0.9)
+    generator.video_filters = []
+
+    with pytest.raises(IOError):
+        generator.write_from_events(
+            [0.11, 0.37, 0.52],
+            str(tmp_path / "music_video.mkv"),
+            dimensions=(10, 10),
+            writer=VideoWriterStub(fails=True),
+            show_progress=False,
+        )
+
+
+def test_music_video_generator__iter_segments__yields_segments_in_order():
+    generator = MusicVideoGenerator(video_sources=[get_orange_source()], duration=0.1)
+    generator.video_filters = []
+
+    segments = generator.iter_segments([0.02, 0.04])
+
+    assert next(segments).duration == pytest.approx(0.02)
+    assert [segment.duration for segment in segments] == pytest.approx([0.02, 0.06])
+
+
+def test_music_video_generator__iter_segments__stops_early_with_workers(monkeypatch):
+    generator = MusicVideoGenerator(video_sources=[get_orange_source()], duration=1)
+    generator.video_filters = []
+    generator.workers = 2
+    submit = parallel.submit
+    futures = []
+
+    def submit_and_record(*args, **kwargs):
+        future = submit(*args, **kwargs)
+        futures.append(future)
+        return future
+
+    monkeypatch.setattr(parallel, "submit", submit_and_record)
+
+    segments = generator.iter_segments([0.001 * index for index in range(1, 1000)])
+
+    assert next(segments).duration == pytest.approx(0.001)
+    segments.close()
+
+    # Samples for every duration were submitted at once, and those still outstanding are cancelled
+    assert len(futures) == 1000
+    assert all(future.done() for future in futures)
+    assert any(future.cancelled() for future in futures)
+    with pytest.raises(StopIteration):
+        next(segments)
+    assert len(futures) == 1000
+
+
+def test_music_video_generator__write_from_events__requires_segments(tmp_path):
+    generator = MusicVideoGenerator(video_sources=[get_orange_source()], duration=0.1)
+    generator.iter_segments = lambda *args, **kwargs: iter([])
+
+    with pytest.raises(ValueError):
+        generator.write_from_events(
+            [0.05],
+            str(tmp_path / "music_video.mkv"),
+            dimensions=(10, 10),
+            show_progress=False,
+        )
+
+
+def test_music_video_generator__video_filters__applies_video_filter_options():
+    generator = MusicVideoGenerator(video_sources=[get_orange_source()], duration=0.1)
+    generator.video_filters = ["not_has_text"]
+    generator.video_filter_options = {"not_has_text": {"prescreen": False}}
+
+    assert generator.video_filters[0].options == {"prescreen": False}
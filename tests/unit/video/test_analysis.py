@@ -0,0 +1,62 @@
+import os
+
+import numpy
+import pytest
+
+from mugen.video import analysis
+from mugen.video.analysis import FrameIndex
+
+
+def get_frame_index() -> FrameIndex:
+    return FrameIndex(
+        numpy.arange(5) / 2,
+        numpy.array([0, 10, 10, 50, 0], dtype=numpy.uint8),
+        numpy.array([255, 40, 200, 250, 20], dtype=numpy.uint8),
+        numpy.array([0, 0.5, 0.1, 0.1, 0.6], dtype=numpy.float32),
+    )
+
+
+@pytest.mark.parametrize(
+    "time, expected_frame", [(0, 0), (0.4, 0), (0.5, 1), (1.9, 3), (10, 4), (-1, 0)]
+)
+def test_frame_at(time, expected_frame):
+    assert get_frame_index().frame_at(time) == expected_frame
+
+
+def test_frames_between():
+    assert get_frame_index().frames_between(0.5, 1.5) == slice(1, 4)
+
+
+def test_luma_ranges():
+    assert list(get_frame_index().luma_ranges) == [255, 30, 190, 200, 20]
+
+
+def test_save_and_load__preserves_measurements(tmp_path):
+    path = os.path.join(tmp_path, "index.npz")
+    get_frame_index().save(path)
+    frame_index = FrameIndex.load(path)
+
+    assert list(frame_index.luma_ranges) == list(get_frame_index().luma_ranges)
+    assert frame_index.text_scores is None
+
+
+def test_find_frame_index__finds_registered_and_cached_indexes(tmp_path):
+    registered_frame_index = get_frame_index()
+    registered_frame_index.path = os.path.join(tmp_path, "registered.npz")
+    analysis.register_frame_index(registered_frame_index)
+    cached_path = os.path.join(tmp_path, "cached.npz")
+    get_frame_index().save(cached_path)
+
+    assert (
+        analysis.find_frame_index(registered_frame_index.path) is registered_frame_index
+    )
+    assert analysis.find_frame_index(cached_path).path == cached_path
+    assert analysis.find_frame_index(os.path.join(tmp_path, "missing.npz")) is None
+
+
+def test_frame_text_score__is_higher_for_frames_with_sharp_edges():
+    flat_frame = numpy.full((10, 10), 128, dtype=numpy.uint8)
+    striped_frame = numpy.tile(numpy.array([0, 255], dtype=numpy.uint8), (10, 5))
+
+    assert analysis.frame_text_score(flat_frame) == 0
+    assert analysis.frame_text_score(striped_frame) == 1
@@ -0,0 +1,43 @@
+import numpy
+import pytest
+from PIL import Image, ImageDraw
+
+from mugen.video import detection
+
+
+def get_black_image() -> Image:
+    return Image.fromarray(numpy.zeros((720, 1280, 3), dtype=numpy.uint8))
+
+
+def get_gradient_image() -> Image:
+    gradient = numpy.linspace(0, 255, 1280).astype(numpy.uint8)
+    return Image.fromarray(numpy.tile(gradient, (720, 1)))
+
+
+def get_text_image() -> Image:
+    image = get_black_image()
+    ImageDraw.Draw(image).text((100, 600), "Subtitles " * 10, fill=(255, 255, 255))
+    return image
+
+
+@pytest.mark.parametrize(
+    "image, expected_could_have_text",
+    [
+        (get_black_image(), False),
+        (get_gradient_image(), False),
+        (get_text_image(), True),
+    ],
+)
+def test_image_could_have_text(image, expected_could_have_text):
+    assert detection.image_could_have_text(image) == expected_could_have_text
+
+
+def test_images_have_text__counts_prescreened_frames_without_running_ocr():
+    detection.text_detection_counts.reset()
+
+    assert detection.images_have_text([get_black_image(), get_gradient_image()]) == [
+        False,
+        False,
+    ]
+    assert detection.text_detection_counts.prescreened_frames == 2
+    assert detection.text_detection_counts.recognized_frames == 0
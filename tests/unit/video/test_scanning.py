@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+from mugen.video import scanning
+
+
+@pytest.mark.parametrize(
+    "file, expected_is_video_file_name",
+    [
+        ("video.mp4", True),
+        ("video.MKV", True),
+        ("animation.gif", True),
+        ("notes.txt", False),
+        ("video", False),
+    ],
+)
+def test_is_video_file_name(file, expected_is_video_file_name):
+    assert scanning.is_video_file_name(file) == expected_is_video_file_name
+
+
+def test_scan_directory__skips_files_without_video_extensions(tmp_path):
+    for file_name in ["notes.txt", ".hidden.mp4"]:
+        open(os.path.join(tmp_path, file_name), "w").close()
+
+    report = scanning.scan_directory(tmp_path)
+
+    assert report.video_files == []
+    assert report.skipped_files == [os.path.join(tmp_path, "notes.txt")]
+    assert report.unreadable_files == []